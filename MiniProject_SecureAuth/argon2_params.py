@@ -0,0 +1,114 @@
+"""
+Host calibration for Argon2id parameters.
+
+calibrate() picks memory_cost, time_cost and parallelism so that a single
+verification takes roughly ``target_ms`` on the current machine while staying
+within a memory budget:
+
+1. parallelism = number of cores (capped at 4, the argon2-cffi default).
+2. memory_cost = the memory budget (more memory is the main defence against
+   GPU cracking, so it is spent first).
+3. time_cost is raised from 1 until the target latency is reached. If even
+   time_cost=1 is too slow, memory is halved until it fits (never below
+   MIN_MEMORY_KIB).
+
+The result is saved as JSON and loaded by secure_auth_app at startup. Stored
+hashes with older parameters are upgraded on the next successful login
+(PasswordHasher.check_needs_rehash), so parameters can change without a
+password reset.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+from argon2 import PasswordHasher
+
+DEFAULT_TARGET_MS = 250.0
+DEFAULT_MAX_MEMORY_KIB = 64 * 1024
+MIN_MEMORY_KIB = 19 * 1024      # OWASP minimum for Argon2id
+MAX_TIME_COST = 10
+PARAM_KEYS = ("time_cost", "memory_cost", "parallelism", "hash_len", "salt_len")
+
+
+def make_hasher(params: Dict[str, Any] | None = None) -> PasswordHasher:
+    """
+    Build a PasswordHasher from saved parameters (library defaults if None).
+    """
+    if not params:
+        return PasswordHasher()
+    return PasswordHasher(**{k: params[k] for k in PARAM_KEYS if k in params})
+
+
+def measure_verify_ms(ph: PasswordHasher, samples: int = 3) -> float:
+    """
+    Median wall-clock time of one ph.verify call, in milliseconds.
+    """
+    encoded = ph.hash("calibration-password")
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        ph.verify(encoded, "calibration-password")
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return timings[len(timings) // 2]
+
+
+def calibrate(
+    target_ms: float = DEFAULT_TARGET_MS,
+    max_memory_kib: int = DEFAULT_MAX_MEMORY_KIB,
+    parallelism: int | None = None,
+    samples: int = 3,
+) -> Dict[str, Any]:
+    """
+    Choose Argon2id parameters that hit ``target_ms`` per verify on this host.
+    Returns the parameters plus the measured latency and calibration metadata.
+    """
+    parallelism = parallelism or min(os.cpu_count() or 1, 4)
+    memory_cost = max(max_memory_kib, 8 * parallelism)
+    time_cost = 1
+
+    while True:
+        ph = PasswordHasher(time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism)
+        elapsed = measure_verify_ms(ph, samples)
+        if elapsed >= target_ms or time_cost >= MAX_TIME_COST:
+            break
+        if time_cost == 1 and elapsed > 0:
+            # Verify time grows roughly linearly with time_cost; jump close to the target.
+            time_cost = max(2, min(MAX_TIME_COST, int(target_ms / elapsed)))
+        else:
+            time_cost += 1
+
+    # Too slow even at time_cost=1: give up memory until it fits.
+    while time_cost == 1 and elapsed > target_ms * 1.5 and memory_cost // 2 >= MIN_MEMORY_KIB:
+        memory_cost //= 2
+        ph = PasswordHasher(time_cost=1, memory_cost=memory_cost, parallelism=parallelism)
+        elapsed = measure_verify_ms(ph, samples)
+
+    return {
+        "time_cost": time_cost,
+        "memory_cost": memory_cost,
+        "parallelism": parallelism,
+        "hash_len": ph.hash_len,
+        "salt_len": ph.salt_len,
+        "measured_verify_ms": round(elapsed, 2),
+        "target_ms": target_ms,
+        "max_memory_kib": max_memory_kib,
+        "calibrated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+
+
+def load_params(path: Path) -> Dict[str, Any] | None:
+    if not path.exists():
+        return None
+    with path.open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_params(path: Path, params: Dict[str, Any]) -> None:
+    with path.open("w", encoding="utf-8") as f:
+        json.dump(params, f, indent=2)
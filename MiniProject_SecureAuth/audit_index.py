@@ -0,0 +1,305 @@
+"""
+Secondary indexes and streaming queries over the JSONL audit log.
+
+The log itself stays append-only (see audit_store). A side-car SQLite
+database (``audit_log.index.db`` next to ``audit_log.jsonl``) records, for
+every event, which segment file it lives in, its byte offset, its time,
+username and event type. Queries use the indexes to find matching offsets
+and then read just those lines back from the log, one at a time, so results
+can be streamed out without loading the history into memory.
+
+Segments are tracked by inode rather than name, because rotation renames
+the active file; each refresh only parses bytes appended since the last one.
+The segment's first line is stored too, so a recycled inode is recognised
+and indexed from the start. A refresh runs in one write transaction, so
+concurrent refreshes from several connections never index a line twice.
+Events from a legacy ``audit_log.json`` array have no line offsets and are
+stored in the index verbatim instead.
+"""
+
+from __future__ import annotations
+
+import calendar
+import csv
+import json
+import os
+import re
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, IO, Iterable, Iterator
+
+import audit_store
+
+CSV_FIELDS = ["time", "username", "event", "details"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS segments (
+    inode         INTEGER PRIMARY KEY,
+    name          TEXT NOT NULL,
+    indexed_bytes INTEGER NOT NULL DEFAULT 0,
+    head          BLOB
+);
+CREATE TABLE IF NOT EXISTS events (
+    id       INTEGER PRIMARY KEY,
+    segment  INTEGER NOT NULL,
+    offset   INTEGER NOT NULL,
+    time     INTEGER NOT NULL,
+    username TEXT NOT NULL,
+    event    TEXT NOT NULL,
+    raw      TEXT
+);
+CREATE INDEX IF NOT EXISTS events_user_time  ON events (username, time);
+CREATE INDEX IF NOT EXISTS events_event_time ON events (event, time);
+CREATE INDEX IF NOT EXISTS events_time       ON events (time);
+"""
+
+
+def index_path(log_path: Path) -> Path:
+    return log_path.with_name(f"{log_path.stem}.index.db")
+
+
+def iso_to_epoch(ts: str) -> int:
+    return calendar.timegm(time.strptime(ts, "%Y-%m-%dT%H:%M:%SZ"))
+
+
+def parse_time(value: str, now: float | None = None) -> int:
+    """
+    Accept an ISO timestamp (2025-12-09T19:57:31Z), epoch seconds, or a
+    relative age such as "90s", "15m", "1h", "7d" (meaning that long ago).
+    """
+    now = time.time() if now is None else now
+    match = re.fullmatch(r"(\d+)([smhd])", value.strip())
+    if match:
+        scale = {"s": 1, "m": 60, "h": 3600, "d": 86400}[match.group(2)]
+        return int(now - int(match.group(1)) * scale)
+    if value.strip().isdigit():
+        return int(value)
+    return iso_to_epoch(value.strip())
+
+
+class AuditIndex:
+    def __init__(self, log_path: Path, db_path: Path | None = None):
+        self.log_path = Path(log_path)
+        self.db_path = Path(db_path) if db_path else index_path(self.log_path)
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(segments)")]
+        if "head" not in columns:
+            self.conn.execute("ALTER TABLE segments ADD COLUMN head BLOB")
+        self._handles: Dict[int, IO[bytes]] = {}
+
+    def close(self) -> None:
+        for handle in self._handles.values():
+            handle.close()
+        self._handles.clear()
+        self.conn.close()
+
+    def __enter__(self) -> "AuditIndex":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # Building
+
+    def _segment_files(self) -> list[Path]:
+        files = audit_store.rotated_segments(self.log_path)
+        if self.log_path.exists():
+            files.append(self.log_path)
+        return files
+
+    def refresh(self) -> int:
+        """
+        Index events appended since the last refresh. Returns the number added.
+        """
+        # Take the write lock before reading indexed_bytes, so another
+        # connection cannot index the same bytes in between.
+        self.conn.execute("BEGIN IMMEDIATE")
+        with self.conn:
+            added = self._index_legacy()
+            for segment in self._segment_files():
+                added += self._refresh_segment(segment)
+        return added
+
+    def _refresh_segment(self, segment: Path) -> int:
+        with segment.open("rb") as f:
+            st = os.fstat(f.fileno())
+            head = f.readline()
+        if not head.endswith(b"\n"):
+            head = None  # first line not complete yet
+        row = self.conn.execute(
+            "SELECT indexed_bytes, head FROM segments WHERE inode = ?", (st.st_ino,)
+        ).fetchone()
+        start = row[0] if row else 0
+        if row is None:
+            self.conn.execute(
+                "INSERT INTO segments (inode, name, head) VALUES (?, ?, ?)", (st.st_ino, segment.name, head)
+            )
+        else:
+            self.conn.execute(
+                "UPDATE segments SET name = ?, head = COALESCE(?, head) WHERE inode = ?",
+                (segment.name, head, st.st_ino),
+            )
+            if st.st_size < start or (row[1] is not None and head != row[1]):
+                # Inode reused by a different file: index it from scratch.
+                self.conn.execute("DELETE FROM events WHERE segment = ?", (st.st_ino,))
+                stale = self._handles.pop(st.st_ino, None)
+                if stale is not None:
+                    stale.close()
+                start = 0
+        if st.st_size > start:
+            return self._index_segment(segment, st.st_ino, start)
+        return 0
+
+    def _index_segment(self, segment: Path, inode: int, start: int) -> int:
+        rows = []
+        offset = start
+        with segment.open("rb") as f:
+            f.seek(start)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # partially written line; pick it up next time
+                if line.strip():
+                    rec = json.loads(line)
+                    rows.append((inode, offset, iso_to_epoch(rec["time"]), rec["username"], rec["event"]))
+                offset += len(line)
+        self.conn.executemany(
+            "INSERT INTO events (segment, offset, time, username, event) VALUES (?, ?, ?, ?, ?)", rows
+        )
+        self.conn.execute("UPDATE segments SET indexed_bytes = ? WHERE inode = ?", (offset, inode))
+        return len(rows)
+
+    def _index_legacy(self) -> int:
+        legacy = audit_store.legacy_path(self.log_path)
+        if legacy == self.log_path or not legacy.exists():
+            return 0
+        st = legacy.stat()
+        if self.conn.execute("SELECT 1 FROM segments WHERE inode = ?", (st.st_ino,)).fetchone():
+            return 0
+        with legacy.open("r", encoding="utf-8") as f:
+            records = json.load(f)
+        self.conn.execute(
+            "INSERT INTO segments (inode, name, indexed_bytes) VALUES (?, ?, ?)", (st.st_ino, legacy.name, st.st_size)
+        )
+        self.conn.executemany(
+            "INSERT INTO events (segment, offset, time, username, event, raw) VALUES (?, ?, ?, ?, ?, ?)",
+            ((st.st_ino, -1, iso_to_epoch(r["time"]), r["username"], r["event"], json.dumps(r)) for r in records),
+        )
+        return len(records)
+
+    # Querying
+
+    def _open_segment(self, inode: int) -> IO[bytes] | None:
+        """
+        Open the segment with this inode. Rotation renames segments, so the
+        stored name is only a hint: if it now belongs to another file, the
+        current segment files are searched by inode. None if it is gone.
+        """
+        name = self.conn.execute("SELECT name FROM segments WHERE inode = ?", (inode,)).fetchone()[0]
+        candidates = [self.log_path.parent / name] + self._segment_files()
+        for path in candidates:
+            try:
+                handle = path.open("rb")
+            except OSError:
+                continue
+            if os.fstat(handle.fileno()).st_ino == inode:
+                return handle
+            handle.close()
+        return None
+
+    def _read_at(self, inode: int, offset: int) -> Dict[str, Any] | None:
+        if inode not in self._handles:
+            self._handles[inode] = self._open_segment(inode)
+        handle = self._handles[inode]
+        if handle is None:
+            return None   # segment deleted since it was indexed
+        handle.seek(offset)
+        return json.loads(handle.readline())
+
+    @staticmethod
+    def _where(username: str | None, event: str | None, since: int | None, until: int | None):
+        clauses, params = [], []
+        if username is not None:
+            clauses.append("username = ?")
+            params.append(username)
+        if event is not None:
+            clauses.append("event = ?")
+            params.append(event)
+        if since is not None:
+            clauses.append("time >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("time < ?")
+            params.append(until)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def query(
+        self,
+        username: str | None = None,
+        event: str | None = None,
+        since: int | None = None,
+        until: int | None = None,
+        limit: int | None = None,
+        newest_first: bool = False,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield matching events in time order. Filters are ANDed; ``since`` is
+        inclusive and ``until`` exclusive (epoch seconds).
+        """
+        where, params = self._where(username, event, since, until)
+        sql = "SELECT segment, offset, raw FROM events" + where
+        order = "DESC" if newest_first else "ASC"
+        sql += f" ORDER BY time {order}, id {order}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        for segment, offset, raw in self.conn.execute(sql, params):
+            if raw is not None:
+                yield json.loads(raw)
+                continue
+            event_record = self._read_at(segment, offset)
+            if event_record is not None:
+                yield event_record
+
+    def count(
+        self,
+        username: str | None = None,
+        event: str | None = None,
+        since: int | None = None,
+        until: int | None = None,
+    ) -> int:
+        """
+        Number of matching events, answered from the index alone.
+        """
+        where, params = self._where(username, event, since, until)
+        return self.conn.execute("SELECT COUNT(*) FROM events" + where, params).fetchone()[0]
+
+
+def query(log_path: Path, refresh: bool = True, **filters: Any) -> Iterator[Dict[str, Any]]:
+    """
+    Convenience wrapper: refresh the index for ``log_path`` and stream matches.
+    """
+    with AuditIndex(log_path) as index:
+        if refresh:
+            index.refresh()
+        yield from index.query(**filters)
+
+
+def write_jsonl(events: Iterable[Dict[str, Any]], out: IO[str]) -> int:
+    n = 0
+    for event in events:
+        out.write(json.dumps(event, separators=(",", ":")) + "\n")
+        n += 1
+    return n
+
+
+def write_csv(events: Iterable[Dict[str, Any]], out: IO[str]) -> int:
+    writer = csv.DictWriter(out, fieldnames=CSV_FIELDS, extrasaction="ignore")
+    writer.writeheader()
+    n = 0
+    for event in events:
+        writer.writerow(event)
+        n += 1
+    return n
@@ -0,0 +1,186 @@
+"""
+Append-only audit log storage (JSON Lines).
+
+Each audit event is written as a single JSON object on its own line, so an
+append is one small write regardless of how much history already exists.
+The active file is rotated into a timestamped segment once it grows past a
+size limit or becomes older than an age limit. Older history is never
+rewritten.
+
+Layout for a log path of ``audit_log.jsonl``:
+
+    audit_log.jsonl                       active segment (appended to)
+    audit_log.20251209T195731Z.jsonl      rotated segments (read-only)
+    audit_log.json                        legacy JSON array (read-only)
+"""
+
+from __future__ import annotations
+
+import calendar
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+TAIL_BLOCK_SIZE = 64 * 1024
+
+# Start time of each active segment, cached so that time-based rotation does
+# not need to re-read the first line of the file on every append.
+_segment_started: Dict[Path, float] = {}
+
+
+def legacy_path(path: Path) -> Path:
+    """
+    Location of the pre-JSONL audit log (a single JSON array).
+    """
+    return path.with_suffix(".json")
+
+
+def rotated_segments(path: Path) -> List[Path]:
+    """
+    Rotated segments for ``path``, oldest first.
+    """
+    pattern = f"{path.stem}.*{path.suffix}"
+    return sorted(p for p in path.parent.glob(pattern) if p != path)
+
+
+def _segment_start(path: Path) -> float:
+    started = _segment_started.get(path)
+    if started is not None:
+        return started
+    # Unknown start (new process): use the first record's timestamp.
+    started = time.time()
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            first = f.readline()
+        if first.strip():
+            ts = json.loads(first).get("time")
+            if ts:
+                started = calendar.timegm(time.strptime(ts, "%Y-%m-%dT%H:%M:%SZ"))
+    except (OSError, ValueError):
+        pass
+    _segment_started[path] = started
+    return started
+
+
+def rotate(path: Path) -> Path | None:
+    """
+    Move the active segment aside under a UTC timestamp name.
+    Returns the new segment path, or None if there was nothing to rotate.
+    """
+    if not path.exists() or path.stat().st_size == 0:
+        return None
+    stamp = time.strftime("%Y%m%dT%H%M%SZ", time.gmtime())
+    target = path.with_name(f"{path.stem}.{stamp}{path.suffix}")
+    counter = 1
+    while target.exists():
+        target = path.with_name(f"{path.stem}.{stamp}_{counter:03d}{path.suffix}")
+        counter += 1
+    os.replace(path, target)
+    _segment_started.pop(path, None)
+    return target
+
+
+def _needs_rotation(path: Path, max_bytes: int, max_age_seconds: int) -> bool:
+    try:
+        size = path.stat().st_size
+    except FileNotFoundError:
+        return False
+    if size == 0:
+        return False
+    if max_bytes and size >= max_bytes:
+        return True
+    if max_age_seconds and time.time() - _segment_start(path) >= max_age_seconds:
+        return True
+    return False
+
+
+def append_event(
+    path: Path,
+    record: Dict[str, Any],
+    max_bytes: int = 0,
+    max_age_seconds: int = 0,
+    fsync: bool = False,
+) -> None:
+    """
+    Append one event to the active segment, rotating first if a limit is hit.
+    A limit of 0 disables that kind of rotation.
+    """
+    if _needs_rotation(path, max_bytes, max_age_seconds):
+        rotate(path)
+    line = json.dumps(record, separators=(",", ":"), ensure_ascii=False) + "\n"
+    # O_APPEND keeps concurrent single-line writes from interleaving.
+    with path.open("a", encoding="utf-8") as f:
+        f.write(line)
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+    _segment_started.setdefault(path, time.time())
+
+
+def _iter_jsonl(segment: Path) -> Iterator[Dict[str, Any]]:
+    with segment.open("r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _load_legacy(path: Path) -> List[Dict[str, Any]]:
+    legacy = legacy_path(path)
+    if legacy == path or not legacy.exists():
+        return []
+    with legacy.open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def iter_events(path: Path) -> Iterator[Dict[str, Any]]:
+    """
+    Stream every event, oldest first, across legacy, rotated and active files.
+    """
+    yield from _load_legacy(path)
+    for segment in rotated_segments(path):
+        yield from _iter_jsonl(segment)
+    if path.exists():
+        yield from _iter_jsonl(path)
+
+
+def _tail_lines(segment: Path, n: int) -> List[bytes]:
+    """
+    Return up to ``n`` last non-empty lines of a file, reading backwards in
+    blocks so the cost depends on ``n`` rather than the file size.
+    """
+    with segment.open("rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        buf = b""
+        while pos > 0 and buf.count(b"\n") <= n:
+            step = min(TAIL_BLOCK_SIZE, pos)
+            pos -= step
+            f.seek(pos)
+            buf = f.read(step) + buf
+    lines = [line for line in buf.split(b"\n") if line.strip()]
+    if pos > 0:
+        # The first line may be partial; there are enough complete ones after it.
+        lines = lines[1:]
+    return lines[-n:]
+
+
+def tail_events(path: Path, n: int = 50) -> List[Dict[str, Any]]:
+    """
+    Return the last ``n`` events, oldest first, without parsing full history.
+    """
+    if n <= 0:
+        return []
+    collected: List[Dict[str, Any]] = []
+    segments = rotated_segments(path)
+    if path.exists():
+        segments.append(path)
+    for segment in reversed(segments):
+        need = n - len(collected)
+        lines = _tail_lines(segment, need)
+        collected = [json.loads(line) for line in lines] + collected
+        if len(collected) >= n:
+            return collected[-n:]
+    legacy = _load_legacy(path)
+    return (legacy + collected)[-n:]
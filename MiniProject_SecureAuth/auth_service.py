@@ -0,0 +1,238 @@
+"""
+Asyncio network front-end for the Secure Authentication System.
+
+Clients connect over TCP (default 127.0.0.1:8765) or a Unix socket and send
+one JSON object per line. Each request gets one JSON response line:
+
+    {"op": "register", "username": "alice", "password": "..."}
+    {"op": "login",    "username": "alice", "password": "..."}
+    {"op": "audit",    "limit": 50}
+    {"op": "audit",    "username": "alice", "event": "LOGIN_FAIL", "since": "1h"}
+    {"op": "metrics"}
+
+    -> {"ok": true, "message": "...", "id": <echoed if given>}
+       audit responses also carry "events": [...]
+       metrics responses carry "text" (Prometheus exposition format)
+
+Argon2 hashing and verification run on the shared HashPool and are awaited,
+so the event loop keeps serving other connections while a hash is computed.
+User-state changes (lockout counters, records, audit appends) run one at a
+time on a single state thread, so they never race with each other and file
+writes do not block the event loop. Requests wait up to
+QUEUE_TIMEOUT seconds for a free pool slot and are then rejected with
+"Server busy" instead of queueing forever.
+
+Run with:
+    python auth_service.py [--host 127.0.0.1] [--port 8765] [--unix PATH]
+
+The SQLite backend (SECURE_AUTH_BACKEND=sqlite) is recommended, since the
+JSON backend rewrites the whole user file on every change.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict
+
+from argon2 import exceptions as argon2_exceptions
+
+import audit_index
+import hash_pool
+import metrics
+import secure_auth_app as app
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_LINE_BYTES = 64 * 1024
+AUDIT_MAX_LIMIT = 1000
+QUEUE_TIMEOUT = 10.0       # Seconds a request may wait for a free hashing slot
+
+
+def parse_limit(value: Any) -> int:
+    """
+    Accept an integer or a string of digits; anything else is a ValueError.
+    """
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.strip().isdigit():
+        return int(value)
+    raise ValueError(f"limit must be an integer, not {value!r}")
+
+
+class AuthService:
+    def __init__(self, users: Dict[str, Any] | None = None):
+        self.users = app.load_users() if users is None else users
+        # Mirrors the pool's pending limit so waiting happens on the event
+        # loop rather than by blocking inside HashPool.submit.
+        self._slots = asyncio.Semaphore(app.HASH_MAX_PENDING)
+        # One thread, so state changes keep their order and never interleave.
+        self._state = ThreadPoolExecutor(max_workers=1, thread_name_prefix="auth-state")
+
+    def close(self) -> None:
+        self._state.shutdown(wait=True)
+
+    async def _in_state(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._state, fn, *args)
+
+    async def _offload(self, submit, *args):
+        try:
+            await asyncio.wait_for(self._slots.acquire(), QUEUE_TIMEOUT)
+        except asyncio.TimeoutError:
+            raise hash_pool.PoolSaturated("timed out waiting for a hashing slot") from None
+        try:
+            return await asyncio.wrap_future(submit(*args, timeout=0))
+        finally:
+            self._slots.release()
+
+    async def _hash(self, password: str) -> str:
+        with app.HASH_SECONDS.time("hash"):
+            return await self._offload(app.get_hash_pool().submit_hash, password)
+
+    async def _verify(self, password_hash: str, password: str) -> bool:
+        with app.HASH_SECONDS.time("verify"):
+            return await self._offload(app.get_hash_pool().submit_verify, password_hash, password)
+
+    async def register(self, username: str, password: str) -> Dict[str, Any]:
+        ok, msg, _ = app.validate_new_user(self.users, username, password)
+        if not ok:
+            return {"ok": False, "message": msg}
+        password_hash = await self._hash(password)
+
+        def create() -> bool:
+            # Another request may have taken the name while we were hashing.
+            if username in self.users:
+                return False
+            app.create_user(self.users, username, password_hash)
+            return True
+
+        if not await self._in_state(create):
+            return {"ok": False, "message": "That username already exists."}
+        return {"ok": True, "message": "Account created successfully."}
+
+    async def login(self, username: str, password: str, source: str = "local") -> Dict[str, Any]:
+        allowed, msg = await self._in_state(app.check_login_allowed, self.users, username, source)
+        if not allowed:
+            return {"ok": False, "message": msg}
+        try:
+            await self._verify(self.users[username]["password_hash"], password)
+        except argon2_exceptions.VerifyMismatchError:
+            msg = await self._in_state(app.record_login_failure, self.users, username, source)
+            return {"ok": False, "message": msg}
+        except argon2_exceptions.VerificationError as e:
+            return {"ok": False, "message": f"Verification error: {e}"}
+        if app.needs_rehash(self.users[username]["password_hash"]):
+            new_hash = await self._hash(password)
+            await self._in_state(app.apply_rehash, self.users, username, new_hash)
+        msg = await self._in_state(app.record_login_success, self.users, username, source)
+        return {"ok": True, "message": msg}
+
+    async def audit(self, limit: int, filters: Dict[str, Any] | None = None) -> Dict[str, Any]:
+        limit = max(0, min(limit, AUDIT_MAX_LIMIT))
+        loop = asyncio.get_running_loop()
+        if filters:
+            def run_query():
+                # Newest matches first from the index, returned oldest first like tail_log.
+                return list(app.query_log(limit=limit, newest_first=True, **filters))[::-1]
+            events = await loop.run_in_executor(None, run_query)
+        else:
+            events = await loop.run_in_executor(None, app.tail_log, limit)
+        return {"ok": True, "message": f"{len(events)} events", "events": events}
+
+    async def dispatch(self, request: Dict[str, Any], source: str = "local") -> Dict[str, Any]:
+        op = request.get("op")
+        try:
+            if op == "register":
+                return await self.register(str(request.get("username", "")).strip(), str(request.get("password", "")))
+            if op == "login":
+                return await self.login(str(request.get("username", "")).strip(), str(request.get("password", "")), source)
+            if op == "audit":
+                filters = {k: request[k] for k in ("username", "event") if request.get(k)}
+                for k in ("since", "until"):
+                    if request.get(k):
+                        filters[k] = audit_index.parse_time(str(request[k]))
+                return await self.audit(parse_limit(request.get("limit", app.LOG_TAIL_EVENTS)), filters)
+            if op == "metrics":
+                return {"ok": True, "message": "metrics", "text": metrics.REGISTRY.render_prometheus()}
+        except hash_pool.PoolSaturated:
+            return {"ok": False, "message": "Server busy, try again later."}
+        except ValueError as e:
+            return {"ok": False, "message": f"Invalid request: {e}"}
+        return {"ok": False, "message": f"Unknown operation: {op!r}"}
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        # Throttling is keyed by client address (Unix socket clients share "local").
+        peer = writer.get_extra_info("peername")
+        source = peer[0] if isinstance(peer, tuple) else "local"
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (asyncio.LimitOverrunError, ValueError):
+                    writer.write(b'{"ok": false, "message": "Request too large."}\n')
+                    break
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("request must be a JSON object")
+                except ValueError as e:
+                    response = {"ok": False, "message": f"Malformed request: {e}"}
+                else:
+                    response = await self.dispatch(request, source)
+                    if "id" in request:
+                        response["id"] = request["id"]
+                writer.write(json.dumps(response).encode("utf-8") + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, unix_path: str | None = None):
+        if unix_path:
+            return await asyncio.start_unix_server(self.handle_client, path=unix_path, limit=MAX_LINE_BYTES)
+        return await asyncio.start_server(self.handle_client, host, port, limit=MAX_LINE_BYTES)
+
+
+async def request(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, **payload: Any) -> Dict[str, Any]:
+    """
+    Send one request on an open connection and wait for its response.
+    """
+    writer.write(json.dumps(payload).encode("utf-8") + b"\n")
+    await writer.drain()
+    return json.loads(await reader.readline())
+
+
+async def serve(host: str, port: int, unix_path: str | None) -> None:
+    service = AuthService()
+    server = await service.start(host, port, unix_path)
+    where = unix_path or f"{host}:{port}"
+    print(f"SecureAuth service listening on {where} "
+          f"(backend={app.USERS_BACKEND}, hash workers={app.HASH_WORKERS})")
+    flusher = metrics.SnapshotFlusher(app.METRICS_FILE, app.METRICS_FLUSH_SECONDS).start()
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        flusher.stop()
+        service.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="SecureAuth asyncio service")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix", help="Listen on a Unix socket path instead of TCP")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        print("Shutting down.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""
+On-disk breached-password filter: a sorted, memory-mapped hash-prefix index.
+
+Each password is reduced to the first 8 bytes of its SHA-1 digest (the same
+hash Pwned Passwords publishes, so its "HASH:count" files can be used
+directly). The keys are stored sorted in one flat file:
+
+    header   16 bytes   b"BPWF", version, key size, 2 reserved, count (u64)
+    fanout   65537 x u32  index of the first key for each 2-byte prefix
+    keys     count x 8 bytes, sorted, unique
+
+A lookup reads two fanout entries and binary-searches the few keys sharing
+the 2-byte prefix (about 13 probes for 500 million entries), all through
+mmap, so only the touched pages are resident and no set is ever built in
+Python. With 64-bit keys the false-positive rate is about n / 2**64, i.e.
+effectively zero even for billion-entry corpora.
+
+build() streams its inputs into sorted runs on disk and merges them, so
+corpora larger than memory can be indexed.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import heapq
+import mmap
+import os
+import struct
+import tempfile
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator, List
+
+MAGIC = b"BPWF"
+VERSION = 1
+KEY_BYTES = 8
+HEADER = struct.Struct(">4sBB2xQ")
+FANOUT_ENTRIES = 65537
+FANOUT = struct.Struct(f">{FANOUT_ENTRIES}I")
+KEYS_OFFSET = HEADER.size + FANOUT.size
+HEX_DIGITS = frozenset(b"0123456789abcdefABCDEF")
+RUN_KEYS = 2_000_000        # keys sorted in memory per run while building
+
+
+def password_key(password: bytes | str) -> bytes:
+    if isinstance(password, str):
+        password = password.encode("utf-8")
+    return hashlib.sha1(password).digest()[:KEY_BYTES]
+
+
+def keys_from_lines(lines: Iterable[bytes], fmt: str = "auto") -> Iterator[bytes]:
+    """
+    Turn input lines into keys. ``fmt`` is "plain" (one password per line,
+    hashed as raw bytes), "sha1" (Pwned Passwords "HEX[:count]" lines) or
+    "auto", which treats 40-hex-digit lines as SHA-1. In "sha1" format a line
+    whose hash is not 40 hex digits raises ValueError.
+    """
+    for number, line in enumerate(lines, 1):
+        line = line.rstrip(b"\r\n")
+        if not line:
+            continue
+        head = line.split(b":", 1)[0]
+        is_sha1 = len(head) == 40 and _is_hex(head)
+        if fmt == "sha1" and not is_sha1:
+            raise ValueError(f"line {number}: expected a 40-hex-digit SHA-1 hash, got {head[:60]!r}")
+        if fmt == "sha1" or (fmt == "auto" and is_sha1):
+            yield bytes.fromhex(head[:KEY_BYTES * 2].decode("ascii"))
+        else:
+            yield password_key(line)
+
+
+def _is_hex(value: bytes) -> bool:
+    # Not bytes.fromhex: it skips whitespace, so "abcd abcd ..." would pass.
+    return all(c in HEX_DIGITS for c in value)
+
+
+def _write_run(keys: List[bytes], directory: str) -> str:
+    keys.sort()
+    fd, path = tempfile.mkstemp(suffix=".run", dir=directory)
+    with os.fdopen(fd, "wb") as f:
+        f.write(b"".join(keys))
+    return path
+
+
+def _read_run(path: str) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(KEY_BYTES * 8192)
+            if not block:
+                return
+            for i in range(0, len(block), KEY_BYTES):
+                yield block[i:i + KEY_BYTES]
+
+
+def build(keys: Iterable[bytes], out_path: Path, run_keys: int = RUN_KEYS) -> int:
+    """
+    Write a filter file from an iterable of 8-byte keys (any order, duplicates
+    allowed). Returns the number of unique keys stored.
+    """
+    out_path = Path(out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=out_path.parent) as tmp:
+        runs: List[str] = []
+        chunk: List[bytes] = []
+        for key in keys:
+            chunk.append(key)
+            if len(chunk) >= run_keys:
+                runs.append(_write_run(chunk, tmp))
+                chunk = []
+        if chunk or not runs:
+            runs.append(_write_run(chunk, tmp))
+
+        fanout = [0] * FANOUT_ENTRIES
+        count = 0
+        fd, tmp_out = tempfile.mkstemp(prefix=out_path.name, suffix=".tmp", dir=out_path.parent)
+        with os.fdopen(fd, "wb") as f:
+            f.seek(KEYS_OFFSET)
+            buffer: List[bytes] = []
+            previous = None
+            for key in heapq.merge(*(_read_run(r) for r in runs)):
+                if key == previous:
+                    continue
+                previous = key
+                fanout[(key[0] << 8 | key[1]) + 1] += 1
+                buffer.append(key)
+                count += 1
+                if len(buffer) >= 65536:
+                    f.write(b"".join(buffer))
+                    buffer = []
+            f.write(b"".join(buffer))
+            for i in range(1, FANOUT_ENTRIES):
+                fanout[i] += fanout[i - 1]
+            f.seek(0)
+            f.write(HEADER.pack(MAGIC, VERSION, KEY_BYTES, count))
+            f.write(FANOUT.pack(*fanout))
+        os.replace(tmp_out, out_path)
+    return count
+
+
+def build_from_files(paths: Iterable[Path], out_path: Path, fmt: str = "auto", run_keys: int = RUN_KEYS) -> int:
+    def all_keys() -> Iterator[bytes]:
+        for path in paths:
+            with Path(path).open("rb") as f:
+                try:
+                    yield from keys_from_lines(f, fmt)
+                except ValueError as e:
+                    raise ValueError(f"{path}: {e}") from None
+    return build(all_keys(), out_path, run_keys)
+
+
+class BreachFilter:
+    """
+    Read-only view of a filter file. ``password in filter`` checks the exact
+    password; contains_key() takes a precomputed 8-byte key.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._file: BinaryIO = self.path.open("rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, key_bytes, self.count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION or key_bytes != KEY_BYTES:
+            self.close()
+            raise ValueError(f"{self.path} is not a breached-password filter")
+        if len(self._map) != KEYS_OFFSET + self.count * KEY_BYTES:
+            self.close()
+            raise ValueError(f"{self.path} is truncated")
+
+    def close(self) -> None:
+        if not self._map.closed:
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self) -> "BreachFilter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def contains_key(self, key: bytes) -> bool:
+        m = self._map
+        slot = HEADER.size + (key[0] << 8 | key[1]) * 4
+        lo, hi = struct.unpack_from(">II", m, slot)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            offset = KEYS_OFFSET + mid * KEY_BYTES
+            probe = m[offset:offset + KEY_BYTES]
+            if probe < key:
+                lo = mid + 1
+            elif probe > key:
+                hi = mid
+            else:
+                return True
+        return False
+
+    def __contains__(self, password: object) -> bool:
+        if not isinstance(password, (str, bytes)):
+            return False
+        return self.contains_key(password_key(password))
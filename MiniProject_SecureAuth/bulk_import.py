@@ -0,0 +1,148 @@
+"""
+Streaming bulk import of user accounts from CSV or JSON Lines.
+
+Each input row names a user and either a plaintext ``password`` or a
+``bcrypt_hash`` (``hash`` is accepted too, matching the Week03 AuthSystem
+records written by AuthSystem.export_users):
+
+    username,password
+    alice,correct horse battery staple
+
+    {"username": "bob", "bcrypt_hash": "$2b$12$..."}
+
+Rows are read lazily and processed in batches. Within a batch, plaintext
+passwords are checked with password_is_acceptable and then hashed on the
+shared HashPool in parallel; bcrypt hashes are wrapped with Argon2id (see
+legacy_bcrypt) and upgraded on the user's next successful login. Each batch
+is committed with one store write and one BULK_IMPORT audit entry, instead
+of a full save and log append per user.
+
+Existing usernames and repeated rows are rejected, never overwritten. A
+``secret`` column (the Week03 TOTP seed) is kept on the record as
+``totp_secret``.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+import legacy_bcrypt
+import secure_auth_app as app
+
+BATCH_SIZE = 256
+AUDIT_USER = "system"
+
+Row = Tuple[int, Dict[str, Any] | None]   # (line number, parsed row or None if malformed)
+
+
+def read_rows(path: Path, fmt: str | None = None) -> Iterator[Row]:
+    """
+    Yield rows from a CSV (with a header line) or JSONL file. The format is
+    taken from the file suffix unless ``fmt`` is given.
+    """
+    path = Path(path)
+    fmt = fmt or ("csv" if path.suffix.lower() == ".csv" else "jsonl")
+    with path.open("r", encoding="utf-8", newline="") as f:
+        if fmt == "csv":
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+        elif fmt == "jsonl":
+            for line_no, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    row = None
+                yield line_no, row if isinstance(row, dict) else None
+        else:
+            raise ValueError(f"Unknown import format: {fmt}")
+
+
+def _batches(rows: Iterable[Row], size: int) -> Iterator[List[Row]]:
+    batch: List[Row] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _check_row(users: Dict[str, Any], seen: set, row: Dict[str, Any] | None) -> str:
+    """
+    Return a rejection reason, or "" if the row can be imported.
+    """
+    if row is None:
+        return "Malformed row."
+    username = str(row.get("username") or "").strip()
+    if not username:
+        return "Username cannot be empty."
+    if username in seen or username in users:
+        return "That username already exists."
+    legacy = row.get("bcrypt_hash") or row.get("hash")
+    if legacy:
+        return "" if legacy_bcrypt.is_bcrypt_hash(legacy) else "Unrecognised bcrypt hash."
+    if not row.get("password"):
+        return "Row has neither a password nor a bcrypt hash."
+    ok, msg, _ = app.password_is_acceptable(row["password"])
+    return "" if ok else msg
+
+
+def import_users(
+    users: Dict[str, Any],
+    rows: Iterable[Row],
+    batch_size: int = BATCH_SIZE,
+    source: str = "import",
+) -> Dict[str, Any]:
+    """
+    Import rows into the configured store. Returns a report with the counts
+    of imported, legacy (wrapped bcrypt) and rejected rows, the number of
+    batches committed and a list of (line, username, reason) rejections.
+    """
+    pool = app.get_hash_pool()
+    report: Dict[str, Any] = {"imported": 0, "legacy": 0, "rejected": 0, "batches": 0, "errors": []}
+    seen: set = set()
+    for batch in _batches(rows, batch_size):
+        pending = []
+        rejected = 0
+        for line, row in batch:
+            reason = _check_row(users, seen, row)
+            if reason:
+                rejected += 1
+                report["errors"].append((line, (row or {}).get("username"), reason))
+                continue
+            username = str(row["username"]).strip()
+            seen.add(username)
+            legacy = row.get("bcrypt_hash") or row.get("hash")
+            if legacy:
+                future = pool.submit_wrap_bcrypt(legacy)
+            else:
+                future = pool.submit_hash(row["password"])
+            pending.append((username, future, row))
+
+        created_at = app.now_iso()
+        records = {}
+        legacy_count = 0
+        for username, future, row in pending:
+            records[username] = record = app.new_user_record(future.result(), created_at)
+            if row.get("secret"):
+                record["totp_secret"] = row["secret"]
+            legacy_count += legacy_bcrypt.is_wrapped(record["password_hash"])
+        if records:
+            app.create_users(users, records)
+        app.append_log(
+            AUDIT_USER, "BULK_IMPORT",
+            f"Imported {len(records)} accounts ({legacy_count} legacy bcrypt) from {source}; "
+            f"{rejected} rows rejected.",
+        )
+        report["imported"] += len(records)
+        report["legacy"] += legacy_count
+        report["rejected"] += rejected
+        report["batches"] += 1
+    return report
@@ -0,0 +1,132 @@
+"""
+Bounded executor for Argon2 hashing and verification.
+
+Argon2id is deliberately slow, so running it inline limits a process to a
+handful of logins per second. HashPool spreads the work across cores:
+
+- "thread" mode (default) uses a thread pool. argon2-cffi releases the GIL
+  while the Argon2 core runs, so threads scale with the number of cores.
+- "process" mode uses a process pool, for interpreters or builds where the
+  GIL is not released.
+
+At most ``max_pending`` jobs may be queued or running. When the pool is full,
+submitting blocks for up to ``timeout`` seconds and then raises PoolSaturated,
+so callers get backpressure instead of an unbounded backlog.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Iterable, List, Tuple
+
+from argon2 import PasswordHasher, exceptions as argon2_exceptions
+
+import legacy_bcrypt
+
+
+class PoolSaturated(Exception):
+    """Raised when the pool's pending-job limit is reached."""
+
+
+# Process workers rebuild the hasher once in the initializer instead of
+# receiving it with every job.
+_worker_ph: PasswordHasher | None = None
+
+
+def _init_worker(ph: PasswordHasher) -> None:
+    global _worker_ph
+    _worker_ph = ph
+
+
+def _hash_job(ph: PasswordHasher | None, password: str) -> str:
+    return (ph or _worker_ph).hash(password)
+
+
+def _verify_job(ph: PasswordHasher | None, password_hash: str, password: str) -> bool:
+    if legacy_bcrypt.is_wrapped(password_hash):
+        return legacy_bcrypt.verify(ph or _worker_ph, password_hash, password)
+    return (ph or _worker_ph).verify(password_hash, password)
+
+
+def _wrap_job(ph: PasswordHasher | None, bcrypt_hash: str) -> str:
+    return legacy_bcrypt.wrap(ph or _worker_ph, bcrypt_hash)
+
+
+class HashPool:
+    def __init__(
+        self,
+        ph: PasswordHasher,
+        workers: int | None = None,
+        max_pending: int | None = None,
+        mode: str = "thread",
+    ):
+        self.ph = ph
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.workers * 4
+        self.mode = mode
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        if mode == "thread":
+            self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="argon2")
+            self._job_ph = ph
+        elif mode == "process":
+            self._executor = ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(ph,))
+            self._job_ph = None
+        else:
+            raise ValueError(f"Unknown hash pool mode: {mode}")
+
+    def _submit(self, fn, *args, timeout: float | None = None) -> Future:
+        if not self._slots.acquire(timeout=timeout):
+            raise PoolSaturated(f"{self.max_pending} hashing jobs already pending")
+        try:
+            future = self._executor.submit(fn, self._job_ph, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def submit_hash(self, password: str, timeout: float | None = None) -> Future:
+        """
+        Queue ph.hash(password). The future resolves to the encoded hash.
+        """
+        return self._submit(_hash_job, password, timeout=timeout)
+
+    def submit_verify(self, password_hash: str, password: str, timeout: float | None = None) -> Future:
+        """
+        Queue ph.verify(password_hash, password). The future resolves to True
+        or raises the same argon2 exceptions as ph.verify. Wrapped bcrypt
+        hashes (see legacy_bcrypt) are verified through the bcrypt step first.
+        """
+        return self._submit(_verify_job, password_hash, password, timeout=timeout)
+
+    def submit_wrap_bcrypt(self, bcrypt_hash: str, timeout: float | None = None) -> Future:
+        """
+        Queue legacy_bcrypt.wrap(ph, bcrypt_hash) for an imported bcrypt hash.
+        """
+        return self._submit(_wrap_job, bcrypt_hash, timeout=timeout)
+
+    def hash_many(self, passwords: Iterable[str]) -> List[str]:
+        """
+        Hash a batch of passwords in parallel, preserving input order.
+        """
+        futures = [self.submit_hash(p) for p in passwords]
+        return [f.result() for f in futures]
+
+    def verify_many(self, pairs: Iterable[Tuple[str, str]]) -> List[bool]:
+        """
+        Verify a batch of (password_hash, password) pairs in parallel.
+        Mismatches and malformed hashes both yield False.
+        """
+        futures = [self.submit_verify(h, p) for h, p in pairs]
+        results = []
+        for f in futures:
+            try:
+                results.append(f.result())
+            except (argon2_exceptions.VerificationError, argon2_exceptions.InvalidHashError):
+                results.append(False)
+        return results
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
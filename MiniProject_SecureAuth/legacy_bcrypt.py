@@ -0,0 +1,60 @@
+"""
+Wrapped bcrypt hashes for accounts migrated from the Week03 AuthSystem.
+
+Imported bcrypt hashes cannot be converted to Argon2id without the
+password, so they are stored "wrapped": the whole bcrypt hash is hashed
+again with Argon2id, and the bcrypt salt/cost prefix is kept alongside so
+the bcrypt step can be repeated at login:
+
+    $bcrypt-argon2id<29-char bcrypt prefix, e.g. $2b$12$...><argon2id hash>
+
+Verification computes bcrypt(password, prefix) and checks it against the
+Argon2id layer, so a leaked store never exposes the weaker bcrypt hashes.
+needs_rehash() in the app treats wrapped hashes as outdated, so the first
+successful login replaces them with a plain Argon2id hash.
+
+bcrypt is imported lazily; it is only required while wrapped hashes remain.
+"""
+
+from __future__ import annotations
+
+import re
+
+from argon2 import PasswordHasher
+
+PREFIX = "$bcrypt-argon2id"
+BCRYPT_RE = re.compile(r"^\$2[abxy]\$\d{2}\$[./A-Za-z0-9]{53}$")
+SALT_LENGTH = 29          # "$2b$12$" + 22 salt characters
+BCRYPT_MAX_BYTES = 72     # bcrypt ignores anything past 72 bytes
+
+
+def is_bcrypt_hash(value: str) -> bool:
+    return bool(BCRYPT_RE.match(value))
+
+
+def is_wrapped(password_hash: str) -> bool:
+    return password_hash.startswith(PREFIX + "$2")
+
+
+def wrap(ph: PasswordHasher, bcrypt_hash: str) -> str:
+    """
+    Return the wrapped form of a bcrypt hash. Raises ValueError if it is not
+    a bcrypt hash.
+    """
+    if not is_bcrypt_hash(bcrypt_hash):
+        raise ValueError("not a bcrypt hash")
+    return PREFIX + bcrypt_hash[:SALT_LENGTH] + ph.hash(bcrypt_hash)
+
+
+def verify(ph: PasswordHasher, password_hash: str, password: str) -> bool:
+    """
+    Verify a password against a wrapped hash. Raises the same exceptions as
+    ph.verify (VerifyMismatchError on a wrong password).
+    """
+    import bcrypt
+
+    rest = password_hash[len(PREFIX):]
+    salt, inner = rest[:SALT_LENGTH], rest[SALT_LENGTH:]
+    # Older bcrypt releases truncated long passwords silently; newer ones raise.
+    secret = password.encode("utf-8")[:BCRYPT_MAX_BYTES]
+    return ph.verify(inner, bcrypt.hashpw(secret, salt.encode("ascii")).decode("ascii"))
@@ -0,0 +1,213 @@
+"""
+Lightweight in-process metrics: counters, histograms and phase timers.
+
+Designed to stay on in production: recording a value is a lock, an add and
+(for histograms) a bisect over a short bucket list, so the cost per event
+is around a microsecond. Metrics can be exported in two ways:
+
+- render_prometheus(): Prometheus text exposition format.
+- SnapshotFlusher: a daemon thread that periodically writes snapshot() as
+  JSON to a file (atomically, via a temp file and rename).
+
+Usage:
+    LOGINS = REGISTRY.counter("auth_logins_total", "Successful logins")
+    LOGINS.inc()
+
+    PHASE = REGISTRY.histogram("auth_phase_seconds", "Time per phase", labels=("phase",))
+    with PHASE.time("save"):
+        ...
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+
+# Seconds; spans fast storage writes up to slow Argon2 parameter sets.
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def _label_str(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{v}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {} if labels else {(): 0.0}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def value(self, *label_values: str) -> float:
+        return self._values.get(label_values, 0.0)
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        for key, value in sorted(self._values.items()):
+            yield f"{self.name}{_label_str(self.label_names, key)} {value:g}"
+
+    def snapshot(self) -> Any:
+        if not self.label_names:
+            return self._values[()]
+        return {",".join(k): v for k, v in sorted(self._values.items())}
+
+
+class _Timer:
+    __slots__ = ("hist", "labels", "start")
+
+    def __init__(self, hist: "Histogram", labels: Tuple[str, ...]):
+        self.hist = hist
+        self.labels = labels
+
+    def __enter__(self) -> "_Timer":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.hist.observe(time.perf_counter() - self.start, *self.labels)
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (+Inf last), sum, count]
+        self._series: Dict[Tuple[str, ...], List[Any]] = {}
+        self._lock = threading.Lock()
+
+    def _new_series(self) -> List[Any]:
+        return [[0] * (len(self.buckets) + 1), 0.0, 0]
+
+    def observe(self, value: float, *label_values: str) -> None:
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = self._new_series()
+            series[0][idx] += 1
+            series[1] += value
+            series[2] += 1
+
+    def time(self, *label_values: str) -> _Timer:
+        """
+        Context manager that observes the elapsed wall-clock time.
+        """
+        return _Timer(self, label_values)
+
+    def count(self, *label_values: str) -> int:
+        series = self._series.get(label_values)
+        return series[2] if series else 0
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        for key, (counts, total, count) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                le_label = f'le="{le}"'
+                yield f"{self.name}_bucket{_label_str(self.label_names, key, le_label)} {cumulative}"
+            yield f"{self.name}_sum{_label_str(self.label_names, key)} {total:.6f}"
+            yield f"{self.name}_count{_label_str(self.label_names, key)} {count}"
+
+    def snapshot(self) -> Dict[str, Any]:
+        out = {}
+        for key, (counts, total, count) in sorted(self._series.items()):
+            out[",".join(key) or "all"] = {
+                "count": count,
+                "sum_s": round(total, 6),
+                "mean_ms": round(total / count * 1000, 4) if count else 0.0,
+                "buckets": {("+Inf" if i == len(self.buckets) else f"{self.buckets[i]:g}"): n for i, n in enumerate(counts)},
+            }
+        return out
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self.started = time.time()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labels))
+
+    def histogram(self, name: str, help_text: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, labels, buckets))
+
+    def render_prometheus(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "uptime_s": round(time.time() - self.started, 3),
+            "metrics": {name: m.snapshot() for name, m in self._metrics.items()},
+        }
+
+
+REGISTRY = Registry()
+
+
+def write_snapshot(path: Path, registry: Registry = REGISTRY) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=path.name, suffix=".tmp", dir=path.parent)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(registry.snapshot(), f, indent=2)
+    os.replace(tmp, path)
+
+
+class SnapshotFlusher:
+    """
+    Daemon thread writing a JSON snapshot every ``interval`` seconds, plus a
+    final one on stop().
+    """
+
+    def __init__(self, path: Path, interval: float = 15.0, registry: Registry = REGISTRY):
+        self.path = Path(path)
+        self.interval = interval
+        self.registry = registry
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="metrics-flush", daemon=True)
+
+    def start(self) -> "SnapshotFlusher":
+        self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            write_snapshot(self.path, self.registry)
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        write_snapshot(self.path, self.registry)
@@ -0,0 +1,213 @@
+"""
+In-memory login throttling and lockout engine.
+
+Two kinds of state are kept, both in plain dicts with O(1) updates:
+
+- Per source (client address, "local" for the CLI): a token bucket. Each
+  login attempt takes a token before Argon2 runs and a successful login
+  gives it back, so only failures drain the bucket. A credential-stuffing
+  burst from one source is rejected without spending any hashing time.
+- Per username: a failure counter and a lockout deadline. The account
+  locks when ``threshold`` failures arrive without an intervening success
+  or ``failure_window`` seconds of quiet, and stays locked for
+  ``lockout_seconds``.
+
+Idle entries are reclaimed by a hashed timing wheel, so memory stays
+proportional to recently active users and sources and expiry never scans
+the whole table. All times are wall-clock epoch seconds (the same clock
+as the persisted ``locked_until`` timestamps).
+
+The limiter is not thread-safe by itself; callers serialise access (the
+CLI is single-threaded, and AuthService runs every call that touches it on
+its single ``auth-state`` executor thread).
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Callable, Dict, Hashable, List, Set, Tuple
+
+
+class TimingWheel:
+    """
+    Hashed timing wheel. schedule/cancel are O(1); advance() touches only the
+    slots that have elapsed. Deadlines further away than one revolution are
+    re-inserted when their slot comes round.
+    """
+
+    def __init__(self, slots: int = 512, tick: float = 1.0, now: float = 0.0):
+        self.tick = tick
+        self._slots: List[Set[Hashable]] = [set() for _ in range(slots)]
+        self._where: Dict[Hashable, int] = {}
+        self._deadlines: Dict[Hashable, float] = {}
+        self._cursor = int(now // tick)
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def _insert(self, key: Hashable, deadline: float) -> None:
+        slot_tick = max(int(deadline // self.tick), self._cursor + 1)
+        idx = slot_tick % len(self._slots)
+        self._slots[idx].add(key)
+        self._where[key] = idx
+        self._deadlines[key] = deadline
+
+    def schedule(self, key: Hashable, deadline: float) -> None:
+        self.cancel(key)
+        self._insert(key, deadline)
+
+    def cancel(self, key: Hashable) -> None:
+        idx = self._where.pop(key, None)
+        if idx is not None:
+            self._slots[idx].discard(key)
+            del self._deadlines[key]
+
+    def advance(self, now: float) -> List[Hashable]:
+        """
+        Move the wheel to ``now`` and return the keys whose deadline has passed.
+        """
+        target = int(now // self.tick)
+        steps = min(target - self._cursor, len(self._slots))
+        expired: List[Hashable] = []
+        for step in range(1, steps + 1):
+            idx = (self._cursor + step) % len(self._slots)
+            bucket, self._slots[idx] = self._slots[idx], set()
+            for key in bucket:
+                del self._where[key]
+                deadline = self._deadlines.pop(key)
+                if deadline <= now:
+                    expired.append(key)
+                else:
+                    self._insert(key, deadline)
+        self._cursor = max(self._cursor, target)
+        return expired
+
+
+class LoginLimiter:
+    def __init__(
+        self,
+        threshold: int,
+        lockout_seconds: float,
+        failure_window: float | None = None,
+        source_burst: float = 10,
+        source_refill_per_second: float = 0.5,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.threshold = threshold
+        self.lockout_seconds = lockout_seconds
+        self.failure_window = failure_window or lockout_seconds
+        self.source_burst = source_burst
+        self.source_refill = source_refill_per_second
+        self.clock = clock
+        self._failures: Dict[str, int] = {}
+        self._locks: Dict[str, float] = {}          # username -> locked_until (0.0 = known, not locked)
+        self._buckets: Dict[str, List[float]] = {}  # source -> [tokens, last_update]
+        self._wheel = TimingWheel(now=clock())
+
+    # Expiry
+
+    def _expire(self, now: float) -> None:
+        for kind, name in self._wheel.advance(now):
+            if kind == "user":
+                self._failures.pop(name, None)
+                self._locks.pop(name, None)
+            else:
+                self._buckets.pop(name, None)
+
+    def _touch_user(self, username: str, now: float) -> None:
+        # Keep user state until both the lock and the failure window have passed.
+        deadline = max(self._locks.get(username, 0.0), now + self.failure_window)
+        self._wheel.schedule(("user", username), deadline)
+
+    # Per-source token buckets
+
+    def _tokens(self, source: str, now: float) -> List[float]:
+        bucket = self._buckets.get(source)
+        if bucket is None:
+            bucket = self._buckets[source] = [float(self.source_burst), now]
+        else:
+            bucket[0] = min(self.source_burst, bucket[0] + (now - bucket[1]) * self.source_refill)
+            bucket[1] = now
+        # Forget the bucket once it would have refilled completely.
+        refill_time = (self.source_burst - bucket[0]) / self.source_refill if self.source_refill else 0
+        self._wheel.schedule(("source", source), now + max(refill_time, self._wheel.tick))
+        return bucket
+
+    # Per-user lockout
+
+    def knows(self, username: str) -> bool:
+        """
+        True if the user's persisted lock state has already been loaded.
+        """
+        return username in self._locks
+
+    def load(self, username: str, locked_until: float | None, failed_attempts: int = 0) -> None:
+        """
+        Seed state from a stored user record (called once per user per expiry period).
+        """
+        now = self.clock()
+        self._locks[username] = locked_until or 0.0
+        if failed_attempts:
+            self._failures[username] = failed_attempts
+        self._touch_user(username, now)
+
+    def lock_remaining(self, username: str) -> int:
+        """
+        Seconds left on an active lockout (0 if not locked).
+        """
+        now = self.clock()
+        return max(0, int(self._locks.get(username, 0.0) - now))
+
+    def check(self, username: str, source: str) -> Tuple[bool, str, int]:
+        """
+        Decide whether an attempt may proceed to password verification.
+        Returns (allowed, reason, retry_after_seconds), where reason is
+        "" / "rate_limited" / "locked". An allowed attempt takes one token
+        from the source bucket.
+        """
+        now = self.clock()
+        self._expire(now)
+        bucket = self._tokens(source, now)
+        if bucket[0] < 1:
+            wait = (1 - bucket[0]) / self.source_refill if self.source_refill else self.lockout_seconds
+            return False, "rate_limited", max(1, int(wait + 0.999))
+        locked_until = self._locks.get(username, 0.0)
+        if locked_until > now:
+            return False, "locked", max(int(locked_until - now), 0)
+        if locked_until:
+            # Lock has expired: start counting afresh.
+            self._locks[username] = 0.0
+            self._failures.pop(username, None)
+        bucket[0] -= 1
+        return True, "", 0
+
+    def record_failure(self, username: str, source: str, attempts: int | None = None) -> Tuple[int, float | None]:
+        """
+        Count a wrong password. Returns (failures, locked_until); locked_until
+        is set only on the attempt that crosses the threshold. ``attempts``
+        is the count from a shared store, if there is one; it replaces the
+        in-memory count so that every process sees the same total.
+        """
+        now = self.clock()
+        if attempts is None:
+            attempts = self._failures.get(username, 0) + 1
+        self._failures[username] = attempts
+        newly_locked = None
+        if attempts >= self.threshold and self._locks.get(username, 0.0) <= now:
+            newly_locked = now + self.lockout_seconds
+            self._locks[username] = newly_locked
+        else:
+            self._locks.setdefault(username, 0.0)
+        self._touch_user(username, now)
+        return attempts, newly_locked
+
+    def record_success(self, username: str, source: str) -> None:
+        """
+        Clear the user's failures and return the source's token.
+        """
+        now = self.clock()
+        self._failures.pop(username, None)
+        self._locks[username] = 0.0
+        self._touch_user(username, now)
+        bucket = self._tokens(source, now)
+        bucket[0] = min(self.source_burst, bucket[0] + 1)
@@ -0,0 +1,54 @@
+"""
+Query the audit log through its secondary indexes and stream the results.
+
+Usage examples:
+    python scripts/audit_query.py --user alice --event LOGIN_FAIL --since 1h
+    python scripts/audit_query.py --event ACCOUNT_LOCKED --since 2025-12-09T00:00:00Z --format csv > locks.csv
+    python scripts/audit_query.py --user alice --count
+
+--since/--until accept ISO timestamps, epoch seconds or relative ages
+(90s, 15m, 1h, 7d). The index is brought up to date before each query, which
+only parses events appended since the previous run.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import audit_index
+
+parser = argparse.ArgumentParser(description="Indexed audit log query")
+parser.add_argument("--log", type=Path, default=Path("audit_log.jsonl"), help="Active audit log file")
+parser.add_argument("--user", help="Only events for this username")
+parser.add_argument("--event", help="Only this event type (e.g. LOGIN_FAIL)")
+parser.add_argument("--since", help="Start time (inclusive)")
+parser.add_argument("--until", help="End time (exclusive)")
+parser.add_argument("--limit", type=int, help="Maximum events to return")
+parser.add_argument("--newest-first", action="store_true")
+parser.add_argument("--format", choices=["jsonl", "csv"], default="jsonl")
+parser.add_argument("--count", action="store_true", help="Print only the number of matches")
+parser.add_argument("--out", type=Path, help="Write to a file instead of stdout")
+args = parser.parse_args()
+
+filters = {
+    "username": args.user,
+    "event": args.event,
+    "since": audit_index.parse_time(args.since) if args.since else None,
+    "until": audit_index.parse_time(args.until) if args.until else None,
+}
+
+with audit_index.AuditIndex(args.log) as index:
+    added = index.refresh()
+    print(f"Indexed {added} new events.", file=sys.stderr)
+    if args.count:
+        count = index.count(**filters)
+        print(count if args.limit is None else min(count, args.limit))
+        sys.exit(0)
+    events = index.query(limit=args.limit, newest_first=args.newest_first, **filters)
+    writer = audit_index.write_csv if args.format == "csv" else audit_index.write_jsonl
+    if args.out:
+        with args.out.open("w", newline="", encoding="utf-8") as out:
+            n = writer(events, out)
+    else:
+        n = writer(events, sys.stdout)
+    print(f"{n} events written.", file=sys.stderr)
@@ -0,0 +1,243 @@
+"""
+Load-generation and latency benchmark for register/login/lockout flows.
+
+Usage:
+    python scripts/bench_auth_flows.py [--users 10000] [--requests 2000]
+        [--mix success=0.6,fail=0.2,lockout=0.1,register=0.1] [--backend json|sqlite]
+        [--argon2 default|fast] [--out bench_auth_results.json]
+
+The harness works in a temporary directory. It seeds N synthetic users
+(sharing one precomputed hash so that seeding does not take hours) and then
+replays a random mix of:
+
+- success: correct password for a random user
+- fail:    wrong password for a random user
+- lockout: wrong password for a small set of victim accounts, which soon
+           lock and are then rejected before Argon2 runs
+- register: a new account via register_account (policy check + hash)
+
+Each request is timed end to end, and time spent in each phase is recorded
+separately: load (load_users), hash_verify (Argon2), save (user store writes),
+audit (audit log appends) and lockout_check (throttle and lockout checks). Results are printed
+as a table and written as JSON so runs can be compared over time.
+"""
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from argon2 import PasswordHasher
+
+import secure_auth_app as app
+
+PASSWORD = "Str0ng!Passphrase123"
+PHASES = ("load", "hash_verify", "save", "audit", "lockout_check")
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    k = (len(ordered) - 1) * pct / 100
+    lo, hi = int(k), min(int(k) + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def summarise(samples):
+    return {
+        "count": len(samples),
+        "total_s": round(sum(samples), 6),
+        "mean_ms": round(statistics.fmean(samples) * 1000, 4) if samples else 0.0,
+        "p50_ms": round(percentile(samples, 50) * 1000, 4),
+        "p95_ms": round(percentile(samples, 95) * 1000, 4),
+        "p99_ms": round(percentile(samples, 99) * 1000, 4),
+    }
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight)
+    unknown = set(mix) - {"success", "fail", "lockout", "register"}
+    if unknown:
+        raise SystemExit(f"Unknown scenario(s) in --mix: {', '.join(sorted(unknown))}")
+    return mix
+
+
+class PhaseTimer:
+    """
+    Wraps module-level functions in secure_auth_app to accumulate per-phase time.
+    """
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self._originals = {}
+
+    def wrap(self, name, phase):
+        original = getattr(app, name)
+        self._originals[name] = original
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                self.samples[phase].append(time.perf_counter() - start)
+
+        setattr(app, name, timed)
+
+    def restore(self):
+        for name, original in self._originals.items():
+            setattr(app, name, original)
+
+
+def seed_users(count, password_hash):
+    created = app.now_iso()
+    records = {
+        f"user{i:07d}": {
+            "password_hash": password_hash,
+            "created_at": created,
+            "last_login": None,
+            "failed_attempts": 0,
+            "locked_until": None,
+        }
+        for i in range(count)
+    }
+    app.get_store().put_many(records)
+    return list(records)
+
+
+def run(args):
+    mix = parse_mix(args.mix)
+    if args.argon2 == "fast":
+        app.ph = PasswordHasher(time_cost=1, memory_cost=1024, parallelism=1)
+    rng = random.Random(args.seed)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app.USERS_BACKEND = args.backend
+        app.USERS_FILE = Path(tmp) / "auth_data.json"
+        app.USERS_DB_FILE = Path(tmp) / "auth_data.db"
+        app.LOG_FILE = Path(tmp) / "audit_log.jsonl"
+
+        start = time.perf_counter()
+        password_hash = app.ph.hash(PASSWORD)
+        usernames = seed_users(args.users, password_hash)
+        seed_seconds = time.perf_counter() - start
+        victims = usernames[: max(1, args.victims)]
+
+        timer = PhaseTimer()
+        timer.wrap("load_users", "load")
+        timer.wrap("verify_password", "hash_verify")
+        timer.wrap("hash_password", "hash_verify")
+        timer.wrap("save_user", "save")
+        timer.wrap("append_log", "audit")
+        timer.wrap("check_login_allowed", "lockout_check")
+        try:
+            users = app.load_users()
+            scenarios = list(mix)
+            weights = [mix[s] for s in scenarios]
+            latencies = defaultdict(list)
+            outcomes = defaultdict(int)
+
+            bench_start = time.perf_counter()
+            for i in range(args.requests):
+                scenario = rng.choices(scenarios, weights)[0]
+                if scenario == "register":
+                    t0 = time.perf_counter()
+                    ok, _ = app.register_account(users, f"new{i:07d}", PASSWORD)
+                    latencies[scenario].append(time.perf_counter() - t0)
+                    outcomes["registered" if ok else "failed"] += 1
+                    continue
+                if scenario == "success":
+                    username, password = rng.choice(usernames), PASSWORD
+                elif scenario == "fail":
+                    username, password = rng.choice(usernames), "wrong-password"
+                else:
+                    username, password = rng.choice(victims), "wrong-password"
+                s = rng.randrange(args.sources)
+                source = f"10.0.{s // 256}.{s % 256}"
+                t0 = time.perf_counter()
+                ok, msg = app.authenticate(users, username, password, source)
+                latencies[scenario].append(time.perf_counter() - t0)
+                if "currently locked" in msg:
+                    outcomes["locked_rejections"] += 1
+                elif "Too many" in msg:
+                    outcomes["throttled"] += 1
+                else:
+                    outcomes["ok" if ok else "failed"] += 1
+            bench_seconds = time.perf_counter() - bench_start
+        finally:
+            timer.restore()
+            app.get_store().close()
+
+    all_latencies = [x for samples in latencies.values() for x in samples]
+    return {
+        "timestamp_utc": app.now_iso(),
+        "config": {
+            "users": args.users,
+            "requests": args.requests,
+            "mix": mix,
+            "victims": len(victims),
+            "sources": args.sources,
+            "backend": args.backend,
+            "argon2": {
+                "time_cost": app.ph.time_cost,
+                "memory_cost_kib": app.ph.memory_cost,
+                "parallelism": app.ph.parallelism,
+            },
+            "lockout_threshold": app.LOCKOUT_THRESHOLD,
+            "seed": args.seed,
+        },
+        "host": {"python": platform.python_version(), "machine": platform.machine(), "system": platform.system()},
+        "seed_seconds": round(seed_seconds, 4),
+        "elapsed_seconds": round(bench_seconds, 4),
+        "throughput_rps": round(args.requests / bench_seconds, 2) if bench_seconds else 0.0,
+        "outcomes": dict(outcomes),
+        "latency": {"all": summarise(all_latencies), **{s: summarise(v) for s, v in latencies.items()}},
+        "phases": {phase: summarise(timer.samples.get(phase, [])) for phase in PHASES},
+    }
+
+
+def print_report(result):
+    cfg = result["config"]
+    print(f"Users: {cfg['users']}  requests: {cfg['requests']}  backend: {cfg['backend']}  "
+          f"argon2 t={cfg['argon2']['time_cost']} m={cfg['argon2']['memory_cost_kib']}KiB")
+    print(f"Seeding: {result['seed_seconds']:.2f}s  throughput: {result['throughput_rps']:.1f} req/s  "
+          f"outcomes: {result['outcomes']}")
+    print(f"\n{'':<14}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for section in ("latency", "phases"):
+        for name, stats in result[section].items():
+            label = name if section == "latency" else f"[{name}]"
+            print(f"{label:<14}{stats['count']:>8}{stats['p50_ms']:>10.3f}{stats['p95_ms']:>10.3f}{stats['p99_ms']:>10.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SecureAuth register/login/lockout load benchmark")
+    parser.add_argument("--users", type=int, default=10000, help="Synthetic users to seed")
+    parser.add_argument("--requests", type=int, default=2000, help="Login attempts to replay")
+    parser.add_argument("--mix", default="success=0.6,fail=0.2,lockout=0.1,register=0.1", help="Scenario weights")
+    parser.add_argument("--victims", type=int, default=3, help="Accounts targeted by the lockout scenario")
+    parser.add_argument("--sources", type=int, default=1000, help="Distinct client addresses to spread logins over")
+    parser.add_argument("--backend", choices=["json", "sqlite"], default="sqlite")
+    parser.add_argument("--argon2", choices=["default", "fast"], default="default",
+                        help="'fast' uses cheap Argon2 parameters to isolate storage costs")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", type=Path, default=Path("bench_auth_results.json"))
+    args = parser.parse_args()
+
+    result = run(args)
+    print_report(result)
+    args.out.write_text(json.dumps(result, indent=2), encoding="utf-8")
+    print(f"\nResults written to {args.out.resolve()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Lookup latency and memory benchmark for the breached-password filter.
+
+Usage:
+    python scripts/bench_breach_filter.py [--entries 1000000] [--lookups 100000]
+        [--filter breached_passwords.bin] [--compare-set] [--out bench_breach_results.json]
+
+Without --filter a synthetic filter of --entries random passwords is built
+in a temporary directory. Hits and misses are timed separately and reported
+with p50/p99 latency; RSS growth while querying shows how little of the file
+becomes resident. --compare-set also loads the same keys into a Python set
+for comparison (needs enough RAM for --entries keys).
+"""
+import argparse
+import itertools
+import json
+import os
+import resource
+import secrets
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import breach_filter
+
+
+def rss_mib():
+    # Current RSS from /proc where available, else peak RSS.
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def timed(bf, passwords):
+    samples = []
+    hits = 0
+    for pwd in passwords:
+        start = time.perf_counter()
+        hits += pwd in bf
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return {
+        "lookups": len(samples),
+        "hits": hits,
+        "mean_us": round(statistics.fmean(samples) * 1e6, 3),
+        "p50_us": round(samples[len(samples) // 2] * 1e6, 3),
+        "p99_us": round(samples[int(len(samples) * 0.99)] * 1e6, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Breached-password filter benchmark")
+    parser.add_argument("--entries", type=int, default=1_000_000, help="Synthetic corpus size")
+    parser.add_argument("--lookups", type=int, default=100_000)
+    parser.add_argument("--filter", type=Path, help="Benchmark an existing filter instead")
+    parser.add_argument("--compare-set", action="store_true", help="Also measure a Python set of the keys")
+    parser.add_argument("--out", type=Path, default=Path("bench_breach_results.json"))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        known = [secrets.token_urlsafe(9) for _ in range(min(args.lookups, args.entries))]
+        results = {}
+        path = args.filter
+        if path is None:
+            path = Path(tmp) / "breached_passwords.bin"
+            extra = (secrets.token_bytes(8) for _ in range(args.entries - len(known)))
+            start = time.perf_counter()
+            keys = (breach_filter.password_key(p) for p in known)
+            breach_filter.build(itertools.chain(keys, extra), path)
+            results["build_s"] = round(time.perf_counter() - start, 3)
+
+        base_rss = rss_mib()
+        with breach_filter.BreachFilter(path) as bf:
+            results["entries"] = len(bf)
+            results["file_mib"] = round(path.stat().st_size / (1024 * 1024), 2)
+            misses = [secrets.token_urlsafe(12) for _ in range(args.lookups)]
+            if args.filter is None:
+                results["hits"] = timed(bf, known)
+            results["misses"] = timed(bf, misses)
+            results["rss_growth_mib"] = round(rss_mib() - base_rss, 2)
+
+            if args.compare_set:
+                before = rss_mib()
+                with path.open("rb") as f:
+                    f.seek(breach_filter.KEYS_OFFSET)
+                    data = f.read()
+                key_set = {data[i:i + 8] for i in range(0, len(data), 8)}
+                del data
+                results["python_set_mib"] = round(rss_mib() - before, 2)
+                start = time.perf_counter()
+                for pwd in misses:
+                    breach_filter.password_key(pwd) in key_set
+                results["python_set_mean_us"] = round((time.perf_counter() - start) / len(misses) * 1e6, 3)
+
+    for name, value in results.items():
+        print(f"{name:20} {value}")
+    args.out.write_text(json.dumps(results, indent=2))
+    print(f"Results written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Benchmark Argon2 login throughput against the number of pool workers.
+
+Usage:
+    python scripts/bench_hash_pool.py [--logins 64] [--workers 1 2 4 8] [--mode thread]
+
+Each run verifies the same batch of (hash, password) pairs through
+HashPool.verify_many and reports logins/sec. Half of the attempts use the
+wrong password, matching a mix of good and failed logins.
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import hash_pool
+import secure_auth_app as app
+
+
+def bench(workers: int, logins: int, mode: str, password_hash: str) -> float:
+    pool = hash_pool.HashPool(app.ph, workers=workers, mode=mode)
+    pairs = [(password_hash, "Str0ng!Passphrase123" if i % 2 else "wrong-password") for i in range(logins)]
+    try:
+        pool.verify_many(pairs[:workers])  # warm up workers
+        start = time.perf_counter()
+        results = pool.verify_many(pairs)
+        elapsed = time.perf_counter() - start
+    finally:
+        pool.shutdown()
+    assert sum(results) == logins // 2, "Unexpected verification results"
+    return logins / elapsed
+
+
+if __name__ == "__main__":
+    cpus = os.cpu_count() or 1
+    default_workers = sorted({1, 2, 4, cpus, cpus * 2})
+    parser = argparse.ArgumentParser(description="Argon2 pool throughput benchmark")
+    parser.add_argument("--logins", type=int, default=64, help="Verifications per run")
+    parser.add_argument("--workers", type=int, nargs="+", default=default_workers)
+    parser.add_argument("--mode", choices=["thread", "process"], default="thread")
+    args = parser.parse_args()
+
+    password_hash = app.ph.hash("Str0ng!Passphrase123")
+    print(f"Argon2 parameters: t={app.ph.time_cost} m={app.ph.memory_cost} KiB p={app.ph.parallelism}")
+    print(f"CPU cores: {cpus}  mode: {args.mode}  logins per run: {args.logins}")
+    print(f"{'workers':>8} {'logins/sec':>12} {'speedup':>8}")
+    baseline = None
+    for workers in args.workers:
+        rate = bench(workers, args.logins, args.mode, password_hash)
+        baseline = baseline or rate
+        print(f"{workers:>8} {rate:>12.1f} {rate / baseline:>7.2f}x")
@@ -0,0 +1,43 @@
+"""
+Build the on-disk breached-password filter used by the password policy.
+
+Usage examples:
+    python scripts/build_breach_filter.py --input rockyou.txt
+    python scripts/build_breach_filter.py --input pwned-passwords-sha1-ordered-by-hash-v8.txt --format sha1
+    python scripts/build_breach_filter.py --input a.txt --input b.txt --out /srv/auth/breached_passwords.bin
+
+Inputs are either plain wordlists (one password per line, any encoding) or
+Pwned Passwords SHA-1 dumps ("HEX:count" per line). They are streamed into
+sorted runs and merged, so files larger than memory are fine. Point the app
+at a non-default location with BREACHED_PASSWORDS_FILE.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import breach_filter
+
+parser = argparse.ArgumentParser(description="Build the breached-password filter")
+parser.add_argument("--input", type=Path, action="append", required=True, help="Wordlist or SHA-1 dump (repeatable)")
+parser.add_argument("--format", choices=["auto", "plain", "sha1"], default="auto")
+parser.add_argument("--out", type=Path, default=Path("breached_passwords.bin"))
+parser.add_argument("--run-keys", type=int, default=breach_filter.RUN_KEYS,
+                    help="Keys sorted in memory per run (about 60 bytes of RAM each)")
+args = parser.parse_args()
+
+missing = [p for p in args.input if not p.exists()]
+if missing:
+    print("Input file not found:", *missing)
+    sys.exit(1)
+
+start = time.perf_counter()
+try:
+    count = breach_filter.build_from_files(args.input, args.out, args.format, args.run_keys)
+except ValueError as e:
+    print("Malformed input:", e)
+    sys.exit(1)
+elapsed = time.perf_counter() - start
+size_mib = args.out.stat().st_size / (1024 * 1024)
+print(f"Indexed {count} unique passwords into {args.out} ({size_mib:.1f} MiB) in {elapsed:.1f}s")
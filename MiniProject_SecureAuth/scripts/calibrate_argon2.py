@@ -0,0 +1,32 @@
+"""
+Calibrate Argon2id parameters for this host and save them for the app.
+
+Usage:
+    python scripts/calibrate_argon2.py [--target-ms 250] [--max-memory-mib 64]
+        [--parallelism N] [--out argon2_params.json]
+
+secure_auth_app loads the saved file at startup. Existing users keep their
+old hashes until they next log in successfully, at which point the hash is
+recomputed with the new parameters.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import argon2_params
+
+parser = argparse.ArgumentParser(description="Calibrate Argon2id parameters for this host")
+parser.add_argument("--target-ms", type=float, default=argon2_params.DEFAULT_TARGET_MS,
+                    help="Target verify latency in milliseconds")
+parser.add_argument("--max-memory-mib", type=int, default=argon2_params.DEFAULT_MAX_MEMORY_KIB // 1024,
+                    help="Memory budget per hash in MiB")
+parser.add_argument("--parallelism", type=int, default=None, help="Lanes (default: cores, max 4)")
+parser.add_argument("--out", type=Path, default=Path("argon2_params.json"))
+args = parser.parse_args()
+
+params = argon2_params.calibrate(args.target_ms, args.max_memory_mib * 1024, args.parallelism)
+argon2_params.save_params(args.out, params)
+print(f"time_cost={params['time_cost']} memory_cost={params['memory_cost']} KiB "
+      f"parallelism={params['parallelism']} -> {params['measured_verify_ms']} ms per verify")
+print("Saved:", args.out.resolve())
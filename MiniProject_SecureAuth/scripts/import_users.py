@@ -0,0 +1,46 @@
+"""
+Bulk-import user accounts from a CSV or JSONL file.
+
+Usage examples:
+    python scripts/import_users.py --input new_staff.csv
+    SECURE_AUTH_BACKEND=sqlite python scripts/import_users.py --input week03_users.jsonl --batch-size 500
+
+Rows carry ``username`` and either ``password`` (checked against the
+password policy, then hashed with Argon2id) or ``bcrypt_hash``/``hash``
+(an existing Week03 bcrypt hash, wrapped with Argon2id and upgraded on the
+user's next login). Hashing runs on the worker pool; each batch is stored
+in one write with one BULK_IMPORT audit entry.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import bulk_import
+import secure_auth_app as app
+
+parser = argparse.ArgumentParser(description="Bulk user import")
+parser.add_argument("--input", type=Path, required=True, help="CSV (with header) or JSONL file")
+parser.add_argument("--format", choices=["csv", "jsonl"], help="Override detection from the file suffix")
+parser.add_argument("--batch-size", type=int, default=bulk_import.BATCH_SIZE, help="Users per commit")
+parser.add_argument("--show-errors", type=int, default=20, help="Rejected rows to list")
+args = parser.parse_args()
+
+if not args.input.exists():
+    print("Input file not found:", args.input)
+    sys.exit(1)
+
+users = app.load_users()
+start = time.perf_counter()
+report = bulk_import.import_users(users, bulk_import.read_rows(args.input, args.format),
+                                  batch_size=args.batch_size, source=args.input.name)
+elapsed = time.perf_counter() - start
+
+print(f"Imported {report['imported']} users ({report['legacy']} legacy bcrypt) in "
+      f"{report['batches']} batches, {elapsed:.1f}s "
+      f"({report['imported'] / elapsed if elapsed else 0:.1f} users/s, {app.HASH_WORKERS} hash workers)")
+if report["rejected"]:
+    print(f"Rejected {report['rejected']} rows:")
+    for line, username, reason in report["errors"][:args.show_errors]:
+        print(f"  line {line}: {username or '?'}: {reason}")
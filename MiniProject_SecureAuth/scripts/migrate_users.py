@@ -0,0 +1,28 @@
+"""
+Copy users from auth_data.json into an SQLite user store.
+
+Usage:
+    python scripts/migrate_users.py [--json auth_data.json] [--db auth_data.db]
+
+Afterwards run the app with SECURE_AUTH_BACKEND=sqlite to use the new store.
+The JSON file is left untouched.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import user_store
+
+parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+parser.add_argument("--json", default="auth_data.json", type=Path, help="Source JSON user file")
+parser.add_argument("--db", default="auth_data.db", type=Path, help="Target SQLite database")
+parser.add_argument("--batch-size", default=1000, type=int, help="Users per transaction")
+args = parser.parse_args()
+
+if not args.json.exists():
+    print("Source file not found:", args.json)
+    sys.exit(1)
+
+count = user_store.migrate_json_to_sqlite(args.json, args.db, batch_size=args.batch_size)
+print(f"Migrated {count} users from {args.json} to {args.db.resolve()}")
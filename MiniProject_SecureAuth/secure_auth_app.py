@@ -3,10 +3,12 @@ Mini Project: Secure Authentication System
 
 Features:
 - Entropy-based password policy (balanced usability)
-- Argon2id password hashing (argon2-cffi)
-- Account lockout after repeated failed attempts
-- JSON-based user database
-- JSON-based audit log
+- Argon2id password hashing (argon2-cffi) on a bounded multi-core worker pool
+- Host-calibrated Argon2 parameters with transparent rehash on login
+- Account lockout after repeated failed attempts, plus per-source throttling,
+  enforced by an in-memory limiter before any Argon2 work
+- Pluggable user database (JSON file or SQLite in WAL mode)
+- Append-only JSON Lines audit log with rotation
 
 Run with:
     python secure_auth_app.py
@@ -14,29 +16,70 @@ Run with:
 
 from __future__ import annotations
 
-import json
 import math
+import os
 import string
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timezone
 from getpass import getpass
 from pathlib import Path
 from typing import Dict, Any
 
 from argon2 import PasswordHasher, exceptions as argon2_exceptions
 
+import argon2_params
+import audit_index
+import audit_store
+import breach_filter
+import hash_pool
+import legacy_bcrypt
+import metrics
+import rate_limiter
+import user_store
+
 
 # Configuration
 
 USERS_FILE = Path("auth_data.json")
-LOG_FILE = Path("audit_log.json")
+USERS_DB_FILE = Path("auth_data.db")
+USERS_BACKEND = os.environ.get("SECURE_AUTH_BACKEND", "json")   # "json" or "sqlite"
+LOG_FILE = Path("audit_log.jsonl")    # Older audit_log.json arrays are still read
+LOG_MAX_BYTES = 10 * 1024 * 1024      # Rotate the active audit segment at 10 MiB
+LOG_MAX_AGE_SECONDS = 24 * 60 * 60    # ... or once it is a day old
+LOG_TAIL_EVENTS = 50                  # Events shown by view_audit_log
 
 # Aliases for compatibility with demo script
 DATA_FILE = USERS_FILE
 
 LOCKOUT_THRESHOLD = 5          # Number of failed attempts before lockout
 LOCKOUT_SECONDS = 300          # Lockout duration in seconds (5 minutes)
+SOURCE_BURST = 10              # Failed attempts a single source may make in a burst
+SOURCE_REFILL_PER_SECOND = 0.5 # Rate at which a source regains attempts
+
+# Parameters come from scripts/calibrate_argon2.py when available; stored
+# hashes using other parameters are upgraded on the next successful login.
+ARGON2_PARAMS_FILE = Path("argon2_params.json")
+ph: PasswordHasher = argon2_params.make_hasher(argon2_params.load_params(ARGON2_PARAMS_FILE))
+
+HASH_WORKERS = int(os.environ.get("SECURE_AUTH_HASH_WORKERS", os.cpu_count() or 1))
+HASH_MAX_PENDING = HASH_WORKERS * 4    # Queued + running Argon2 jobs before callers block
+HASH_SUBMIT_TIMEOUT = 30.0             # Seconds to wait for a free slot before PoolSaturated
+
+# Built with scripts/build_breach_filter.py; without it only COMMON_PASSWORDS is checked.
+BREACHED_PASSWORDS_FILE = Path(os.environ.get("BREACHED_PASSWORDS_FILE", "breached_passwords.bin"))
 
-ph = PasswordHasher()      
+METRICS_FILE = Path("metrics.json")    # JSON snapshot written by the flusher
+METRICS_FLUSH_SECONDS = 15.0
+
+# Metrics (see metrics.py; cheap enough to leave on)
+
+LOGINS = metrics.REGISTRY.counter("auth_logins_total", "Successful logins")
+LOGIN_FAILURES = metrics.REGISTRY.counter("auth_login_failures_total", "Logins rejected for a wrong password")
+LOCKOUTS = metrics.REGISTRY.counter("auth_lockouts_total", "Accounts locked after repeated failures")
+REHASHES = metrics.REGISTRY.counter("auth_rehashes_total", "Hashes upgraded to the current Argon2 parameters")
+REGISTRATIONS = metrics.REGISTRY.counter("auth_registrations_total", "Accounts created")
+REJECTED = metrics.REGISTRY.counter("auth_rejected_total", "Logins refused before verification", labels=("reason",))
+HASH_SECONDS = metrics.REGISTRY.histogram("auth_argon2_seconds", "Argon2 hash/verify latency", labels=("op",))
+PHASE_SECONDS = metrics.REGISTRY.histogram("auth_phase_seconds", "Time spent per storage/audit phase", labels=("phase",))
 
 
 # Time utilities
@@ -54,15 +97,32 @@ def parse_iso(ts: str | None) -> datetime | None:
 
 # Storage helpers
 
+_store = None
+_store_key = None
+
+def get_store():
+    """
+    Return the user store for the configured backend, reopening it if the
+    backend or file path has been changed since the last call.
+    """
+    global _store, _store_key
+    path = USERS_DB_FILE if USERS_BACKEND == "sqlite" else USERS_FILE
+    key = (USERS_BACKEND, path)
+    if _store is None or _store_key != key:
+        if _store is not None:
+            _store.close()
+        _store = user_store.open_store(USERS_BACKEND, path)
+        _store_key = key
+    return _store
+
 def load_users() -> Dict[str, Any]:
     """
-    Load users from the USERS_FILE (auth_data.json).
-    Returns an empty dict if the file does not exist.
+    Load users from the configured store.
+    The JSON backend returns an empty dict if the file does not exist; the
+    SQLite backend returns a lazy mapping that reads records on demand.
     """
-    if not USERS_FILE.exists():
-        return {}
-    with USERS_FILE.open("r", encoding="utf-8") as f:
-        return json.load(f)
+    with PHASE_SECONDS.time("load"):
+        return get_store().load_all()
 
 def load_db() -> Dict[str, Any]:
     """
@@ -72,10 +132,92 @@ def load_db() -> Dict[str, Any]:
 
 def save_users(users: Dict[str, Any]) -> None:
     """
-    Save users to the USERS_FILE (auth_data.json).
+    Save every user to the configured store.
+    """
+    get_store().save_all(users)
+
+def save_user(users: Dict[str, Any], username: str) -> None:
+    """
+    Persist a single user record (one row update on the SQLite backend).
     """
-    with USERS_FILE.open("w", encoding="utf-8") as f:
-        json.dump(users, f, indent=2)
+    with PHASE_SECONDS.time("save"):
+        get_store().put(username, users[username])
+
+
+# Throttling and lockout
+
+_limiter = None
+_limiter_key = None
+
+def get_limiter() -> rate_limiter.LoginLimiter:
+    """
+    Return the in-memory limiter, starting a fresh one if the user store or
+    lockout settings have changed since the last call.
+    """
+    global _limiter, _limiter_key
+    key = (_store_key, LOCKOUT_THRESHOLD, LOCKOUT_SECONDS, SOURCE_BURST, SOURCE_REFILL_PER_SECOND)
+    if _limiter is None or _limiter_key != key:
+        _limiter = rate_limiter.LoginLimiter(
+            LOCKOUT_THRESHOLD,
+            LOCKOUT_SECONDS,
+            source_burst=SOURCE_BURST,
+            source_refill_per_second=SOURCE_REFILL_PER_SECOND,
+        )
+        _limiter_key = key
+    return _limiter
+
+
+# Hashing helpers
+
+_pool = None
+_pool_key = None
+
+def get_hash_pool() -> hash_pool.HashPool:
+    """
+    Return the shared Argon2 worker pool, rebuilding it if the hasher or
+    worker settings have been changed since the last call.
+    """
+    global _pool, _pool_key
+    key = (id(ph), HASH_WORKERS, HASH_MAX_PENDING)
+    if _pool is None or _pool_key != key:
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+        _pool = hash_pool.HashPool(ph, workers=HASH_WORKERS, max_pending=HASH_MAX_PENDING)
+        _pool_key = key
+    return _pool
+
+def hash_password(password: str) -> str:
+    """
+    Hash a password on the worker pool and wait for the result.
+    """
+    with HASH_SECONDS.time("hash"):
+        return get_hash_pool().submit_hash(password, timeout=HASH_SUBMIT_TIMEOUT).result()
+
+def verify_password(password_hash: str, password: str) -> bool:
+    """
+    Verify a password on the worker pool. Raises the same exceptions as ph.verify.
+    """
+    with HASH_SECONDS.time("verify"):
+        return get_hash_pool().submit_verify(password_hash, password, timeout=HASH_SUBMIT_TIMEOUT).result()
+
+def needs_rehash(password_hash: str) -> bool:
+    """
+    True if a stored hash was made with parameters other than the current ph,
+    or is a wrapped bcrypt hash imported from the Week03 system.
+    """
+    if legacy_bcrypt.is_wrapped(password_hash):
+        return True
+    return ph.check_needs_rehash(password_hash)
+
+def apply_rehash(users: Dict[str, Any], username: str, new_hash: str) -> None:
+    """
+    Replace a user's hash after a successful login. The record is persisted
+    by the caller together with the rest of the login-success update.
+    """
+    users[username]["password_hash"] = new_hash
+    REHASHES.inc()
+    append_log(username, "PASSWORD_REHASHED",
+               f"Upgraded to t={ph.time_cost} m={ph.memory_cost} p={ph.parallelism}.")
 
 
 # Password policy
@@ -84,6 +226,33 @@ COMMON_PASSWORDS = {
     "password", "123456", "123456789", "test1", "password1", "qwerty", "abc123", "letmein", "monkey", "dragon"
 }
 
+_breach_filter = None
+_breach_filter_key = None
+
+def get_breach_filter() -> breach_filter.BreachFilter | None:
+    """
+    Return the memory-mapped breached-password filter, or None if
+    BREACHED_PASSWORDS_FILE does not exist. Reopened if the path changes.
+    """
+    global _breach_filter, _breach_filter_key
+    if _breach_filter_key != BREACHED_PASSWORDS_FILE:
+        if _breach_filter is not None:
+            _breach_filter.close()
+        _breach_filter = breach_filter.BreachFilter(BREACHED_PASSWORDS_FILE) if BREACHED_PASSWORDS_FILE.exists() else None
+        _breach_filter_key = BREACHED_PASSWORDS_FILE
+    return _breach_filter
+
+def is_breached(password: str) -> bool:
+    """
+    True for the built-in common passwords and for anything in the breach
+    filter (checked as typed and lower-cased).
+    """
+    lowered = password.lower()
+    if lowered in COMMON_PASSWORDS:
+        return True
+    bf = get_breach_filter()
+    return bf is not None and (password in bf or (lowered != password and lowered in bf))
+
 def estimate_entropy(password: str) -> float:
     """
     Estimate password entropy in bits.
@@ -107,13 +276,13 @@ def estimate_entropy(password: str) -> float:
 def password_is_acceptable(password: str) -> tuple[bool, str, float]:
     """
     Balanced policy:
-    - Rejects very short or common passwords.
+    - Rejects very short, common or known-breached passwords.
     - Uses entropy threshold rather than forcing all character types.
     Returns (is_ok, message, entropy_bits).
     """
     if len(password) < 8:
         return False, "Password is too short (minimum 8 characters).", 0.0
-    if password.lower() in COMMON_PASSWORDS:
+    if is_breached(password):
         return False, "Password is too common and easily guessable.", 0.0
     entropy = estimate_entropy(password)
     if entropy < 50.0:
@@ -143,30 +312,96 @@ def is_locked(user_rec: Dict[str, Any]) -> tuple[bool, int]:
 
 
 # Audit log helpers
+
 def append_log(username: str, event: str, details: str = "") -> None:
-    if LOG_FILE.exists():
-        with LOG_FILE.open("r", encoding="utf-8") as f:
-            log = json.load(f)
-    else:
-        log = []
-    log.append({
-        "time": now_iso(),
-        "username": username,
-        "event": event,
-        "details": details,
-    })
-    with LOG_FILE.open("w", encoding="utf-8") as f:
-        json.dump(log, f, indent=2)
+    """
+    Append one event to the JSONL audit log (constant time per event).
+    """
+    with PHASE_SECONDS.time("audit"):
+        audit_store.append_event(
+            LOG_FILE,
+            {
+                "time": now_iso(),
+                "username": username,
+                "event": event,
+                "details": details,
+            },
+            max_bytes=LOG_MAX_BYTES,
+            max_age_seconds=LOG_MAX_AGE_SECONDS,
+        )
 
 def load_log() -> list[dict]:
-    if not LOG_FILE.exists():
-        return []
-    with LOG_FILE.open("r", encoding="utf-8") as f:
-        return json.load(f)
+    """
+    Load the full audit history, oldest first (legacy, rotated and active files).
+    """
+    return list(audit_store.iter_events(LOG_FILE))
+
+def tail_log(n: int = LOG_TAIL_EVENTS) -> list[dict]:
+    """
+    Return the last n audit events without parsing the whole history.
+    """
+    return audit_store.tail_events(LOG_FILE, n)
+
+def query_log(**filters: Any):
+    """
+    Stream audit events matching username/event/since/until filters using
+    the side-car index (see audit_index.AuditIndex.query).
+    """
+    return audit_index.query(LOG_FILE, **filters)
 
 
 # Registration
 
+def validate_new_user(users: Dict[str, Any], username: str, password: str) -> tuple[bool, str, float]:
+    """
+    Check a proposed username and password without prompting.
+    Returns (is_ok, message, entropy_bits).
+    """
+    if not username:
+        return False, "Username cannot be empty.", 0.0
+    if username in users:
+        return False, "That username already exists.", 0.0
+    return password_is_acceptable(password)
+
+def new_user_record(password_hash: str, created_at: str | None = None) -> Dict[str, Any]:
+    return {
+        "password_hash": password_hash,
+        "created_at": created_at or now_iso(),
+        "last_login": None,
+        "failed_attempts": 0,
+        "locked_until": None,
+    }
+
+def create_user(users: Dict[str, Any], username: str, password_hash: str) -> None:
+    """
+    Store a new user record for an already-hashed password and log it.
+    """
+    users[username] = new_user_record(password_hash)
+    save_user(users, username)
+    REGISTRATIONS.inc()
+    append_log(username, "REGISTER", "New account created.")
+
+def create_users(users: Dict[str, Any], records: Dict[str, Dict[str, Any]]) -> None:
+    """
+    Store many new records in one commit (bulk import). Logging is left to
+    the caller, which writes one audit entry per batch.
+    """
+    with PHASE_SECONDS.time("save"):
+        get_store().put_many(records)
+    if isinstance(users, dict):
+        users.update(records)   # the lazy SQLite mapping reads new rows on demand
+    REGISTRATIONS.inc(amount=len(records))
+
+def register_account(users: Dict[str, Any], username: str, password: str) -> tuple[bool, str]:
+    """
+    Non-interactive registration. Returns (created?, message).
+    """
+    ok, msg, _ = validate_new_user(users, username, password)
+    if not ok:
+        return False, msg
+    create_user(users, username, hash_password(password))
+    return True, "Account created successfully."
+
 def register_user(users: Dict[str, Any]) -> None:
     username = input("Choose a username: ").strip()
     if not username:
@@ -186,66 +421,129 @@ def register_user(users: Dict[str, Any]) -> None:
     if not ok:
         print("Registration failed: password does not meet policy requirements.")
         return
-    password_hash = ph.hash(password1)
-    users[username] = {
-        "password_hash": password_hash,
-        "created_at": now_iso(),
-        "last_login": None,
-        "failed_attempts": 0,
-        "locked_until": None,
-    }
-    save_users(users)
-    append_log(username, "REGISTER", "New account created.")
+    create_user(users, username, hash_password(password1))
     print("Account created successfully.")
 
 # Login
-def login_user(users: Dict[str, Any]) -> None:
-    username = input("Username: ").strip()
-    if username not in users:
-        print("Unknown user.")
-        return
+
+def check_login_allowed(users: Dict[str, Any], username: str, source: str = "local") -> tuple[bool, str]:
+    """
+    Pre-verification checks: per-source throttling, unknown user, active
+    lockout. Runs before any Argon2 work. Returns (may_verify?, message).
+    An expired lockout is cleared and persisted (a state transition).
+    """
+    get_store()  # make sure the limiter is keyed to the current store
+    limiter = get_limiter()
+    known = username in users
+    if known and not limiter.knows(username):
+        # Parse the stored ISO timestamp once; later attempts use the limiter's cache.
+        user = users[username]
+        locked_until = parse_iso(user.get("locked_until"))
+        limiter.load(username, locked_until.timestamp() if locked_until else None)
+    allowed, reason, wait = limiter.check(username, source)
+    if reason == "rate_limited":
+        REJECTED.inc("rate_limited")
+        return False, f"Too many login attempts from this source. Try again in approximately {wait} seconds."
+    if not known:
+        REJECTED.inc("unknown_user")
+        return False, "Unknown user."
+    if reason == "locked":
+        REJECTED.inc("locked")
+        return False, f"Account is currently locked. Try again in approximately {wait} seconds."
+    user = users[username]
+    if user.get("locked_until"):
+        user["locked_until"] = None
+        user["failed_attempts"] = 0
+        save_user(users, username)
+    return True, ""
+
+def record_login_failure(users: Dict[str, Any], username: str, source: str = "local") -> str:
+    """
+    Count a wrong password, locking the account at LOCKOUT_THRESHOLD.
+    The count is incremented atomically in the user store, so processes
+    sharing a store (and restarts) see one total; a failure more than the
+    limiter's failure window after the previous one starts again at 1.
+    Returns the message for the caller.
+    """
+    user = users[username]
+    limiter = get_limiter()
+    now = limiter.clock()
+    failed_at = datetime.fromtimestamp(now, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    window_start = datetime.fromtimestamp(now - limiter.failure_window, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    with PHASE_SECONDS.time("save"):
+        persisted = get_store().increment_failed(username, failed_at, window_start)
+    # Keep the cached record in step, so a later save_user does not undo the increment.
+    user["failed_attempts"] = persisted
+    user["last_failed_at"] = failed_at
+    attempts, locked_until = limiter.record_failure(username, source, persisted)
+    LOGIN_FAILURES.inc()
+    append_log(username, "LOGIN_FAIL", f"Failed attempts: {attempts}")
+    if locked_until:
+        lock_until = datetime.fromtimestamp(locked_until, timezone.utc)
+        user["locked_until"] = lock_until.strftime("%Y-%m-%dT%H:%M:%SZ")
+        save_user(users, username)
+        LOCKOUTS.inc()
+        append_log(username, "ACCOUNT_LOCKED", f"Lockout for {LOCKOUT_SECONDS} seconds.")
+        return "The system has locked this account after repeated failed login attempts."
+    return "Incorrect password."
+
+def record_login_success(users: Dict[str, Any], username: str, source: str = "local") -> str:
+    """
+    Reset lockout state after a correct password. Returns the message for the caller.
+    """
+    get_limiter().record_success(username, source)
     user = users[username]
-    locked, remaining = is_locked(user)
-    if locked:
-        print(f"Account is currently locked. Try again in approximately {remaining} seconds.")
-        return
-    password = getpass("Password: ")
-    try:
-        ph.verify(user["password_hash"], password)
-    except argon2_exceptions.VerifyMismatchError:
-        # Incorrect password
-        user["failed_attempts"] = int(user.get("failed_attempts", 0)) + 1
-        attempts = user["failed_attempts"]
-        append_log(username, "LOGIN_FAIL", f"Failed attempts: {attempts}")
-        if attempts >= LOCKOUT_THRESHOLD:
-            lock_until = now_utc() + timedelta(seconds=LOCKOUT_SECONDS)
-            user["locked_until"] = lock_until.strftime("%Y-%m-%dT%H:%M:%SZ")
-            append_log(username, "ACCOUNT_LOCKED", f"Lockout for {LOCKOUT_SECONDS} seconds.")
-            print("The system has locked this account after repeated failed login attempts.")
-        else:
-            print("Incorrect password.")
-        save_users(users)
-        return
-    except argon2_exceptions.VerificationError as e:
-        print(f"Verification error: {e}")
-        return
-    # Successful login
     user["failed_attempts"] = 0
     user["locked_until"] = None
     user["last_login"] = now_iso()
+    LOGINS.inc()
     append_log(username, "LOGIN_SUCCESS", "User authenticated successfully.")
-    save_users(users)
-    print("Login successful. Access has been granted.")
+    save_user(users, username)
+    return "Login successful. Access has been granted."
+
+def finish_login(users: Dict[str, Any], username: str, password: str, source: str = "local") -> tuple[bool, str]:
+    """
+    Verify the password for a user that passed check_login_allowed and
+    record the outcome. Returns (authenticated?, message).
+    """
+    try:
+        verify_password(users[username]["password_hash"], password)
+    except argon2_exceptions.VerifyMismatchError:
+        return False, record_login_failure(users, username, source)
+    except argon2_exceptions.VerificationError as e:
+        return False, f"Verification error: {e}"
+    if needs_rehash(users[username]["password_hash"]):
+        apply_rehash(users, username, hash_password(password))
+    return True, record_login_success(users, username, source)
+
+def authenticate(users: Dict[str, Any], username: str, password: str, source: str = "local") -> tuple[bool, str]:
+    """
+    Non-interactive login. Returns (authenticated?, message).
+    """
+    allowed, msg = check_login_allowed(users, username, source)
+    if not allowed:
+        return False, msg
+    return finish_login(users, username, password, source)
+
+def login_user(users: Dict[str, Any]) -> None:
+    username = input("Username: ").strip()
+    allowed, msg = check_login_allowed(users, username)
+    if not allowed:
+        print(msg)
+        return
+    password = getpass("Password: ")
+    _, msg = finish_login(users, username, password)
+    print(msg)
 
 # Audit log viewing
 
 def view_audit_log() -> None:
-    log = load_log()
+    log = tail_log()
     if not log:
         print("No audit events recorded yet.")
         return
     print("\nRecent audit events (most recent last):")
-    for entry in log[-50:]:
+    for entry in log:
         print(
             f"{entry['time']} | user={entry['username']} | "
             f"{entry['event']} | {entry.get('details', '')}"
@@ -257,6 +555,13 @@ def view_audit_log() -> None:
 def main() -> None:
     print("Secure Authentication System (Mini Project)")
     users = load_users()
+    flusher = metrics.SnapshotFlusher(METRICS_FILE, METRICS_FLUSH_SECONDS).start()
+    try:
+        _menu(users)
+    finally:
+        flusher.stop()
+
+def _menu(users: Dict[str, Any]) -> None:
     while True:
         print("\nMenu:")
         print("  1) Register new user")
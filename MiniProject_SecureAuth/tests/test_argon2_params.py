@@ -0,0 +1,55 @@
+import sys
+import tempfile
+from pathlib import Path
+
+# Ensure project root is on sys.path so we can import the app when running from tests/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from argon2 import PasswordHasher
+
+import argon2_params
+import secure_auth_app as app
+
+GOOD_PASSWORD = "Str0ng!Passphrase123"
+
+
+def test_params_round_trip():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "argon2_params.json"
+        argon2_params.save_params(path, {"time_cost": 2, "memory_cost": 16, "parallelism": 1, "measured_verify_ms": 1})
+        ph = argon2_params.make_hasher(argon2_params.load_params(path))
+        assert (ph.time_cost, ph.memory_cost, ph.parallelism) == (2, 16, 1), "Parameters not applied"
+        assert argon2_params.load_params(Path(tmp) / "missing.json") is None
+
+
+def test_rehash_on_login():
+    original = (app.USERS_FILE, app.LOG_FILE, app.ph)
+    with tempfile.TemporaryDirectory() as tmp:
+        app.USERS_FILE = Path(tmp) / "auth_data.json"
+        app.LOG_FILE = Path(tmp) / "audit_log.jsonl"
+        try:
+            app.ph = PasswordHasher(time_cost=1, memory_cost=8, parallelism=1)
+            users = app.load_users()
+            ok, _ = app.register_account(users, "alice", GOOD_PASSWORD)
+            assert ok
+            old_hash = users["alice"]["password_hash"]
+
+            # Parameters change (e.g. after recalibration): next login upgrades the hash
+            app.ph = PasswordHasher(time_cost=2, memory_cost=16, parallelism=1)
+            ok, _ = app.authenticate(users, "alice", GOOD_PASSWORD)
+            assert ok, "Login with old parameters should still succeed"
+            new_hash = app.load_users()["alice"]["password_hash"]
+            assert new_hash != old_hash and "m=16,t=2" in new_hash, new_hash
+            assert any(e["event"] == "PASSWORD_REHASHED" for e in app.load_log())
+
+            # Already current: no further rehash
+            app.authenticate(users, "alice", GOOD_PASSWORD)
+            assert sum(e["event"] == "PASSWORD_REHASHED" for e in app.load_log()) == 1
+        finally:
+            app.USERS_FILE, app.LOG_FILE, app.ph = original
+
+
+if __name__ == "__main__":
+    test_params_round_trip()
+    test_rehash_on_login()
+    print("All tests passed.")
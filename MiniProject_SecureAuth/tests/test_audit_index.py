@@ -0,0 +1,121 @@
+import csv
+import io
+import json
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+# Ensure project root is on sys.path so we can import the app when running from tests/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import audit_index
+import audit_store
+
+
+def _event(minute, username, event):
+    return {"time": f"2025-12-09T10:{minute:02d}:00Z", "username": username, "event": event, "details": str(minute)}
+
+
+def test_indexed_queries_across_rotation():
+    with tempfile.TemporaryDirectory() as tmp:
+        log = Path(tmp) / "audit_log.jsonl"
+        (Path(tmp) / "audit_log.json").write_text(json.dumps([_event(0, "alice", "REGISTER")]), encoding="utf-8")
+        for minute in range(1, 31):
+            user = "alice" if minute % 2 else "bob"
+            event = "LOGIN_FAIL" if minute % 3 else "LOGIN_SUCCESS"
+            audit_store.append_event(log, _event(minute, user, event), max_bytes=400)
+
+        with audit_index.AuditIndex(log) as index:
+            assert index.refresh() == 31, "Every event should be indexed once"
+            assert index.refresh() == 0, "Second refresh should find nothing new"
+
+            fails = list(index.query(username="alice", event="LOGIN_FAIL"))
+            expected = [m for m in range(1, 31) if m % 2 and m % 3]
+            assert [int(e["details"]) for e in fails] == expected, fails
+
+            since = audit_index.iso_to_epoch("2025-12-09T10:25:00Z")
+            recent = list(index.query(since=since, limit=3))
+            assert [e["details"] for e in recent] == ["25", "26", "27"], recent
+            assert next(index.query(username="alice", event="REGISTER"))["details"] == "0", "Legacy events missing"
+
+        # New events after rotation are picked up incrementally
+        audit_store.append_event(log, _event(59, "carol", "ACCOUNT_LOCKED"), max_bytes=400)
+        results = list(audit_index.query(log, event="ACCOUNT_LOCKED"))
+        assert [e["username"] for e in results] == ["carol"], results
+
+        out = io.StringIO()
+        n = audit_index.write_csv(audit_index.query(log, username="bob", limit=2), out)
+        rows = list(csv.DictReader(io.StringIO(out.getvalue())))
+        assert n == 2 and rows[0]["username"] == "bob", rows
+
+
+def test_concurrent_refresh_indexes_each_event_once():
+    with tempfile.TemporaryDirectory() as tmp:
+        log = Path(tmp) / "audit_log.jsonl"
+        for i in range(2000):
+            audit_store.append_event(log, _event(i % 60, f"user{i % 7}", "LOGIN_FAIL"))
+        barrier = threading.Barrier(6)
+        errors = []
+
+        def refresh():
+            try:
+                with audit_index.AuditIndex(log) as index:
+                    barrier.wait()
+                    index.refresh()
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=refresh) for _ in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert not errors, errors
+        with audit_index.AuditIndex(log) as index:
+            assert index.count() == 2000, "Concurrent refreshes indexed events twice"
+
+
+def test_reused_inode_is_reindexed():
+    with tempfile.TemporaryDirectory() as tmp:
+        log = Path(tmp) / "audit_log.jsonl"
+        audit_store.append_event(log, _event(1, "alice", "LOGIN_FAIL"))
+        with audit_index.AuditIndex(log) as index:
+            assert index.refresh() == 1
+            # Same inode, different contents at least as long as what was indexed
+            with log.open("r+b") as f:
+                f.truncate(0)
+                for minute in (2, 3):
+                    f.write((json.dumps(_event(minute, "bob", "LOGIN_SUCCESS")) + "\n").encode())
+            assert index.refresh() == 2, "A recycled inode should be indexed from the start"
+            assert [e["username"] for e in index.query()] == ["bob", "bob"]
+
+
+def test_read_after_rotation_follows_the_inode():
+    with tempfile.TemporaryDirectory() as tmp:
+        log = Path(tmp) / "audit_log.jsonl"
+        for minute in range(1, 4):
+            audit_store.append_event(log, _event(minute, "alice", "LOGIN_FAIL"))
+        with audit_index.AuditIndex(log) as index:
+            index.refresh()
+            assert index.count(username="alice") == 3 and index.count(event="REGISTER") == 0
+            # Rotate, and start a new active segment under the old name, before reading
+            audit_store.rotate(log)
+            audit_store.append_event(log, _event(9, "mallory", "REGISTER"))
+            events = list(index.query(username="alice"))
+            assert [e["details"] for e in events] == ["1", "2", "3"], events
+
+
+def test_parse_time():
+    assert audit_index.parse_time("1h", now=10_000) == 10_000 - 3600
+    assert audit_index.parse_time("1765277851") == 1765277851
+    assert audit_index.parse_time("2025-12-09T10:00:00Z") == audit_index.iso_to_epoch("2025-12-09T10:00:00Z")
+
+
+if __name__ == "__main__":
+    test_indexed_queries_across_rotation()
+    test_concurrent_refresh_indexes_each_event_once()
+    test_reused_inode_is_reindexed()
+    test_read_after_rotation_follows_the_inode()
+    test_parse_time()
+    print("All tests passed.")
@@ -0,0 +1,49 @@
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+# Ensure project root is on sys.path so we can import the app when running from tests/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import audit_store
+
+
+def _event(i):
+    return {"time": "2025-12-09T19:57:31Z", "username": f"user{i}", "event": "LOGIN_FAIL", "details": str(i)}
+
+
+def test_append_and_tail():
+    with tempfile.TemporaryDirectory() as tmp:
+        log = Path(tmp) / "audit_log.jsonl"
+        for i in range(200):
+            audit_store.append_event(log, _event(i))
+
+        lines = log.read_text(encoding="utf-8").splitlines()
+        assert len(lines) == 200, "Each event should be one line"
+        tail = audit_store.tail_events(log, 50)
+        assert [e["details"] for e in tail] == [str(i) for i in range(150, 200)], "Tail returned wrong events"
+
+
+def test_rotation_and_legacy():
+    with tempfile.TemporaryDirectory() as tmp:
+        log = Path(tmp) / "audit_log.jsonl"
+        # Pre-JSONL history is still readable
+        legacy = [_event(i) for i in range(3)]
+        (Path(tmp) / "audit_log.json").write_text(json.dumps(legacy), encoding="utf-8")
+
+        for i in range(3, 40):
+            audit_store.append_event(log, _event(i), max_bytes=512)
+
+        assert audit_store.rotated_segments(log), "Size limit should have rotated the log"
+        history = list(audit_store.iter_events(log))
+        assert [e["details"] for e in history] == [str(i) for i in range(40)], "History out of order"
+
+        tail = audit_store.tail_events(log, 38)
+        assert [e["details"] for e in tail] == [str(i) for i in range(2, 40)], "Tail across segments failed"
+
+
+if __name__ == "__main__":
+    test_append_and_tail()
+    test_rotation_and_legacy()
+    print("All tests passed.")
@@ -0,0 +1,85 @@
+import asyncio
+import sys
+import tempfile
+from pathlib import Path
+
+# Ensure project root is on sys.path so we can import the app when running from tests/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from argon2 import PasswordHasher
+
+import secure_auth_app as app
+import auth_service
+
+GOOD_PASSWORD = "Str0ng!Passphrase123"
+
+
+async def _exercise_service():
+    service = auth_service.AuthService()
+    server = await service.start("127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+
+    async def client(**payload):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        try:
+            return await auth_service.request(reader, writer, **payload)
+        finally:
+            writer.close()
+            await writer.wait_closed()
+
+    async with server:
+        # Concurrent registrations from separate connections
+        results = await asyncio.gather(*[
+            client(op="register", username=f"user{i}", password=GOOD_PASSWORD) for i in range(5)
+        ])
+        assert all(r["ok"] for r in results), results
+        weak = await client(op="register", username="weak", password="password")
+        assert not weak["ok"], "Weak password should be rejected"
+
+        ok = await client(op="login", username="user0", password=GOOD_PASSWORD, id=7)
+        assert ok["ok"] and ok["id"] == 7, ok
+
+        # A burst of concurrent bad logins must lock the account exactly once
+        await asyncio.gather(*[
+            client(op="login", username="user1", password="wrong-password")
+            for _ in range(app.LOCKOUT_THRESHOLD + 2)
+        ])
+        locked = await client(op="login", username="user1", password=GOOD_PASSWORD)
+        assert not locked["ok"] and "locked" in locked["message"], locked
+
+        audit = await client(op="audit", limit=1000)
+        events = [e["event"] for e in audit["events"]]
+        assert events.count("REGISTER") == 5, events
+        assert events.count("ACCOUNT_LOCKED") == 1, events
+
+        bad = await client(op="nope")
+        assert not bad["ok"], "Unknown operations should fail"
+
+        # Malformed limits are rejected and the connection stays usable
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        try:
+            for limit in (None, [1], "ten"):
+                reply = await auth_service.request(reader, writer, op="audit", limit=limit)
+                assert not reply["ok"] and "limit" in reply["message"], reply
+            assert (await auth_service.request(reader, writer, op="audit", limit="2"))["ok"]
+        finally:
+            writer.close()
+            await writer.wait_closed()
+    service.close()
+
+
+def test_service_concurrent_flows():
+    original = (app.USERS_FILE, app.LOG_FILE, app.ph)
+    with tempfile.TemporaryDirectory() as tmp:
+        app.USERS_FILE = Path(tmp) / "auth_data.json"
+        app.LOG_FILE = Path(tmp) / "audit_log.jsonl"
+        app.ph = PasswordHasher(time_cost=1, memory_cost=8, parallelism=1)
+        try:
+            asyncio.run(_exercise_service())
+        finally:
+            app.USERS_FILE, app.LOG_FILE, app.ph = original
+
+
+if __name__ == "__main__":
+    test_service_concurrent_flows()
+    print("All tests passed.")
@@ -0,0 +1,66 @@
+import hashlib
+import sys
+import tempfile
+from pathlib import Path
+
+# Ensure project root is on sys.path so we can import the app when running from tests/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import breach_filter
+import secure_auth_app as app
+
+
+def test_build_and_lookup():
+    with tempfile.TemporaryDirectory() as tmp:
+        wordlist = Path(tmp) / "words.txt"
+        words = [f"leaked{i}" for i in range(2000)] + ["Summer2024!", "leaked5"]
+        wordlist.write_bytes("\n".join(words).encode() + b"\r\n\n")
+        pwned = Path(tmp) / "pwned.txt"
+        pwned.write_text(hashlib.sha1(b"Tr0ub4dor&3").hexdigest().upper() + ":42\n")
+
+        out = Path(tmp) / "breached_passwords.bin"
+        # Tiny runs force the external merge path
+        count = breach_filter.build_from_files([wordlist, pwned], out, run_keys=300)
+        assert count == 2002, "Duplicates should be merged"
+
+        with breach_filter.BreachFilter(out) as bf:
+            assert len(bf) == 2002
+            assert "leaked0" in bf and "leaked1999" in bf and "Summer2024!" in bf
+            assert "Tr0ub4dor&3" in bf, "SHA-1 dump lines should be indexed by hash"
+            assert "leaked2000" not in bf and "" not in bf
+
+        # In sha1 format a short or non-hex hash is rejected, not silently truncated
+        bad = Path(tmp) / "bad.txt"
+        bad.write_text(hashlib.sha1(b"x").hexdigest() + ":1\nABCDEF:2\n")
+        try:
+            breach_filter.build_from_files([bad], Path(tmp) / "bad.bin", fmt="sha1")
+        except ValueError as e:
+            assert "line 2" in str(e), e
+        else:
+            raise AssertionError("Malformed SHA-1 line should be rejected")
+
+        # 40 characters that bytes.fromhex would accept, but with spaces: a password, not a hash
+        spaced = "abcd " * 8
+        assert not breach_filter._is_hex(spaced.encode())
+        assert list(breach_filter.keys_from_lines([spaced.encode() + b"\n"])) == [breach_filter.password_key(spaced)]
+
+
+def test_policy_uses_filter():
+    original = app.BREACHED_PASSWORDS_FILE
+    with tempfile.TemporaryDirectory() as tmp:
+        out = Path(tmp) / "breached_passwords.bin"
+        breach_filter.build([breach_filter.password_key("correcthorsebatterystaple")], out)
+        try:
+            app.BREACHED_PASSWORDS_FILE = out
+            ok, msg, _ = app.password_is_acceptable("CorrectHorseBatteryStaple")
+            assert not ok, "Lower-cased form is in the filter"
+            assert app.password_is_acceptable("Str0ng!Passphrase123")[0]
+        finally:
+            app.BREACHED_PASSWORDS_FILE = original
+            app.get_breach_filter()
+
+
+if __name__ == "__main__":
+    test_build_and_lookup()
+    test_policy_uses_filter()
+    print("All tests passed.")
@@ -0,0 +1,72 @@
+import sys
+import tempfile
+from pathlib import Path
+
+# Ensure project root is on sys.path so we can import the app when running from tests/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import bcrypt
+from argon2 import PasswordHasher
+
+import bulk_import
+import legacy_bcrypt
+import secure_auth_app as app
+
+GOOD_PASSWORD = "Str0ng!Passphrase123"
+LEGACY_PASSWORD = "Week03-Legacy!Pass"
+
+
+def test_bulk_import_batches_and_legacy_upgrade():
+    original = (app.USERS_FILE, app.LOG_FILE, app.ph)
+    with tempfile.TemporaryDirectory() as tmp:
+        app.USERS_FILE = Path(tmp) / "auth_data.json"
+        app.LOG_FILE = Path(tmp) / "audit_log.jsonl"
+        app.ph = PasswordHasher(time_cost=1, memory_cost=8, parallelism=1)
+        try:
+            legacy_hash = bcrypt.hashpw(LEGACY_PASSWORD.encode(), bcrypt.gensalt(rounds=4)).decode()
+            src = Path(tmp) / "users.csv"
+            lines = ["username,password,bcrypt_hash"]
+            lines += [f"user{i},{GOOD_PASSWORD}," for i in range(5)]
+            lines += ["weak,password,", f"user0,{GOOD_PASSWORD},", f"legacy,,{legacy_hash}", "broken,,$2b$nothash"]
+            src.write_text("\n".join(lines) + "\n")
+
+            users = app.load_users()
+            report = bulk_import.import_users(users, bulk_import.read_rows(src), batch_size=4, source=src.name)
+            assert report["imported"] == 6 and report["legacy"] == 1, report
+            assert report["rejected"] == 3 and report["batches"] == 3, report
+            rejected = {username for _, username, _ in report["errors"]}
+            assert rejected == {"weak", "user0", "broken"}, report["errors"]
+
+            log = app.load_log()
+            assert [e["event"] for e in log] == ["BULK_IMPORT"] * 3, "One audit entry per batch"
+
+            stored = app.load_users()
+            assert len(stored) == 6
+            assert legacy_bcrypt.is_wrapped(stored["legacy"]["password_hash"])
+            assert legacy_hash not in stored["legacy"]["password_hash"], "Raw bcrypt hash must not be stored"
+
+            ok, _ = app.authenticate(users, "user3", GOOD_PASSWORD)
+            assert ok
+            ok, _ = app.authenticate(users, "legacy", "wrong-password")
+            assert not ok
+            ok, _ = app.authenticate(users, "legacy", LEGACY_PASSWORD)
+            assert ok, "Wrapped bcrypt hash should verify"
+            upgraded = app.load_users()["legacy"]["password_hash"]
+            assert upgraded.startswith("$argon2id$"), upgraded
+            assert app.authenticate(users, "legacy", LEGACY_PASSWORD)[0]
+        finally:
+            app.USERS_FILE, app.LOG_FILE, app.ph = original
+
+
+def test_jsonl_rows():
+    with tempfile.TemporaryDirectory() as tmp:
+        src = Path(tmp) / "users.jsonl"
+        src.write_text('{"username": "a", "password": "x"}\n\nnot json\n{"username": "b", "hash": "h"}\n')
+        rows = list(bulk_import.read_rows(src))
+        assert rows == [(1, {"username": "a", "password": "x"}), (3, None), (4, {"username": "b", "hash": "h"})]
+
+
+if __name__ == "__main__":
+    test_bulk_import_batches_and_legacy_upgrade()
+    test_jsonl_rows()
+    print("All tests passed.")
@@ -0,0 +1,52 @@
+import sys
+import threading
+from pathlib import Path
+
+# Ensure project root is on sys.path so we can import the app when running from tests/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from argon2 import PasswordHasher
+
+import hash_pool
+
+# Cheap parameters keep the test fast; the pool logic does not depend on cost.
+FAST_PH = PasswordHasher(time_cost=1, memory_cost=8, parallelism=1)
+
+
+def test_batch_hash_and_verify():
+    pool = hash_pool.HashPool(FAST_PH, workers=2)
+    try:
+        hashes = pool.hash_many(["first-pass", "second-pass"])
+        results = pool.verify_many([
+            (hashes[0], "first-pass"),
+            (hashes[1], "wrong"),
+            ("not-a-hash", "first-pass"),
+        ])
+        assert results == [True, False, False], f"Unexpected batch results {results}"
+    finally:
+        pool.shutdown()
+
+
+def test_backpressure():
+    pool = hash_pool.HashPool(FAST_PH, workers=1, max_pending=1)
+    gate = threading.Event()
+    try:
+        # Occupy the only slot with a job that waits on the gate.
+        pool._submit(lambda _ph: gate.wait(5))
+        try:
+            pool.submit_hash("blocked", timeout=0.05)
+        except hash_pool.PoolSaturated:
+            pass
+        else:
+            raise AssertionError("Submitting to a full pool should raise PoolSaturated")
+        gate.set()
+        assert FAST_PH.verify(pool.submit_hash("freed", timeout=5).result(), "freed")
+    finally:
+        gate.set()
+        pool.shutdown()
+
+
+if __name__ == "__main__":
+    test_batch_hash_and_verify()
+    test_backpressure()
+    print("All tests passed.")
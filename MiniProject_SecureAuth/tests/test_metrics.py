@@ -0,0 +1,80 @@
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+# Ensure project root is on sys.path so we can import the app when running from tests/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from argon2 import PasswordHasher
+
+import metrics
+import secure_auth_app as app
+
+GOOD_PASSWORD = "Str0ng!Passphrase123"
+
+
+def test_counter_and_histogram_render():
+    registry = metrics.Registry()
+    logins = registry.counter("logins_total", "Logins")
+    rejected = registry.counter("rejected_total", "Rejected", labels=("reason",))
+    latency = registry.histogram("op_seconds", "Latency", labels=("op",), buckets=(0.01, 0.1))
+    logins.inc()
+    logins.inc()
+    rejected.inc("locked")
+    latency.observe(0.005, "hash")
+    latency.observe(0.05, "hash")
+    latency.observe(5.0, "hash")
+
+    text = registry.render_prometheus()
+    assert "# TYPE logins_total counter" in text
+    assert "logins_total 2" in text
+    assert 'rejected_total{reason="locked"} 1' in text
+    assert 'op_seconds_bucket{op="hash",le="0.01"} 1' in text
+    assert 'op_seconds_bucket{op="hash",le="0.1"} 2' in text
+    assert 'op_seconds_bucket{op="hash",le="+Inf"} 3' in text
+    assert 'op_seconds_count{op="hash"} 3' in text
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "metrics.json"
+        metrics.write_snapshot(path, registry)
+        snap = json.loads(path.read_text())
+    assert snap["metrics"]["logins_total"] == 2
+    assert snap["metrics"]["op_seconds"]["hash"]["count"] == 3
+
+
+def test_app_flows_are_counted():
+    original = (app.USERS_FILE, app.LOG_FILE, app.ph, app.LOCKOUT_THRESHOLD)
+    with tempfile.TemporaryDirectory() as tmp:
+        app.USERS_FILE = Path(tmp) / "auth_data.json"
+        app.LOG_FILE = Path(tmp) / "audit_log.jsonl"
+        app.ph = PasswordHasher(time_cost=1, memory_cost=8, parallelism=1)
+        app.LOCKOUT_THRESHOLD = 2
+        try:
+            before = {
+                "logins": app.LOGINS.value(),
+                "failures": app.LOGIN_FAILURES.value(),
+                "lockouts": app.LOCKOUTS.value(),
+                "unknown": app.REJECTED.value("unknown_user"),
+                "verify": app.HASH_SECONDS.count("verify"),
+            }
+            users = app.load_users()
+            assert app.register_account(users, "bob", GOOD_PASSWORD)[0]
+            assert app.authenticate(users, "bob", GOOD_PASSWORD)[0]
+            app.authenticate(users, "bob", "wrong")
+            app.authenticate(users, "bob", "wrong")
+            app.authenticate(users, "nobody", "wrong")
+
+            assert app.LOGINS.value() == before["logins"] + 1
+            assert app.LOGIN_FAILURES.value() == before["failures"] + 2
+            assert app.LOCKOUTS.value() == before["lockouts"] + 1
+            assert app.REJECTED.value("unknown_user") == before["unknown"] + 1
+            assert app.HASH_SECONDS.count("verify") == before["verify"] + 3
+        finally:
+            app.USERS_FILE, app.LOG_FILE, app.ph, app.LOCKOUT_THRESHOLD = original
+
+
+if __name__ == "__main__":
+    test_counter_and_histogram_render()
+    test_app_flows_are_counted()
+    print("All tests passed.")
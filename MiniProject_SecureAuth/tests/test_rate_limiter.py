@@ -0,0 +1,136 @@
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Ensure project root is on sys.path so we can import the app when running from tests/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from argon2 import PasswordHasher
+
+import rate_limiter
+import secure_auth_app as app
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_timing_wheel_expiry():
+    wheel = rate_limiter.TimingWheel(slots=8, tick=1.0, now=0.0)
+    wheel.schedule("a", 3.0)
+    wheel.schedule("b", 20.0)   # more than one revolution away
+    wheel.schedule("c", 5.0)
+    wheel.cancel("c")
+    assert wheel.advance(2.0) == []
+    assert wheel.advance(4.0) == ["a"]
+    assert wheel.advance(19.0) == []
+    assert wheel.advance(21.0) == ["b"]
+    assert len(wheel) == 0
+
+
+def test_lockout_and_unlock():
+    clock = FakeClock()
+    limiter = rate_limiter.LoginLimiter(threshold=3, lockout_seconds=60, source_burst=100, clock=clock)
+    limiter.load("alice", None)
+    for attempt in range(1, 4):
+        allowed, reason, _ = limiter.check("alice", "10.0.0.1")
+        assert allowed, reason
+        attempts, locked_until = limiter.record_failure("alice", "10.0.0.1")
+        assert attempts == attempt
+    assert locked_until == clock.now + 60, "Third failure should lock the account"
+
+    allowed, reason, wait = limiter.check("alice", "10.0.0.1")
+    assert not allowed and reason == "locked" and wait == 60
+
+    clock.now += 61
+    allowed, reason, _ = limiter.check("alice", "10.0.0.1")
+    assert allowed, "Lock should expire"
+    assert limiter.record_failure("alice", "10.0.0.1") == (1, None), "Failures restart after unlock"
+
+
+def test_source_throttling():
+    clock = FakeClock()
+    limiter = rate_limiter.LoginLimiter(threshold=100, lockout_seconds=60,
+                                        source_burst=3, source_refill_per_second=1.0, clock=clock)
+    for i in range(3):
+        assert limiter.check(f"user{i}", "10.0.0.9")[0]
+        limiter.record_failure(f"user{i}", "10.0.0.9")
+    allowed, reason, wait = limiter.check("user9", "10.0.0.9")
+    assert not allowed and reason == "rate_limited" and wait == 1
+    assert limiter.check("user9", "10.0.0.10")[0], "Other sources are unaffected"
+
+    # Successful logins hand the token back
+    limiter.record_success("user0", "10.0.0.9")
+    assert limiter.check("user0", "10.0.0.9")[0]
+
+    clock.now += 2
+    assert limiter.check("user9", "10.0.0.9")[0], "Bucket should refill over time"
+
+
+def test_idle_state_is_reclaimed():
+    clock = FakeClock()
+    limiter = rate_limiter.LoginLimiter(threshold=5, lockout_seconds=30, clock=clock)
+    for i in range(1000):
+        limiter.check(f"user{i}", f"10.0.{i // 256}.{i % 256}")
+        limiter.record_failure(f"user{i}", f"10.0.{i // 256}.{i % 256}")
+    assert len(limiter._failures) == 1000
+    clock.now += 3600
+    limiter.check("someone", "10.9.9.9")
+    assert not limiter._failures and len(limiter._buckets) == 1, "Idle entries should expire"
+
+
+def test_failures_reset_after_quiet_window():
+    original = (app.USERS_FILE, app.LOG_FILE, app.ph)
+    with tempfile.TemporaryDirectory() as tmp:
+        app.USERS_FILE = Path(tmp) / "auth_data.json"
+        app.LOG_FILE = Path(tmp) / "audit_log.jsonl"
+        app.ph = PasswordHasher(time_cost=1, memory_cost=8, parallelism=1)
+        try:
+            users = app.load_users()
+            assert app.register_account(users, "carol", "Str0ng!Passphrase123")[0]
+            clock = FakeClock(time.time())
+            limiter = app.get_limiter()
+            limiter.clock = clock
+            for _ in range(app.LOCKOUT_THRESHOLD - 1):
+                assert app.authenticate(users, "carol", "wrong-password") == (False, "Incorrect password.")
+            clock.now += 3 * limiter.failure_window
+            app.authenticate(users, "nobody", "x")   # any attempt expires carol's idle limiter entry
+            ok, msg = app.authenticate(users, "carol", "wrong-password")
+            assert msg == "Incorrect password.", "Failures should reset after a quiet failure window"
+            assert not users["carol"].get("locked_until")
+        finally:
+            app.USERS_FILE, app.LOG_FILE, app.ph = original
+
+
+def test_failures_are_shared_through_the_store():
+    original = (app.USERS_BACKEND, app.USERS_DB_FILE, app.LOG_FILE, app.ph)
+    with tempfile.TemporaryDirectory() as tmp:
+        app.USERS_BACKEND = "sqlite"
+        app.USERS_DB_FILE = Path(tmp) / "auth_data.db"
+        app.LOG_FILE = Path(tmp) / "audit_log.jsonl"
+        app.ph = PasswordHasher(time_cost=1, memory_cost=8, parallelism=1)
+        try:
+            users = app.load_users()
+            assert app.register_account(users, "dave", "Str0ng!Passphrase123")[0]
+            for _ in range(app.LOCKOUT_THRESHOLD):
+                app._limiter = None   # each attempt handled by a fresh process
+                ok, msg = app.authenticate(app.load_users(), "dave", "wrong-password")
+            assert "locked" in msg, "Failures from separate processes should add up"
+        finally:
+            app.USERS_BACKEND, app.USERS_DB_FILE, app.LOG_FILE, app.ph = original
+            app.get_store()
+
+
+if __name__ == "__main__":
+    test_timing_wheel_expiry()
+    test_lockout_and_unlock()
+    test_source_throttling()
+    test_idle_state_is_reclaimed()
+    test_failures_reset_after_quiet_window()
+    test_failures_are_shared_through_the_store()
+    print("All tests passed.")
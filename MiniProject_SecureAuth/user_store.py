@@ -0,0 +1,325 @@
+"""
+Pluggable user storage backends for the Secure Authentication System.
+
+Two backends share the same small interface:
+
+- JsonUserStore: the original auth_data.json file. Every write rewrites the
+  whole file, but it is now done atomically (temp file + rename).
+- SqliteUserStore: one row per user in an SQLite database in WAL mode.
+  Reads and updates touch a single record, and failed-attempt counters are
+  incremented by a single UPDATE, so concurrent logins in any number of
+  processes cannot lose updates.
+
+Interface:
+    load_all()                  -> mapping of username -> record
+    save_all(users)             persist every record in ``users``
+    get(username)               -> record or None
+    put(username, record)       insert or replace one record
+    put_many(records)           insert or replace many records in one commit
+    increment_failed(username, now, window_start)
+                                -> new failed_attempts value; a previous
+                                   failure before window_start restarts it at 1
+    close()
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+from collections.abc import MutableMapping
+from pathlib import Path
+from typing import Any, Dict, Iterator, Mapping
+
+# Columns stored natively; any other keys in a record go into the JSON "extra" column.
+USER_COLUMNS = ("password_hash", "created_at", "last_login", "failed_attempts", "locked_until")
+
+
+def unwrap_users(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Accept both the flat {username: record} layout and the {"users": {...}}
+    layout used by older copies of auth_data.json.
+    """
+    users = data.get("users")
+    if isinstance(users, dict) and all(isinstance(v, dict) for v in users.values()):
+        return users
+    return data
+
+
+def read_json_users(path: Path) -> Dict[str, Any]:
+    """
+    Read an auth_data.json file in either layout (see unwrap_users).
+    """
+    with path.open("r", encoding="utf-8") as f:
+        return unwrap_users(json.load(f))
+
+
+# JSON backend
+
+class JsonUserStore:
+    """
+    Whole-file JSON store (the original format). Kept as the default backend.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._users: Dict[str, Any] | None = None
+        self._lock = threading.Lock()
+
+    def load_all(self) -> Dict[str, Any]:
+        if not self.path.exists():
+            self._users = {}
+        else:
+            self._users = read_json_users(self.path)
+        return self._users
+
+    def save_all(self, users: Mapping[str, Any]) -> None:
+        with self._lock:
+            self._users = dict(users) if not isinstance(users, dict) else users
+            self._write()
+
+    def _write(self) -> None:
+        # Write to a temp file and rename so a crash never leaves half a file.
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix=self.path.name, suffix=".tmp", dir=self.path.parent)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self._users, f, indent=2)
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def _cached(self) -> Dict[str, Any]:
+        if self._users is None:
+            self.load_all()
+        return self._users
+
+    def get(self, username: str) -> Dict[str, Any] | None:
+        return self._cached().get(username)
+
+    def put(self, username: str, record: Dict[str, Any]) -> None:
+        with self._lock:
+            self._cached()[username] = record
+            self._write()
+
+    def put_many(self, records: Mapping[str, Dict[str, Any]]) -> None:
+        with self._lock:
+            self._cached().update(records)
+            self._write()
+
+    def increment_failed(self, username: str, now: str, window_start: str) -> int:
+        with self._lock:
+            user = self._cached()[username]
+            last = user.get("last_failed_at")
+            recent = last is not None and last >= window_start
+            user["failed_attempts"] = (int(user.get("failed_attempts") or 0) if recent else 0) + 1
+            user["last_failed_at"] = now
+            self._write()
+            return user["failed_attempts"]
+
+    def close(self) -> None:
+        self._users = None
+
+
+# SQLite backend
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    username        TEXT PRIMARY KEY,
+    password_hash   TEXT NOT NULL,
+    created_at      TEXT,
+    last_login      TEXT,
+    failed_attempts INTEGER NOT NULL DEFAULT 0,
+    locked_until    TEXT,
+    extra           TEXT
+)
+"""
+
+
+def _row_to_record(row: sqlite3.Row) -> Dict[str, Any]:
+    record = {col: row[col] for col in USER_COLUMNS}
+    if row["extra"]:
+        record.update(json.loads(row["extra"]))
+    return record
+
+
+def _record_to_row(username: str, record: Mapping[str, Any]) -> tuple:
+    extra = {k: v for k, v in record.items() if k not in USER_COLUMNS}
+    return (
+        username,
+        record["password_hash"],
+        record.get("created_at"),
+        record.get("last_login"),
+        int(record.get("failed_attempts", 0) or 0),
+        record.get("locked_until"),
+        json.dumps(extra) if extra else None,
+    )
+
+
+class SqliteUserStore:
+    """
+    One row per user in SQLite (WAL journal, so readers never block the writer).
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._local = threading.local()
+        self._connect().execute(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared across threads; keep one per thread.
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def load_all(self) -> "LazyUsers":
+        """
+        Return a dict-like view that fetches records on first access instead
+        of reading every user at startup.
+        """
+        return LazyUsers(self)
+
+    def save_all(self, users: Mapping[str, Any]) -> None:
+        if isinstance(users, LazyUsers):
+            self.put_many(users.cached())
+        else:
+            self.put_many(users)
+
+    def get(self, username: str) -> Dict[str, Any] | None:
+        row = self._connect().execute(
+            "SELECT * FROM users WHERE username = ?", (username,)
+        ).fetchone()
+        return _row_to_record(row) if row else None
+
+    def exists(self, username: str) -> bool:
+        row = self._connect().execute(
+            "SELECT 1 FROM users WHERE username = ?", (username,)
+        ).fetchone()
+        return row is not None
+
+    def usernames(self) -> Iterator[str]:
+        for row in self._connect().execute("SELECT username FROM users ORDER BY username"):
+            yield row["username"]
+
+    def count(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM users").fetchone()[0]
+
+    def put(self, username: str, record: Mapping[str, Any]) -> None:
+        self.put_many({username: record})
+
+    def put_many(self, records: Mapping[str, Mapping[str, Any]]) -> None:
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "INSERT OR REPLACE INTO users VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (_record_to_row(u, r) for u, r in records.items()),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def increment_failed(self, username: str, now: str, window_start: str) -> int:
+        # One statement, so the read-modify-write is atomic across connections.
+        # The time of the last failure lives in the JSON "extra" column.
+        row = self._connect().execute(
+            """
+            UPDATE users SET
+                failed_attempts = CASE
+                    WHEN json_extract(extra, '$.last_failed_at') >= ? THEN failed_attempts + 1
+                    ELSE 1 END,
+                extra = json_set(COALESCE(extra, '{}'), '$.last_failed_at', ?)
+            WHERE username = ?
+            RETURNING failed_attempts
+            """,
+            (window_start, now, username),
+        ).fetchone()
+        if row is None:
+            raise KeyError(username)
+        return row["failed_attempts"]
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+class LazyUsers(MutableMapping):
+    """
+    Dict-like view over a SqliteUserStore. Records are loaded on first access
+    and cached, so callers can mutate them in place and then persist a single
+    record with store.put(username, users[username]).
+    """
+
+    def __init__(self, store: SqliteUserStore):
+        self._store = store
+        self._cache: Dict[str, Dict[str, Any]] = {}
+
+    def __getitem__(self, username: str) -> Dict[str, Any]:
+        if username not in self._cache:
+            record = self._store.get(username)
+            if record is None:
+                raise KeyError(username)
+            self._cache[username] = record
+        return self._cache[username]
+
+    def __setitem__(self, username: str, record: Dict[str, Any]) -> None:
+        self._cache[username] = record
+
+    def __delitem__(self, username: str) -> None:
+        raise TypeError("Deleting users is not supported")
+
+    def __contains__(self, username: object) -> bool:
+        return username in self._cache or self._store.exists(str(username))
+
+    def __iter__(self) -> Iterator[str]:
+        return self._store.usernames()
+
+    def __len__(self) -> int:
+        return self._store.count()
+
+    def cached(self) -> Dict[str, Dict[str, Any]]:
+        return dict(self._cache)
+
+
+def open_store(backend: str, path: Path):
+    """
+    Build a store for the configured backend name ("json" or "sqlite").
+    """
+    if backend == "json":
+        return JsonUserStore(path)
+    if backend == "sqlite":
+        return SqliteUserStore(path)
+    raise ValueError(f"Unknown user store backend: {backend}")
+
+
+def migrate_json_to_sqlite(json_path: Path, db_path: Path, batch_size: int = 1000) -> int:
+    """
+    Copy every user from a JSON file into an SQLite store. Existing rows with
+    the same username are replaced. Returns the number of users migrated.
+    """
+    users = read_json_users(Path(json_path))
+    store = SqliteUserStore(db_path)
+    try:
+        batch: Dict[str, Any] = {}
+        for username, record in users.items():
+            batch[username] = record
+            if len(batch) >= batch_size:
+                store.put_many(batch)
+                batch = {}
+        if batch:
+            store.put_many(batch)
+    finally:
+        store.close()
+    return len(users)
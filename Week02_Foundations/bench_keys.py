@@ -0,0 +1,67 @@
+# bench_keys.py
+"""
+Key generation and key-wrap cost by key type.
+
+    python bench_keys.py [--keygen 20] [--bulk 200] [--wraps 500] [--workers N]
+
+Reports, for RSA-2048, RSA-3072, X25519 and Ed25519:
+- serial keygen time per key,
+- bulk keystore generation rate with generate_keys.generate_keystore
+  (parallel across --workers processes),
+and for the key types that can wrap (RSA, X25519) the per-operation cost of
+wrap (sender) and unwrap (receiver) of a 32-byte session key.
+"""
+import argparse, os, tempfile, time
+
+import generate_keys
+import keywrap
+
+TYPES = [("rsa-2048", "rsa", 2048), ("rsa-3072", "rsa", 3072), ("x25519", "x25519", 0), ("ed25519", "ed25519", 0)]
+
+
+def per_op_ms(fn, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - start) / n * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keygen and key-wrap benchmark")
+    parser.add_argument("--keygen", type=int, default=20, help="Keys per type for serial keygen timing")
+    parser.add_argument("--bulk", type=int, default=200, help="Keys per type for bulk keystore generation")
+    parser.add_argument("--wraps", type=int, default=500, help="Wrap/unwrap operations per type")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    workers = args.workers or os.cpu_count()
+    session_key = os.urandom(32)
+
+    print(f"{'type':<10}{'keygen ms':>11}{'bulk keys/s':>13}{'wrap ms':>10}{'unwrap ms':>11}{'wrapped B':>11}")
+    for name, key_type, bits in TYPES:
+        # RSA keygen is slow; fewer samples for the larger size keep the run short.
+        n = max(1, args.keygen // (4 if bits > 2048 else 1))
+        keygen_ms = per_op_ms(lambda: generate_keys.generate_private_key(key_type, bits or 2048), n)
+
+        bulk = max(1, args.bulk // (8 if key_type == "rsa" else 1))
+        with tempfile.TemporaryDirectory() as tmp:
+            start = time.perf_counter()
+            generate_keys.generate_keystore(tmp, bulk, key_type, bits or 2048, workers)
+            bulk_rate = bulk / (time.perf_counter() - start)
+
+        wrap_ms = unwrap_ms = size = None
+        if key_type != "ed25519":
+            private_key = generate_keys.generate_private_key(key_type, bits or 2048)
+            public_key = private_key.public_key()
+            wrapped = keywrap.wrap_key(public_key, session_key)
+            assert keywrap.unwrap_key(private_key, wrapped) == session_key
+            size = len(wrapped)
+            wrap_ms = per_op_ms(lambda: keywrap.wrap_key(public_key, session_key), args.wraps)
+            unwrap_ms = per_op_ms(lambda: keywrap.unwrap_key(private_key, wrapped), args.wraps)
+
+        cells = [f"{v:.3f}" if v is not None else "-" for v in (wrap_ms, unwrap_ms)]
+        print(f"{name:<10}{keygen_ms:>11.2f}{bulk_rate:>13.1f}{cells[0]:>10}{cells[1]:>11}{size or '-':>11}")
+    print(f"Bulk generation used {workers} worker processes.")
+
+
+if __name__ == "__main__":
+    main()
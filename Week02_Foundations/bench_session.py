@@ -0,0 +1,148 @@
+# bench_session.py
+"""
+Messages/sec for session mode versus one RSA-OAEP wrap per message.
+
+    python bench_session.py [--messages 20000] [--per-message 500] [--size 200] [--rotate-messages 5000]
+
+Two comparisons are printed:
+
+- crypto only (in-process): per-message RSA wrap + unwrap + AES-GCM, versus
+  AES-GCM under a session key that is wrapped once and ratcheted every
+  --rotate-messages messages.
+- loopback: session mode over one connection to a receiver thread, versus
+  the original behaviour of sender.py (a new connection and JSON package
+  per message).
+
+The per-message runs use --per-message messages since each costs an RSA
+private-key operation.
+"""
+import argparse, os, socket, threading, time
+
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+import protocol
+
+
+def rate(n, seconds):
+    return n / seconds if seconds else float("inf")
+
+
+def crypto_per_message(private_key, public_key, message, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        key = AESGCM.generate_key(bit_length=256)
+        nonce = os.urandom(12)
+        ciphertext = AESGCM(key).encrypt(nonce, message, None)
+        wrapped = public_key.encrypt(key, protocol.OAEP)
+        AESGCM(private_key.decrypt(wrapped, protocol.OAEP)).decrypt(nonce, ciphertext, None)
+    return rate(n, time.perf_counter() - start)
+
+
+def crypto_session(private_key, public_key, message, n, rotate_messages):
+    class NullSocket:
+        def __init__(self):
+            self.frames = []
+        def sendall(self, data):
+            self.frames.append(data)
+
+    start = time.perf_counter()
+    sink = NullSocket()
+    sender = protocol.SessionSender(sink, public_key, rotate_messages=rotate_messages)
+    header, frames = sink.frames[0], sink.frames[1:]
+    key_len = int.from_bytes(header[1:3], "big")
+    receiver = protocol.SessionDecryptor(private_key.decrypt(header[3:3 + key_len], protocol.OAEP), header[3 + key_len:])
+    for _ in range(n):
+        sender.send(message)
+        frame = sink.frames.pop()
+        flags, length = protocol.FRAME_HEADER.unpack_from(frame)
+        receiver.decrypt(flags, frame[protocol.FRAME_HEADER.size:])
+    return rate(n, time.perf_counter() - start)
+
+
+def serve(private_key, connections, handler):
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen(128)
+
+    def run():
+        for _ in range(connections):
+            conn, _ = server.accept()
+            with conn:
+                handler(conn)
+        server.close()
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    return server.getsockname()[1], thread
+
+
+def loopback_session(private_key, public_key, message, n, rotate_messages):
+    received = []
+
+    def handler(conn):
+        conn.recv(1)
+        protocol.receive_session(conn, private_key, received.append)
+
+    port, thread = serve(private_key, 1, handler)
+    start = time.perf_counter()
+    with socket.create_connection(("127.0.0.1", port)) as s:
+        session = protocol.SessionSender(s, public_key, rotate_messages=rotate_messages)
+        for _ in range(n):
+            session.send(message)
+        session.close()
+    thread.join()
+    assert len(received) == n
+    return rate(n, time.perf_counter() - start)
+
+
+def loopback_per_message(private_key, public_key, message, n):
+    received = []
+
+    def handler(conn):
+        chunks = []
+        while True:
+            chunk = conn.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        received.append(protocol.decode_json_package(private_key, b"".join(chunks)))
+
+    port, thread = serve(private_key, n, handler)
+    start = time.perf_counter()
+    for _ in range(n):
+        with socket.create_connection(("127.0.0.1", port)) as s:
+            s.sendall(protocol.encode_json_package(public_key, message))
+    thread.join()
+    assert len(received) == n
+    return rate(n, time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Session mode versus per-message RSA benchmark")
+    parser.add_argument("--messages", type=int, default=20000, help="Messages for session-mode runs")
+    parser.add_argument("--per-message", type=int, default=500, help="Messages for per-message RSA runs")
+    parser.add_argument("--size", type=int, default=200, help="Message size in bytes")
+    parser.add_argument("--rotate-messages", type=int, default=5000)
+    args = parser.parse_args()
+
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    public_key = private_key.public_key()
+    message = os.urandom(args.size)
+
+    results = [
+        ("crypto: per-message RSA", crypto_per_message(private_key, public_key, message, args.per_message)),
+        ("crypto: session", crypto_session(private_key, public_key, message, args.messages, args.rotate_messages)),
+        ("loopback: per-message", loopback_per_message(private_key, public_key, message, args.per_message)),
+        ("loopback: session", loopback_session(private_key, public_key, message, args.messages, args.rotate_messages)),
+    ]
+    print(f"{args.size}-byte messages, session key ratcheted every {args.rotate_messages} messages")
+    print(f"{'mode':<26}{'msg/s':>12}")
+    for name, value in results:
+        print(f"{name:<26}{value:>12.0f}")
+    print(f"Session speed-up: {results[1][1] / results[0][1]:.0f}x crypto, "
+          f"{results[3][1] / results[2][1]:.0f}x loopback")
+
+
+if __name__ == "__main__":
+    main()
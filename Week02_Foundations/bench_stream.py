@@ -0,0 +1,105 @@
+# bench_stream.py
+"""
+Loopback throughput benchmark for the streaming mode.
+
+    python bench_stream.py [--size-mib 512] [--chunk-sizes 16,64,256,1024] [--single-size-mib 32]
+
+A receiver thread listens on an ephemeral port and discards the decrypted
+output; the sender streams --size-mib of generated data without holding it
+in memory. Each chunk size (KiB) is reported in MiB/s. The single-message
+formats (binary envelope and the original JSON package) are measured too,
+on a smaller payload since they are buffered whole on both sides. Peak RSS is printed at the end to show memory stays flat.
+"""
+import argparse, os, resource, socket, threading, time
+
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+import protocol
+
+
+class GeneratedSource:
+    """Readable file object producing `size` bytes from one reused random block."""
+    def __init__(self, size):
+        self.remaining = size
+        self.block = os.urandom(1024 * 1024)
+
+    def read(self, n):
+        n = min(n, self.remaining)
+        self.remaining -= n
+        if n <= len(self.block):
+            return self.block[:n]
+        return (self.block * (n // len(self.block) + 1))[:n]
+
+
+class Sink:
+    def __init__(self):
+        self.total = 0
+
+    def write(self, data):
+        self.total += len(data)
+
+
+def run_once(private_key, public_key, size, chunk_size=None, single="json"):
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen(1)
+    port = server.getsockname()[1]
+    result = {}
+
+    def receive():
+        conn, _ = server.accept()
+        with conn:
+            first = conn.recv(1)
+            if first[0] == protocol.STREAM_MAGIC:
+                result["bytes"] = protocol.receive_stream(conn, private_key, Sink())
+            elif first[0] == protocol.ENVELOPE_MAGIC:
+                result["bytes"] = len(protocol.receive_envelope(conn, private_key))
+            else:
+                chunks = [first]
+                while True:
+                    chunk = conn.recv(65536)
+                    if not chunk:
+                        break
+                    chunks.append(chunk)
+                result["bytes"] = len(protocol.decode_json_package(private_key, b"".join(chunks)))
+
+    thread = threading.Thread(target=receive)
+    thread.start()
+    start = time.perf_counter()
+    with socket.create_connection(("127.0.0.1", port)) as s:
+        if chunk_size:
+            protocol.send_stream(s, public_key, GeneratedSource(size), chunk_size)
+        else:
+            encode = protocol.encode_envelope if single == "binary" else protocol.encode_json_package
+            s.sendall(encode(public_key, GeneratedSource(size).read(size)))
+    thread.join()
+    elapsed = time.perf_counter() - start
+    server.close()
+    assert result["bytes"] == size
+    return size / elapsed / (1024 * 1024)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming transport throughput benchmark")
+    parser.add_argument("--size-mib", type=int, default=512)
+    parser.add_argument("--chunk-sizes", default="16,64,256,1024", help="Chunk sizes in KiB")
+    parser.add_argument("--single-size-mib", type=int, default=32)
+    args = parser.parse_args()
+
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    public_key = private_key.public_key()
+    size = args.size_mib * 1024 * 1024
+
+    print(f"{'mode':<22}{'payload':>10}{'MiB/s':>10}")
+    for kib in (int(x) for x in args.chunk_sizes.split(",")):
+        rate = run_once(private_key, public_key, size, kib * 1024)
+        print(f"{f'stream {kib} KiB chunks':<22}{args.size_mib:>7} MiB{rate:>10.1f}")
+    if args.single_size_mib:
+        for single in ("binary", "json"):
+            rate = run_once(private_key, public_key, args.single_size_mib * 1024 * 1024, single=single)
+            print(f"{single + ' package':<22}{args.single_size_mib:>7} MiB{rate:>10.1f}")
+    print(f"Peak RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MiB")
+
+
+if __name__ == "__main__":
+    main()
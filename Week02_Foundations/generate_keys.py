@@ -1,31 +1,137 @@
 # generate_keys.py
+"""
+Key generation for the Week02 demo.
+
+With no arguments this behaves as before: one RSA-2048 pair written to
+private_key.pem / public_key.pem.
+
+Bulk mode generates N pairs in parallel (one process per core, since RSA
+keygen is CPU-bound and dominates) into a keystore directory, with a
+manifest.json recording each key's id, type, files and public-key
+fingerprint:
+
+    python generate_keys.py --count 500 --type x25519 --out-dir keystore
+    python generate_keys.py --count 50 --type rsa --bits 3072 --out-dir keystore --workers 8
+
+Types: rsa, x25519 (ECDH key wrapping, see keywrap.py) and ed25519
+(signing keys; they cannot be used to wrap session keys).
+"""
+import argparse, datetime, hashlib, json, os, time
+from concurrent.futures import ProcessPoolExecutor
+
 from cryptography.hazmat.primitives import serialization
-from cryptography.hazmat.primitives.asymmetric import rsa
-
-# Generate private key
-private_key = rsa.generate_private_key(
-    public_exponent=65537,
-    key_size=2048
-)
-
-# Save private key to a PEM file
-with open("private_key.pem", "wb") as f:
-    f.write(
-        private_key.private_bytes(
-            encoding=serialization.Encoding.PEM,
-            format=serialization.PrivateFormat.PKCS8,
-            encryption_algorithm=serialization.NoEncryption()
-        )
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa, x25519
+
+KEY_TYPES = ("rsa", "x25519", "ed25519")
+
+
+def generate_private_key(key_type="rsa", bits=2048):
+    if key_type == "rsa":
+        return rsa.generate_private_key(public_exponent=65537, key_size=bits)
+    if key_type == "x25519":
+        return x25519.X25519PrivateKey.generate()
+    if key_type == "ed25519":
+        return ed25519.Ed25519PrivateKey.generate()
+    raise ValueError(f"Unknown key type: {key_type}")
+
+
+def private_pem(private_key):
+    return private_key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption()
     )
 
-# Extract and save public key
-public_key = private_key.public_key()
-with open("public_key.pem", "wb") as f:
-    f.write(
-        public_key.public_bytes(
-            encoding=serialization.Encoding.PEM,
-            format=serialization.PublicFormat.SubjectPublicKeyInfo
-        )
+
+def public_pem(public_key):
+    return public_key.public_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PublicFormat.SubjectPublicKeyInfo
     )
 
-print("Keys saved: private_key.pem, public_key.pem")
\ No newline at end of file
+
+def fingerprint(public_key):
+    der = public_key.public_bytes(serialization.Encoding.DER, serialization.PublicFormat.SubjectPublicKeyInfo)
+    return "sha256:" + hashlib.sha256(der).hexdigest()
+
+
+def _generate_job(key_id, key_type, bits, out_dir):
+    private_key = generate_private_key(key_type, bits)
+    priv_name, pub_name = f"{key_id}.key.pem", f"{key_id}.pub.pem"
+    # Private keys are created owner-read/write only.
+    fd = os.open(os.path.join(out_dir, priv_name), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(private_pem(private_key))
+    with open(os.path.join(out_dir, pub_name), "wb") as f:
+        f.write(public_pem(private_key.public_key()))
+    entry = {
+        "id": key_id,
+        "type": key_type,
+        "private_key": priv_name,
+        "public_key": pub_name,
+        "fingerprint": fingerprint(private_key.public_key()),
+        "created_utc": datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+    }
+    if key_type == "rsa":
+        entry["bits"] = bits
+    return entry
+
+
+def generate_keystore(out_dir, count, key_type="rsa", bits=2048, workers=None, prefix=None):
+    """Generate `count` key pairs in parallel and append them to out_dir/manifest.json. Returns the new entries."""
+    os.makedirs(out_dir, exist_ok=True)
+    manifest_path = os.path.join(out_dir, "manifest.json")
+    manifest = {"keys": []}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    start = len(manifest["keys"])
+    prefix = prefix or key_type
+    ids = [f"{prefix}-{start + i:05d}" for i in range(count)]
+    with ProcessPoolExecutor(workers or os.cpu_count()) as pool:
+        entries = list(pool.map(_generate_job, ids, [key_type] * count, [bits] * count, [out_dir] * count,
+                                chunksize=max(1, count // (4 * (workers or os.cpu_count() or 1)))))
+    manifest["keys"].extend(entries)
+    tmp = manifest_path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, manifest_path)
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate key pairs")
+    parser.add_argument("--count", type=int, help="Bulk mode: number of key pairs to add to --out-dir")
+    parser.add_argument("--type", choices=KEY_TYPES, default="rsa")
+    parser.add_argument("--bits", type=int, default=2048, help="RSA key size")
+    parser.add_argument("--out-dir", default="keystore")
+    parser.add_argument("--workers", type=int, default=None, help="Processes (default: cores)")
+    parser.add_argument("--prefix", help="Key id prefix (default: the key type)")
+    parser.add_argument("--private-out", default="private_key.pem", help="Single-pair mode private key file")
+    parser.add_argument("--public-out", default="public_key.pem", help="Single-pair mode public key file")
+    args = parser.parse_args()
+
+    if args.count:
+        t0 = time.perf_counter()
+        entries = generate_keystore(args.out_dir, args.count, args.type, args.bits, args.workers, args.prefix)
+        elapsed = time.perf_counter() - t0
+        print(f"Generated {len(entries)} {args.type} key pairs in {args.out_dir}/ in {elapsed:.2f}s "
+              f"({len(entries) / elapsed:.1f} keys/s); manifest: {os.path.join(args.out_dir, 'manifest.json')}")
+        return
+
+    # Generate private key
+    private_key = generate_private_key(args.type, args.bits)
+
+    # Save private key to a PEM file
+    with open(args.private_out, "wb") as f:
+        f.write(private_pem(private_key))
+
+    # Extract and save public key
+    with open(args.public_out, "wb") as f:
+        f.write(public_pem(private_key.public_key()))
+
+    print(f"Keys saved: {args.private_out}, {args.public_out}")
+
+
+if __name__ == "__main__":
+    main()
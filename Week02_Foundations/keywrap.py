@@ -0,0 +1,63 @@
+# keywrap.py
+"""
+Session-key wrapping for the recipient's key type.
+
+- RSA: RSA-OAEP with SHA-256 (as before). The wrapped key is 256 bytes for
+  RSA-2048 and unwrapping is a private-key operation, the most expensive
+  step on the receiver.
+- X25519: ECDH with a fresh ephemeral key per wrap. Both sides derive a
+  key-encryption key with HKDF-SHA256 from the shared secret (salted with
+  both public keys) and the session key is sealed with AES-GCM. The wrapped
+  form is ephemeral public key (32) || ciphertext+tag (48) = 80 bytes.
+  Because the ephemeral key is discarded, a later compromise of the sender
+  reveals nothing, and unwrapping costs one scalar multiplication.
+
+Ed25519 keys are signing keys and cannot wrap; generate_keys.py can create
+them for identities, but sender/receiver need RSA or X25519.
+"""
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import padding, rsa, x25519
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+
+OAEP = padding.OAEP(
+    mgf=padding.MGF1(algorithm=hashes.SHA256()),
+    algorithm=hashes.SHA256(),
+    label=None,
+)
+
+X25519_INFO = b"week02 x25519 key wrap"
+X25519_PUBLIC_SIZE = 32
+ZERO_NONCE = bytes(12)   # safe: every wrap uses a fresh key-encryption key
+
+
+def _raw(public_key):
+    return public_key.public_bytes(serialization.Encoding.Raw, serialization.PublicFormat.Raw)
+
+
+def _x25519_kek(shared, ephemeral_public, recipient_public):
+    return HKDF(algorithm=hashes.SHA256(), length=32, salt=ephemeral_public + recipient_public,
+                info=X25519_INFO).derive(shared)
+
+
+def wrap_key(public_key, key):
+    if isinstance(public_key, rsa.RSAPublicKey):
+        return public_key.encrypt(key, OAEP)
+    if isinstance(public_key, x25519.X25519PublicKey):
+        ephemeral = x25519.X25519PrivateKey.generate()
+        ephemeral_public = _raw(ephemeral.public_key())
+        kek = _x25519_kek(ephemeral.exchange(public_key), ephemeral_public, _raw(public_key))
+        return ephemeral_public + AESGCM(kek).encrypt(ZERO_NONCE, key, None)
+    raise TypeError(f"cannot wrap keys for {type(public_key).__name__}; use an RSA or X25519 key")
+
+
+def unwrap_key(private_key, wrapped):
+    wrapped = bytes(wrapped)
+    if isinstance(private_key, rsa.RSAPrivateKey):
+        return private_key.decrypt(wrapped, OAEP)
+    if isinstance(private_key, x25519.X25519PrivateKey):
+        ephemeral_public = wrapped[:X25519_PUBLIC_SIZE]
+        shared = private_key.exchange(x25519.X25519PublicKey.from_public_bytes(ephemeral_public))
+        kek = _x25519_kek(shared, ephemeral_public, _raw(private_key.public_key()))
+        return AESGCM(kek).decrypt(ZERO_NONCE, wrapped[X25519_PUBLIC_SIZE:], None)
+    raise TypeError(f"cannot unwrap keys with {type(private_key).__name__}; use an RSA or X25519 key")
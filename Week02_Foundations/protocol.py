@@ -0,0 +1,355 @@
+# protocol.py
+"""
+Shared wire formats for sender.py and receiver.py.
+
+The first byte of a connection selects the format:
+
+- b"{"  : the original single JSON package (base64 fields, AES-CFB), kept
+          for compatibility with older senders and receivers.
+- 0x01  : binary envelope. One message, AES-GCM, length-prefixed fields with
+          no base64, read straight into reusable buffers.
+- 0x02  : streaming mode. The AES-256 session key is wrapped once (see keywrap),
+          then the payload follows as fixed-size AES-GCM chunks, so files of
+          any size move with constant memory on both ends.
+- 0x03  : session mode. The key is wrapped once per connection and many
+          independent messages follow, each its own AES-GCM frame, with the
+          key ratcheted forward after a number of messages or bytes.
+
+Envelope layout (all integers big-endian):
+
+    0x01 | key_len u16 | nonce_len u8 | ct_len u32 | wrapped_key | nonce | ciphertext+tag
+
+The 8-byte header is authenticated as associated data.
+
+Stream layout:
+
+    header : 0x02 | key_len u16 | wrapped_key | nonce_prefix (4) | chunk_size u32
+    frame  : flags u8 | length u32 | AES-GCM ciphertext+tag
+
+Each frame's nonce is nonce_prefix || sequence number (u64), and the flags
+byte and sequence number are authenticated as associated data. The last
+frame carries FLAG_FINAL, so a truncated stream is detected rather than
+silently accepted.
+
+Session layout:
+
+    header : 0x03 | key_len u16 | wrapped_key | nonce_prefix (4)
+    message: flags u8 | length u32 | AES-GCM ciphertext+tag
+
+A message with FLAG_ROTATE tells the receiver that the sender moved to the
+next key (HKDF-SHA256 of the current one) before encrypting it; sequence
+numbers restart at 0 for each key. The associated data is flags, key epoch
+and sequence number. An empty FLAG_FINAL message closes the session, so
+EOF without it is reported as an error.
+"""
+import base64
+import json
+import os
+import struct
+
+from cryptography.hazmat.primitives import serialization, hashes
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+
+from keywrap import OAEP, wrap_key, unwrap_key
+
+HOST = "127.0.0.1"
+PORT = 65432
+
+ENVELOPE_MAGIC = 0x01
+STREAM_MAGIC = 0x02
+SESSION_MAGIC = 0x03
+CHUNK_SIZE = 64 * 1024
+MAX_CHUNK_SIZE = 16 * 1024 * 1024
+FLAG_FINAL = 0x01
+FLAG_ROTATE = 0x02
+ROTATE_MESSAGES = 100_000           # session key lifetime in messages ...
+ROTATE_BYTES = 1024 * 1024 * 1024   # ... or bytes, whichever comes first
+MAX_MESSAGE_SIZE = 16 * 1024 * 1024
+MAX_ENVELOPE_SIZE = 64 * 1024 * 1024
+TAG_SIZE = 16
+
+ENVELOPE_HEADER = struct.Struct(">BHBI")  # magic, wrapped key length, nonce length, ciphertext length
+STREAM_HEADER = struct.Struct(">BH")     # magic, wrapped key length
+STREAM_PARAMS = struct.Struct(">4sI")    # nonce prefix, chunk size
+FRAME_HEADER = struct.Struct(">BI")      # flags, ciphertext length
+NONCE_SEQ = struct.Struct(">Q")
+AAD = struct.Struct(">BQ")               # flags, sequence number
+SESSION_AAD = struct.Struct(">BIQ")      # flags, key epoch, sequence number
+
+def load_public_key(path="public_key.pem"):
+    with open(path, "rb") as f:
+        return serialization.load_pem_public_key(f.read())
+
+
+def load_private_key(path="private_key.pem"):
+    with open(path, "rb") as f:
+        return serialization.load_pem_private_key(f.read(), password=None)
+
+
+def recv_exact(sock, view):
+    """Fill a writable memoryview from the socket. Returns False on a clean EOF before any byte."""
+    got = 0
+    while got < len(view):
+        n = sock.recv_into(view[got:])
+        if n == 0:
+            if got == 0:
+                return False
+            raise ConnectionError("connection closed mid-frame")
+        got += n
+    return True
+
+
+def recv_bytes(sock, n):
+    buf = bytearray(n)
+    if n and not recv_exact(sock, memoryview(buf)):
+        raise ConnectionError("connection closed before header")
+    return buf
+
+
+# Original JSON package (AES-CFB, one message per connection)
+
+def encode_json_package(public_key, message):
+    aes_key = os.urandom(32)
+    iv = os.urandom(16)
+    encryptor = Cipher(algorithms.AES(aes_key), modes.CFB(iv)).encryptor()
+    ciphertext = encryptor.update(message) + encryptor.finalize()
+    encrypted_key = wrap_key(public_key, aes_key)
+    return json.dumps({
+        "encrypted_key": base64.b64encode(encrypted_key).decode("utf-8"),
+        "iv": base64.b64encode(iv).decode("utf-8"),
+        "ciphertext": base64.b64encode(ciphertext).decode("utf-8"),
+    }).encode("utf-8")
+
+
+def decode_json_package(private_key, raw):
+    package = json.loads(raw)
+    enc_key = base64.b64decode(package["encrypted_key"])
+    iv = base64.b64decode(package["iv"])
+    ciphertext = base64.b64decode(package["ciphertext"])
+    aes_key = unwrap_key(private_key, enc_key)
+    decryptor = Cipher(algorithms.AES(aes_key), modes.CFB(iv)).decryptor()
+    return decryptor.update(ciphertext) + decryptor.finalize()
+
+
+# Binary envelope (one message per connection)
+
+def encode_envelope(public_key, message):
+    aes_key = AESGCM.generate_key(bit_length=256)
+    nonce = os.urandom(12)
+    wrapped = wrap_key(public_key, aes_key)
+    header = ENVELOPE_HEADER.pack(ENVELOPE_MAGIC, len(wrapped), len(nonce), len(message) + TAG_SIZE)
+    return b"".join((header, wrapped, nonce, AESGCM(aes_key).encrypt(nonce, message, header)))
+
+
+def decrypt_envelope(private_key, header, wrapped, nonce, ciphertext):
+    """Decrypt envelope fields given as bytes or memoryviews (only the small wrapped key is copied to bytes)."""
+    aes_key = unwrap_key(private_key, wrapped)
+    return AESGCM(aes_key).decrypt(nonce, ciphertext, header)
+
+
+def parse_envelope_header(header):
+    magic, key_len, nonce_len, ct_len = ENVELOPE_HEADER.unpack(header)
+    if ct_len > MAX_ENVELOPE_SIZE or ct_len < TAG_SIZE:
+        raise ValueError(f"envelope ciphertext length {ct_len} out of range")
+    return key_len, nonce_len, ct_len
+
+
+class EnvelopeReader:
+    """Receives envelopes into buffers that are allocated once and grown only when a larger message arrives."""
+
+    def __init__(self, initial_size=64 * 1024):
+        self.header = bytearray(ENVELOPE_HEADER.size)
+        self.buf = bytearray(initial_size)
+
+    def read(self, sock, magic_consumed=True):
+        """Returns (header, wrapped, nonce, ciphertext) as memoryviews over the reusable buffers."""
+        header = memoryview(self.header)
+        start = 0
+        if magic_consumed:
+            header[0] = ENVELOPE_MAGIC
+            start = 1
+        if not recv_exact(sock, header[start:]):
+            raise ConnectionError("connection closed mid-envelope")
+        key_len, nonce_len, ct_len = parse_envelope_header(header)
+        body_len = key_len + nonce_len + ct_len
+        if len(self.buf) < body_len:
+            self.buf = bytearray(body_len)
+        body = memoryview(self.buf)[:body_len]
+        if not recv_exact(sock, body):
+            raise ConnectionError("connection closed mid-envelope")
+        return header, body[:key_len], body[key_len:key_len + nonce_len], body[key_len + nonce_len:]
+
+
+def receive_envelope(sock, private_key, reader=None):
+    """Read one envelope (magic byte already consumed) and return the plaintext."""
+    return decrypt_envelope(private_key, *(reader or EnvelopeReader()).read(sock))
+
+
+# Streaming mode
+
+def send_stream(sock, public_key, src, chunk_size=CHUNK_SIZE):
+    """Encrypt a readable binary file object chunk by chunk onto the socket. Returns plaintext bytes sent."""
+    aes_key = AESGCM.generate_key(bit_length=256)
+    aead = AESGCM(aes_key)
+    prefix = os.urandom(4)
+    wrapped = wrap_key(public_key, aes_key)
+    sock.sendall(STREAM_HEADER.pack(STREAM_MAGIC, len(wrapped)) + wrapped + STREAM_PARAMS.pack(prefix, chunk_size))
+
+    total = 0
+    seq = 0
+    chunk = src.read(chunk_size)
+    while True:
+        # Read one chunk ahead so the last frame can be flagged as final.
+        following = src.read(chunk_size) if chunk else b""
+        flags = 0 if following else FLAG_FINAL
+        ciphertext = aead.encrypt(prefix + NONCE_SEQ.pack(seq), chunk, AAD.pack(flags, seq))
+        sock.sendall(FRAME_HEADER.pack(flags, len(ciphertext)) + ciphertext)
+        total += len(chunk)
+        if flags & FLAG_FINAL:
+            return total
+        chunk = following
+        seq += 1
+
+
+class StreamDecryptor:
+    """Per-stream frame state: checks frame sizes and tracks the sequence number."""
+
+    def __init__(self, aes_key, prefix, chunk_size):
+        if chunk_size > MAX_CHUNK_SIZE:
+            raise ValueError(f"chunk size {chunk_size} exceeds limit")
+        self.aead = AESGCM(aes_key)
+        self.prefix = prefix
+        self.max_frame = chunk_size + TAG_SIZE
+        self.seq = 0
+        self.finished = False
+
+    def check_length(self, length):
+        if length > self.max_frame:
+            raise ValueError(f"frame of {length} bytes exceeds chunk size")
+
+    def decrypt(self, flags, ciphertext):
+        seq = self.seq
+        plaintext = self.aead.decrypt(self.prefix + NONCE_SEQ.pack(seq), ciphertext, AAD.pack(flags, seq))
+        self.seq += 1
+        self.finished = bool(flags & FLAG_FINAL)
+        return plaintext
+
+
+def receive_stream(sock, private_key, dst):
+    """Read a stream (magic byte already consumed) and write plaintext to dst as it arrives. Returns bytes written."""
+    (key_len,) = struct.unpack(">H", recv_bytes(sock, 2))
+    aes_key = unwrap_key(private_key, recv_bytes(sock, key_len))
+    prefix, chunk_size = STREAM_PARAMS.unpack(recv_bytes(sock, STREAM_PARAMS.size))
+    stream = StreamDecryptor(aes_key, prefix, chunk_size)
+
+    header = bytearray(FRAME_HEADER.size)
+    view = memoryview(bytearray(stream.max_frame))
+    total = 0
+    while not stream.finished:
+        if not recv_exact(sock, memoryview(header)):
+            raise ValueError("stream truncated before final chunk")
+        flags, length = FRAME_HEADER.unpack(header)
+        stream.check_length(length)
+        if length and not recv_exact(sock, view[:length]):
+            raise ConnectionError("connection closed mid-frame")
+        plaintext = stream.decrypt(flags, view[:length])
+        dst.write(plaintext)
+        total += len(plaintext)
+    return total
+
+
+# Session mode
+
+def ratchet(key):
+    return HKDF(algorithm=hashes.SHA256(), length=32, salt=None, info=b"week02 session ratchet").derive(key)
+
+
+class SessionSender:
+    """Wraps one key per connection, then send() encrypts each message as its own frame."""
+
+    def __init__(self, sock, public_key, rotate_messages=ROTATE_MESSAGES, rotate_bytes=ROTATE_BYTES):
+        self.sock = sock
+        self.rotate_messages = rotate_messages
+        self.rotate_bytes = rotate_bytes
+        self.key = AESGCM.generate_key(bit_length=256)
+        self.aead = AESGCM(self.key)
+        self.prefix = os.urandom(4)
+        self.epoch = 0
+        self.seq = 0
+        self.key_bytes = 0
+        self.messages = 0
+        wrapped = wrap_key(public_key, self.key)
+        sock.sendall(STREAM_HEADER.pack(SESSION_MAGIC, len(wrapped)) + wrapped + self.prefix)
+
+    def _frame(self, flags, message):
+        ciphertext = self.aead.encrypt(self.prefix + NONCE_SEQ.pack(self.seq), message,
+                                       SESSION_AAD.pack(flags, self.epoch, self.seq))
+        self.sock.sendall(FRAME_HEADER.pack(flags, len(ciphertext)) + ciphertext)
+        self.seq += 1
+
+    def send(self, message):
+        if len(message) > MAX_MESSAGE_SIZE:
+            raise ValueError("message too large for session mode; use streaming mode")
+        flags = 0
+        if self.seq >= self.rotate_messages or self.key_bytes + len(message) > self.rotate_bytes:
+            self.key = ratchet(self.key)
+            self.aead = AESGCM(self.key)
+            self.epoch += 1
+            self.seq = 0
+            self.key_bytes = 0
+            flags = FLAG_ROTATE
+        self._frame(flags, message)
+        self.key_bytes += len(message)
+        self.messages += 1
+
+    def close(self):
+        self._frame(FLAG_FINAL, b"")
+
+
+class SessionDecryptor:
+    """Receiver side of a session. Follows key rotations; replayed or reordered frames fail authentication."""
+
+    def __init__(self, key, prefix):
+        self.key = key
+        self.aead = AESGCM(key)
+        self.prefix = prefix
+        self.epoch = 0
+        self.seq = 0
+        self.finished = False
+
+    def check_length(self, length):
+        if length > MAX_MESSAGE_SIZE + TAG_SIZE:
+            raise ValueError(f"message of {length} bytes exceeds limit")
+
+    def decrypt(self, flags, ciphertext):
+        if flags & FLAG_ROTATE:
+            self.key = ratchet(self.key)
+            self.aead = AESGCM(self.key)
+            self.epoch += 1
+            self.seq = 0
+        plaintext = self.aead.decrypt(self.prefix + NONCE_SEQ.pack(self.seq), ciphertext,
+                                      SESSION_AAD.pack(flags, self.epoch, self.seq))
+        self.seq += 1
+        self.finished = bool(flags & FLAG_FINAL)
+        return plaintext
+
+
+def receive_session(sock, private_key, on_message):
+    """Read a session (magic byte already consumed), calling on_message(bytes) for each message. Returns the count."""
+    (key_len,) = struct.unpack(">H", recv_bytes(sock, 2))
+    key = unwrap_key(private_key, recv_bytes(sock, key_len))
+    session = SessionDecryptor(key, bytes(recv_bytes(sock, 4)))
+    header = bytearray(FRAME_HEADER.size)
+    count = 0
+    while True:
+        if not recv_exact(sock, memoryview(header)):
+            raise ValueError("session ended without close")
+        flags, length = FRAME_HEADER.unpack(header)
+        session.check_length(length)
+        message = session.decrypt(flags, bytes(recv_bytes(sock, length)))
+        if session.finished:
+            return count
+        on_message(message)
+        count += 1
@@ -1,55 +1,67 @@
 # receiver.py
-import socket, json, base64
-from cryptography.hazmat.primitives import serialization, hashes
-from cryptography.hazmat.primitives.asymmetric import padding
-from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
-
-HOST = "127.0.0.1"
-PORT = 65432
-
-# Load private key
-with open("private_key.pem", "rb") as f:
-    private_key = serialization.load_pem_private_key(f.read(), password=None)
-
-with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-    s.bind((HOST, PORT))
-    s.listen(1)
-    print(f"Waiting for connection on {HOST}:{PORT} ...")
-
-    conn, addr = s.accept()
-    with conn:
-        print(f"Connected by {addr}")
-
-        # Read till the client closes the connection
-        chunks = []
-        while True:
-            chunk = conn.recv(8192)
-            if not chunk:
-                break
-            chunks.append(chunk)
-        raw = b"".join(chunks).decode("utf-8")
-
-        if not raw:
-            print("No data received.")
-        else:
-            package = json.loads(raw)
-            enc_key = base64.b64decode(package["encrypted_key"])
-            iv = base64.b64decode(package["iv"])
-            ciphertext = base64.b64decode(package["ciphertext"])
-
-            # RSA decrypt AES key
-            aes_key = private_key.decrypt(
-                enc_key,
-                padding.OAEP(
-                    mgf=padding.MGF1(algorithm=hashes.SHA256()),
-                    algorithm=hashes.SHA256(),
-                    label=None,
-                ),
-            )
-
-            # AES decrypt message
-            cipher = Cipher(algorithms.AES(aes_key), modes.CFB(iv))
-            decryptor = cipher.decryptor()
-            message = decryptor.update(ciphertext) + decryptor.finalize()
-
-            print("Decrypted message:", message.decode("utf-8"))
+import argparse, socket
+
+from protocol import (HOST, PORT, ENVELOPE_MAGIC, STREAM_MAGIC, SESSION_MAGIC, load_private_key,
+                      decode_json_package, receive_envelope, receive_stream, receive_session)
+
+
+def handle_connection(conn, private_key, out_path):
+    first = conn.recv(1)
+    if not first:
+        print("No data received.")
+        return
+
+    if first[0] == ENVELOPE_MAGIC:
+        # Binary envelope: fields are received into one buffer and decrypted from memoryviews
+        message = receive_envelope(conn, private_key)
+        print("Decrypted message:", message.decode("utf-8", "replace"))
+        return
+
+    if first[0] == STREAM_MAGIC:
+        # Streaming mode: decrypt and write each chunk as it arrives
+        with open(out_path, "wb") as dst:
+            total = receive_stream(conn, private_key, dst)
+        print(f"Decrypted stream of {total} bytes written to {out_path}")
+        return
+
+    if first[0] == SESSION_MAGIC:
+        # Session mode: many messages under one wrapped key
+        count = receive_session(conn, private_key, lambda m: print("Decrypted message:", m.decode("utf-8", "replace")))
+        print(f"Session closed after {count} messages")
+        return
+
+    # JSON package (compatibility): read till the client closes the connection
+    chunks = [first]
+    while True:
+        chunk = conn.recv(8192)
+        if not chunk:
+            break
+        chunks.append(chunk)
+    message = decode_json_package(private_key, b"".join(chunks).decode("utf-8"))
+    print("Decrypted message:", message.decode("utf-8"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hybrid-encryption receiver")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--key", default="private_key.pem")
+    parser.add_argument("--out", default="received.bin", help="Where streamed files are written")
+    args = parser.parse_args()
+
+    # Load private key
+    private_key = load_private_key(args.key)
+
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind((args.host, args.port))
+        s.listen(1)
+        print(f"Waiting for connection on {args.host}:{args.port} ...")
+
+        conn, addr = s.accept()
+        with conn:
+            print(f"Connected by {addr}")
+            handle_connection(conn, private_key, args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+# receiver_server.py
+"""
+Long-running asyncio receiver for many simultaneous senders.
+
+Unlike receiver.py (one connection, then exit), this server loads the
+private key once and keeps accepting connections. Every wire format from
+protocol.py is accepted, told apart by the first byte: the JSON package
+(b"{"), the 0x01 binary envelope, 0x02 streaming and 0x03 session mode.
+
+The expensive key unwrap (RSA-OAEP) runs on a worker pool (threads by
+default, or processes with --pool process, where each worker loads the key
+once in its initializer), and AES-GCM chunks are decrypted and written on a
+thread so the event loop only moves bytes.
+
+Stats: one line per connection when it closes (bytes, duration, MiB/s) and
+an aggregate line every --stats-interval seconds and at shutdown.
+
+    python receiver_server.py [--port 65432] [--workers 4] [--pool thread|process] [--out-dir received]
+    python swarm.py --clients 50            # in another terminal
+"""
+import argparse, asyncio, os, struct, time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import protocol
+
+MAX_JSON_BYTES = 64 * 1024 * 1024
+
+# Key used by pool workers: set directly for threads, loaded by the initializer in processes.
+_worker_key = None
+
+
+def _init_worker(key_path):
+    global _worker_key
+    _worker_key = protocol.load_private_key(key_path)
+
+
+def _unwrap_job(wrapped):
+    return protocol.unwrap_key(_worker_key, wrapped)
+
+
+def _decode_json_job(raw):
+    return protocol.decode_json_package(_worker_key, raw)
+
+
+def _decrypt_envelope_job(header, body, key_len, nonce_len):
+    view = memoryview(body)
+    return protocol.decrypt_envelope(_worker_key, header, view[:key_len],
+                                     view[key_len:key_len + nonce_len], view[key_len + nonce_len:])
+
+
+class ConnectionStats:
+    def __init__(self, conn_id, peer):
+        self.conn_id = conn_id
+        self.peer = peer
+        self.mode = "?"
+        self.started = time.perf_counter()
+        self.finished = None
+        self.bytes_in = 0
+        self.plaintext = 0
+        self.messages = 0
+        self.error = None
+
+    def elapsed(self):
+        return (self.finished or time.perf_counter()) - self.started
+
+    def summary(self):
+        secs = self.elapsed()
+        rate = self.bytes_in / secs / (1024 * 1024) if secs else 0.0
+        status = f"error: {self.error}" if self.error else "ok"
+        msg_rate = self.messages / secs if secs else 0.0
+        return (f"[conn {self.conn_id}] {self.peer} {self.mode}: {self.messages} msg, "
+                f"{self.plaintext} bytes in {secs:.3f}s ({rate:.1f} MiB/s, {msg_rate:.0f} msg/s) {status}")
+
+
+class ReceiverServer:
+    def __init__(self, key_path="private_key.pem", workers=None, pool="thread", out_dir="received", quiet=False):
+        self.workers = workers or os.cpu_count() or 1
+        if pool == "process":
+            self.pool = ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(key_path,))
+        else:
+            _init_worker(key_path)
+            self.pool = ThreadPoolExecutor(self.workers, thread_name_prefix="rsa")
+        self.out_dir = out_dir
+        self.quiet = quiet
+        self.on_message = None   # optional callback(stats, message) for session messages
+        self.next_id = 0
+        self.active = {}
+        self.closed = []
+        self.started = time.perf_counter()
+        os.makedirs(out_dir, exist_ok=True)
+
+    async def _offload(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.pool, fn, *args)
+
+    async def handle(self, reader, writer):
+        self.next_id += 1
+        stats = ConnectionStats(self.next_id, writer.get_extra_info("peername"))
+        self.active[stats.conn_id] = stats
+        try:
+            first = await reader.read(1)
+            if not first:
+                stats.mode = "empty"
+            elif first[0] == protocol.ENVELOPE_MAGIC:
+                stats.mode = "envelope"
+                await self._receive_envelope(first, reader, stats)
+            elif first[0] == protocol.STREAM_MAGIC:
+                stats.mode = "stream"
+                await self._receive_stream(reader, stats)
+            elif first[0] == protocol.SESSION_MAGIC:
+                stats.mode = "session"
+                await self._receive_session(reader, stats)
+            else:
+                stats.mode = "json"
+                await self._receive_json(first, reader, stats)
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError) as e:
+            stats.error = str(e) or type(e).__name__
+        except Exception as e:   # bad tag, bad key: report it and keep serving
+            stats.error = f"{type(e).__name__}: {e}"
+        finally:
+            stats.finished = time.perf_counter()
+            del self.active[stats.conn_id]
+            self.closed.append(stats)
+            writer.close()
+            if not self.quiet:
+                print(stats.summary())
+
+    async def _receive_json(self, first, reader, stats):
+        # The package ends when the sender closes its side of the connection.
+        parts = [first]
+        size = 1
+        while True:
+            part = await reader.read(65536)
+            if not part:
+                break
+            size += len(part)
+            if size > MAX_JSON_BYTES:
+                raise ValueError("JSON package too large")
+            parts.append(part)
+        raw = b"".join(parts)
+        stats.bytes_in = size
+        message = await self._offload(_decode_json_job, raw)
+        stats.plaintext = len(message)
+        stats.messages = 1
+        if not self.quiet:
+            print(f"[conn {stats.conn_id}] Decrypted message: {message.decode('utf-8', 'replace')}")
+
+    async def _receive_envelope(self, first, reader, stats):
+        header = first + await reader.readexactly(protocol.ENVELOPE_HEADER.size - 1)
+        key_len, nonce_len, ct_len = protocol.parse_envelope_header(header)
+        body = await reader.readexactly(key_len + nonce_len + ct_len)
+        stats.bytes_in = len(header) + len(body)
+        message = await self._offload(_decrypt_envelope_job, header, body, key_len, nonce_len)
+        stats.plaintext = len(message)
+        stats.messages = 1
+        if not self.quiet:
+            print(f"[conn {stats.conn_id}] Decrypted message: {message.decode('utf-8', 'replace')}")
+
+    async def _receive_stream(self, reader, stats):
+        loop = asyncio.get_running_loop()
+        (key_len,) = struct.unpack(">H", await reader.readexactly(2))
+        wrapped = await reader.readexactly(key_len)
+        aes_key = await self._offload(_unwrap_job, wrapped)
+        prefix, chunk_size = protocol.STREAM_PARAMS.unpack(await reader.readexactly(protocol.STREAM_PARAMS.size))
+        stream = protocol.StreamDecryptor(aes_key, prefix, chunk_size)
+        stats.bytes_in = 1 + 2 + key_len + protocol.STREAM_PARAMS.size
+
+        def decrypt_and_write(flags, ciphertext):
+            plaintext = stream.decrypt(flags, ciphertext)
+            dst.write(plaintext)
+            return len(plaintext)
+
+        path = os.path.join(self.out_dir, f"conn-{stats.conn_id}.bin")
+        with open(path, "wb") as dst:
+            while not stream.finished:
+                try:
+                    flags, length = protocol.FRAME_HEADER.unpack(await reader.readexactly(protocol.FRAME_HEADER.size))
+                except asyncio.IncompleteReadError:
+                    raise ValueError("stream truncated before final chunk") from None
+                stream.check_length(length)
+                ciphertext = await reader.readexactly(length)
+                stats.bytes_in += protocol.FRAME_HEADER.size + length
+                stats.plaintext += await loop.run_in_executor(None, decrypt_and_write, flags, ciphertext)
+        stats.messages = 1
+
+    async def _receive_session(self, reader, stats):
+        (key_len,) = struct.unpack(">H", await reader.readexactly(2))
+        key = await self._offload(_unwrap_job, await reader.readexactly(key_len))
+        session = protocol.SessionDecryptor(key, await reader.readexactly(4))
+        stats.bytes_in = 1 + 2 + key_len + 4
+        while True:
+            try:
+                flags, length = protocol.FRAME_HEADER.unpack(await reader.readexactly(protocol.FRAME_HEADER.size))
+            except asyncio.IncompleteReadError:
+                raise ValueError("session ended without close") from None
+            session.check_length(length)
+            # Messages are small: AES-GCM on the loop is cheaper than a thread hop.
+            message = session.decrypt(flags, await reader.readexactly(length))
+            stats.bytes_in += protocol.FRAME_HEADER.size + length
+            if session.finished:
+                return
+            stats.plaintext += len(message)
+            stats.messages += 1
+            if self.on_message:
+                self.on_message(stats, message)
+
+    def aggregate(self):
+        done = self.closed
+        uptime = time.perf_counter() - self.started
+        total_in = sum(s.bytes_in for s in done) + sum(s.bytes_in for s in self.active.values())
+        return {
+            "uptime_s": round(uptime, 3),
+            "connections": len(done) + len(self.active),
+            "active": len(self.active),
+            "errors": sum(1 for s in done if s.error),
+            "bytes_in": total_in,
+            "plaintext_bytes": sum(s.plaintext for s in done),
+            "messages": sum(s.messages for s in done) + sum(s.messages for s in self.active.values()),
+            "mib_per_s": round(total_in / uptime / (1024 * 1024), 2) if uptime else 0.0,
+        }
+
+    async def report(self, interval):
+        while True:
+            await asyncio.sleep(interval)
+            print("[stats]", " ".join(f"{k}={v}" for k, v in self.aggregate().items()))
+
+    async def start(self, host=protocol.HOST, port=protocol.PORT):
+        return await asyncio.start_server(self.handle, host, port, backlog=1024)
+
+    def close(self):
+        self.pool.shutdown(wait=True)
+
+
+async def serve(args):
+    server_state = ReceiverServer(args.key, args.workers, args.pool, args.out_dir)
+    server = await server_state.start(args.host, args.port)
+    print(f"Receiver listening on {args.host}:{args.port} "
+          f"({server_state.workers} {args.pool} workers, output in {args.out_dir}/)")
+    reporter = asyncio.create_task(server_state.report(args.stats_interval)) if args.stats_interval else None
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        if reporter:
+            reporter.cancel()
+        print("[stats]", " ".join(f"{k}={v}" for k, v in server_state.aggregate().items()))
+        server_state.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent hybrid-encryption receiver")
+    parser.add_argument("--host", default=protocol.HOST)
+    parser.add_argument("--port", type=int, default=protocol.PORT)
+    parser.add_argument("--key", default="private_key.pem")
+    parser.add_argument("--workers", type=int, default=None, help="RSA worker count (default: cores)")
+    parser.add_argument("--pool", choices=["thread", "process"], default="thread")
+    parser.add_argument("--out-dir", default="received", help="Directory for streamed files")
+    parser.add_argument("--stats-interval", type=float, default=10.0, help="Seconds between aggregate lines (0 = off)")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        print("Shutting down.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,48 +1,59 @@
-# sender.py (safe JSON + Base64)
-import socket, os, json, base64
-from cryptography.hazmat.primitives import serialization, hashes
-from cryptography.hazmat.primitives.asymmetric import padding
-from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
-
-HOST = "127.0.0.1"
-PORT = 65432
-
-# Load recipient's public key
-with open("public_key.pem", "rb") as f:
-    public_key = serialization.load_pem_public_key(f.read())
-
-# Message to send
-message = b"Hello from the secure sender! This is confidential."
-
-# Generate random AES key and IV
-aes_key = os.urandom(32)
-iv = os.urandom(16)
-
-#  Encrypt message
-cipher = Cipher(algorithms.AES(aes_key), modes.CFB(iv))
-encryptor = cipher.encryptor()
-ciphertext = encryptor.update(message) + encryptor.finalize()
-
-# Encrypt AES key with RSA
-encrypted_key = public_key.encrypt(
-    aes_key,
-    padding.OAEP(
-        mgf=padding.MGF1(algorithm=hashes.SHA256()),
-        algorithm=hashes.SHA256(),
-        label=None,
-    ),
-)
-
-# Package as JSON
-package = json.dumps({
-    "encrypted_key": base64.b64encode(encrypted_key).decode("utf-8"),
-    "iv": base64.b64encode(iv).decode("utf-8"),
-    "ciphertext": base64.b64encode(ciphertext).decode("utf-8"),
-})
-
-# Send via socket
-with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-    s.connect((HOST, PORT))
-    s.sendall(package.encode("utf-8"))
-
-print("Encrypted message sent!")
+# sender.py (safe JSON + Base64 or --format binary, chunked AES-GCM stream with --file, or many messages with --session)
+import argparse, socket, sys
+
+from protocol import (HOST, PORT, CHUNK_SIZE, ROTATE_MESSAGES, ROTATE_BYTES, SessionSender,
+                      load_public_key, encode_envelope, encode_json_package, send_stream)
+
+DEFAULT_MESSAGE = b"Hello from the secure sender! This is confidential."
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hybrid-encryption sender")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--key", default="public_key.pem", help="Recipient's public key")
+    parser.add_argument("--message", help="Text message to send as a single package")
+    parser.add_argument("--format", choices=["json", "binary"], default="json",
+                        help="Single-message format: JSON package (understood by every receiver), "
+                             "or the smaller binary envelope (needs a receiver from this version on)")
+    parser.add_argument("--file", help="Stream a file in AES-GCM chunks ('-' for stdin)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--session", action="store_true",
+                        help="Send many messages under one wrapped key: each line of --file, or --count copies of --message")
+    parser.add_argument("--count", type=int, default=1, help="Messages to send in session mode")
+    parser.add_argument("--rotate-messages", type=int, default=ROTATE_MESSAGES, help="Session key lifetime in messages")
+    parser.add_argument("--rotate-bytes", type=int, default=ROTATE_BYTES, help="Session key lifetime in bytes")
+    args = parser.parse_args()
+
+    # Load recipient's public key
+    public_key = load_public_key(args.key)
+
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.connect((args.host, args.port))
+        if args.session:
+            session = SessionSender(s, public_key, args.rotate_messages, args.rotate_bytes)
+            if args.file:
+                src = sys.stdin.buffer if args.file == "-" else open(args.file, "rb")
+                with src:
+                    for line in src:
+                        session.send(line.rstrip(b"\r\n"))
+            else:
+                message = args.message.encode("utf-8") if args.message else DEFAULT_MESSAGE
+                for _ in range(args.count):
+                    session.send(message)
+            session.close()
+            print(f"Session sent! ({session.messages} messages, {session.epoch} key rotations)")
+        elif args.file:
+            src = sys.stdin.buffer if args.file == "-" else open(args.file, "rb")
+            with src:
+                sent = send_stream(s, public_key, src, args.chunk_size)
+            print(f"Encrypted stream sent! ({sent} bytes)")
+        else:
+            message = args.message.encode("utf-8") if args.message else DEFAULT_MESSAGE
+            encode = encode_envelope if args.format == "binary" else encode_json_package
+            s.sendall(encode(public_key, message))
+            print("Encrypted message sent!")
+
+
+if __name__ == "__main__":
+    main()
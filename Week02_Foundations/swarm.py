@@ -0,0 +1,45 @@
+# swarm.py
+"""
+Launch many sender.py clients at once against a running receiver_server.py.
+
+    python swarm.py --clients 50 [--file big.bin] [--port 65432]
+
+Each client is a separate `python sender.py` process, exactly as a user
+would run it. Extra arguments after "--" are passed to every sender.
+"""
+import argparse, os, subprocess, sys, time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a swarm of sender.py clients")
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--port", type=int, default=65432)
+    parser.add_argument("--file", help="Stream this file from every client instead of a message")
+    parser.add_argument("sender_args", nargs=argparse.REMAINDER, help="Passed through to sender.py (after --)")
+    args = parser.parse_args()
+
+    cmd = [sys.executable, os.path.join(HERE, "sender.py"), "--port", str(args.port)]
+    if args.file:
+        cmd += ["--file", args.file]
+    cmd += [a for a in args.sender_args if a != "--"]
+
+    start = time.perf_counter()
+    procs = [subprocess.Popen(cmd + ([] if args.file else ["--message", f"hello from client {i}"]),
+                              stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+             for i in range(args.clients)]
+    failures = 0
+    for proc in procs:
+        _, err = proc.communicate()
+        if proc.returncode != 0:
+            failures += 1
+            lines = err.decode(errors="replace").strip().splitlines()
+            print(lines[-1] if lines else f"exit {proc.returncode}")
+    elapsed = time.perf_counter() - start
+    print(f"{args.clients} clients finished in {elapsed:.2f}s, {failures} failed")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
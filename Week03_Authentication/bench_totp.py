@@ -0,0 +1,59 @@
+"""
+Compare the original 2FA check (a new pyotp.TOTP per login) with TOTPVerifier.
+
+    python bench_totp.py [--users 1000] [--logins 20000]
+
+Every user logs in several times within the same time step, as happens
+under load. Replay protection is turned off for the timing loops, otherwise
+all but the first login per user would be rejected.
+"""
+import argparse, random, time
+
+import pyotp
+
+from totp_verifier import TOTPVerifier
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TOTP verification benchmark")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--logins", type=int, default=20000)
+    args = parser.parse_args()
+
+    secrets = [pyotp.random_base32() for _ in range(args.users)]
+    now = time.time()
+    codes = [pyotp.TOTP(s).at(now) for s in secrets]
+    attempts = [(f"user{i}", secrets[i], codes[i]) for i in (random.randrange(args.users) for _ in range(args.logins))]
+
+    t0 = time.perf_counter()
+    ok = sum(pyotp.TOTP(secret).verify(code, for_time=now, valid_window=1) for _, secret, code in attempts)
+    pyotp_secs = time.perf_counter() - t0
+    assert ok == len(attempts)
+
+    verifier = TOTPVerifier(valid_window=1, replay_protection=False)
+    t0 = time.perf_counter()
+    ok = sum(verifier.verify(user, secret, code, now) for user, secret, code in attempts)
+    cached_secs = time.perf_counter() - t0
+    assert ok == len(attempts)
+
+    verifier = TOTPVerifier(valid_window=1, replay_protection=False)
+    t0 = time.perf_counter()
+    ok = sum(verifier.verify_many(attempts, now))
+    batch_secs = time.perf_counter() - t0
+    assert ok == len(attempts)
+
+    print(f"{args.logins} logins across {args.users} users (window +/-1 step)")
+    for label, secs in (("pyotp.TOTP().verify", pyotp_secs), ("TOTPVerifier.verify", cached_secs),
+                        ("TOTPVerifier.verify_many", batch_secs)):
+        print(f"  {label:<26} {secs * 1000:8.1f} ms  {args.logins / secs:10.0f} verifications/s  "
+              f"({pyotp_secs / secs:.1f}x)")
+
+    # Replay protection: the second use of the same code is refused.
+    verifier = TOTPVerifier()
+    user, secret, code = attempts[0]
+    print(f"Replay check: first use {verifier.verify(user, secret, code, now)}, "
+          f"second use {verifier.verify(user, secret, code, now)}")
+
+
+if __name__ == "__main__":
+    main()
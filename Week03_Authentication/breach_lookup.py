@@ -0,0 +1,62 @@
+"""
+Read-only lookups in a breached-password filter file.
+
+The file is built by MiniProject_SecureAuth/scripts/build_breach_filter.py
+(see breach_filter.py there for the format). Only the lookup side is kept
+here so this folder can use the filter without importing across folders:
+
+    header   16 bytes   b"BPWF", version, key size, 2 reserved, count (u64)
+    fanout   65537 x u32  index of the first key for each 2-byte prefix
+    keys     count x 8 bytes (first 8 bytes of SHA-1), sorted, unique
+"""
+import hashlib, mmap, struct
+from pathlib import Path
+
+MAGIC = b"BPWF"
+VERSION = 1
+KEY_BYTES = 8
+HEADER = struct.Struct(">4sBB2xQ")
+KEYS_OFFSET = HEADER.size + 65537 * 4
+
+
+def password_key(password):
+    if isinstance(password, str):
+        password = password.encode("utf-8")
+    return hashlib.sha1(password).digest()[:KEY_BYTES]
+
+
+class BreachFilter:
+    """`password in BreachFilter(path)` checks a password against the filter file."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with self.path.open("rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, key_bytes, self.count = HEADER.unpack_from(self._map, 0)
+        if (magic, version, key_bytes) != (MAGIC, VERSION, KEY_BYTES) \
+                or len(self._map) != KEYS_OFFSET + self.count * KEY_BYTES:
+            self._map.close()
+            raise ValueError(f"{self.path} is not a valid breached-password filter")
+
+    def close(self):
+        self._map.close()
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, password):
+        if not isinstance(password, (str, bytes)):
+            return False
+        key = password_key(password)
+        lo, hi = struct.unpack_from(">II", self._map, HEADER.size + (key[0] << 8 | key[1]) * 4)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            offset = KEYS_OFFSET + mid * KEY_BYTES
+            probe = self._map[offset:offset + KEY_BYTES]
+            if probe < key:
+                lo = mid + 1
+            elif probe > key:
+                hi = mid
+            else:
+                return True
+        return False
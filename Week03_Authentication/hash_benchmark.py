@@ -0,0 +1,231 @@
+"""
+Cost benchmark for password hashing: hash_demo's algorithms, measured.
+
+For every algorithm/parameter set this reports:
+- single-thread latency (median ms per hash),
+- multi-core throughput (hashes/s with one process per core),
+- peak memory of one hash (max RSS growth in a fresh process, in KiB).
+
+md5 and sha256 are included as the "how fast can an attacker go" baseline;
+bcrypt, argon2id and scrypt are the candidates for production parameters.
+
+    python hash_benchmark.py                 # full suite, writes hash_benchmark.json
+    python hash_benchmark.py --quick         # cheaper parameter sets, shorter runs
+    python hash_benchmark.py --only bcrypt,argon2id --json results.json
+"""
+import argparse, hashlib, json, multiprocessing, os, platform, statistics, time
+from concurrent.futures import ProcessPoolExecutor
+
+import bcrypt
+
+try:
+    from argon2.low_level import Type, hash_secret_raw
+except ImportError:   # argon2-cffi is optional here
+    hash_secret_raw = None
+
+try:
+    import resource
+except ImportError:   # not available on Windows; memory column is left empty
+    resource = None
+
+PASSWORD = b"correct horse battery staple"
+SALT = b"0123456789abcdef"
+
+
+def _md5(params):
+    return hashlib.md5(PASSWORD).digest()
+
+
+def _sha256(params):
+    return hashlib.sha256(PASSWORD).digest()
+
+
+def _bcrypt(params):
+    return bcrypt.hashpw(PASSWORD, bcrypt.gensalt(rounds=params["cost"]))
+
+
+def _argon2id(params):
+    return hash_secret_raw(PASSWORD, SALT, time_cost=params["t"], memory_cost=params["m"],
+                           parallelism=params["p"], hash_len=32, type=Type.ID)
+
+
+def _scrypt(params):
+    n, r, p = params["n"], params["r"], params["p"]
+    return hashlib.scrypt(PASSWORD, salt=SALT, n=n, r=r, p=p, maxmem=256 * n * r + 1024 * 1024, dklen=32)
+
+
+HASHERS = {"md5": _md5, "sha256": _sha256, "bcrypt": _bcrypt, "argon2id": _argon2id, "scrypt": _scrypt}
+
+# (algorithm, label, params). m is in KiB for argon2id; scrypt memory is 128 * n * r bytes.
+FULL_SUITE = [
+    ("md5", "", {}),
+    ("sha256", "", {}),
+    ("bcrypt", "cost=10", {"cost": 10}),
+    ("bcrypt", "cost=12", {"cost": 12}),
+    ("bcrypt", "cost=14", {"cost": 14}),
+    ("argon2id", "t=2 m=19MiB p=1", {"t": 2, "m": 19 * 1024, "p": 1}),
+    ("argon2id", "t=3 m=64MiB p=4", {"t": 3, "m": 64 * 1024, "p": 4}),
+    ("argon2id", "t=1 m=256MiB p=4", {"t": 1, "m": 256 * 1024, "p": 4}),
+    ("scrypt", "n=2^14 r=8 p=1", {"n": 2 ** 14, "r": 8, "p": 1}),
+    ("scrypt", "n=2^17 r=8 p=1", {"n": 2 ** 17, "r": 8, "p": 1}),
+]
+QUICK_SUITE = [
+    ("md5", "", {}),
+    ("sha256", "", {}),
+    ("bcrypt", "cost=4", {"cost": 4}),
+    ("bcrypt", "cost=8", {"cost": 8}),
+    ("argon2id", "t=1 m=8MiB p=1", {"t": 1, "m": 8 * 1024, "p": 1}),
+    ("argon2id", "t=2 m=19MiB p=1", {"t": 2, "m": 19 * 1024, "p": 1}),
+    ("scrypt", "n=2^12 r=8 p=1", {"n": 2 ** 12, "r": 8, "p": 1}),
+    ("scrypt", "n=2^14 r=8 p=1", {"n": 2 ** 14, "r": 8, "p": 1}),
+]
+
+
+def measure_latency(algo, params, min_seconds=1.0, min_runs=3, max_runs=100_000):
+    """Median and best single-hash time in ms (fast hashes are timed in blocks to beat timer resolution)."""
+    fn = HASHERS[algo]
+    fn(params)   # warm up
+    t0 = time.perf_counter()
+    fn(params)
+    block = max(1, int(0.001 / max(time.perf_counter() - t0, 1e-9)))
+    samples = []
+    runs = 0
+    start = time.perf_counter()
+    while runs < min_runs * block or (time.perf_counter() - start < min_seconds and runs < max_runs):
+        t0 = time.perf_counter()
+        for _ in range(block):
+            fn(params)
+        samples.append((time.perf_counter() - t0) / block)
+        runs += block
+    return statistics.median(samples) * 1000, min(samples) * 1000, runs
+
+
+def _throughput_job(algo, params, seconds):
+    fn = HASHERS[algo]
+    count = 0
+    deadline = time.perf_counter() + seconds
+    while True:
+        for _ in range(16 if algo in ("md5", "sha256") else 1):
+            fn(params)
+            count += 1
+        if time.perf_counter() >= deadline:
+            return count
+
+
+def measure_throughput(algo, params, pool, workers, seconds=1.0):
+    t0 = time.perf_counter()
+    counts = list(pool.map(_throughput_job, [algo] * workers, [params] * workers, [seconds] * workers))
+    return sum(counts) / (time.perf_counter() - t0)
+
+
+def _peak_rss_kib():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    # ru_maxrss is KiB on Linux, bytes on macOS.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // (1024 if platform.system() == "Darwin" else 1)
+
+
+def _memory_job(algo, params):
+    # Peak RSS survives fork and exec; on Linux, writing 5 to clear_refs
+    # resets it so only this hash is measured.
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+    before = _peak_rss_kib()
+    HASHERS[algo](params)
+    return max(0, _peak_rss_kib() - before)
+
+
+def measure_peak_memory(algo, params):
+    """
+    Peak RSS growth (KiB) of one hash. It runs in a spawned interpreter: a
+    forked child would reuse heap pages the benchmark has already touched.
+    """
+    if resource is None:
+        return None
+    with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return pool.submit(_memory_job, algo, params).result()
+
+
+def run_suite(suite, latency_seconds=1.0, throughput_seconds=1.0, workers=None, progress=print):
+    workers = workers or os.cpu_count() or 1
+    results = []
+    with ProcessPoolExecutor(workers) as pool:
+        for algo, label, params in suite:
+            if algo == "argon2id" and hash_secret_raw is None:
+                progress(f"skipping {algo} {label}: argon2-cffi not installed")
+                continue
+            name = f"{algo} {label}".strip()
+            progress(f"benchmarking {name} ...")
+            median_ms, best_ms, runs = measure_latency(algo, params, latency_seconds)
+            results.append({
+                "algorithm": algo,
+                "params": params,
+                "label": name,
+                "latency_ms": round(median_ms, 6),
+                "latency_best_ms": round(best_ms, 6),
+                "latency_runs": runs,
+                "throughput_per_s": round(measure_throughput(algo, params, pool, workers, throughput_seconds), 1),
+                "peak_memory_kib": measure_peak_memory(algo, params),
+            })
+    return results
+
+
+def format_table(results, workers):
+    lines = [f"{'algorithm':<24} {'latency ms':>12} {'1-core/s':>12} {f'{workers}-core/s':>12} {'peak KiB':>10}",
+             "-" * 74]
+    for r in results:
+        single = 1000 / r["latency_ms"] if r["latency_ms"] else 0.0
+        memory = "-" if r["peak_memory_kib"] is None else f"{r['peak_memory_kib']:,}"
+        lines.append(f"{r['label']:<24} {r['latency_ms']:>12.4f} {single:>12,.0f} "
+                     f"{r['throughput_per_s']:>12,.0f} {memory:>10}")
+    return "\n".join(lines)
+
+
+def run_and_report(quick=False, only=None, json_path="hash_benchmark.json", workers=None, progress=print):
+    """Run the suite, print the comparison table and write the JSON file. Returns the results."""
+    suite = QUICK_SUITE if quick else FULL_SUITE
+    if only:
+        suite = [entry for entry in suite if entry[0] in only]
+    seconds = 0.3 if quick else 1.0
+    workers = workers or os.cpu_count() or 1
+    results = run_suite(suite, seconds, seconds, workers, progress)
+    print(format_table(results, workers))
+    if json_path:
+        report = {
+            "created_utc": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "workers": workers,
+            "quick": quick,
+            "results": results,
+        }
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {json_path}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Password hashing cost benchmark")
+    parser.add_argument("--quick", action="store_true", help="Cheaper parameter sets and shorter runs")
+    parser.add_argument("--only", help=f"Comma list of algorithms ({', '.join(HASHERS)})")
+    parser.add_argument("--workers", type=int, default=None, help="Processes for the throughput test (default: cores)")
+    parser.add_argument("--json", default="hash_benchmark.json", help="Output file ('' to skip)")
+    args = parser.parse_args()
+    only = set(args.only.split(",")) if args.only else None
+    if only and only - set(HASHERS):
+        parser.error(f"unknown algorithm(s): {', '.join(sorted(only - set(HASHERS)))}")
+    run_and_report(args.quick, only, args.json, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 from password_strength import password_strength
 from hashing import hash_demo
 from brute_force import brute_force_demo
+from hash_benchmark import run_and_report
 from system import AuthSystem
 import hashlib
 
@@ -14,6 +15,8 @@ def main():
         print("3) Brute-force demo")
         print("4) Register user (bcrypt + TOTP)")
         print("5) Login user (password + TOTP)")
+        print("6) Save TOTP QR code (PNG/SVG)")
+        print("7) Hash cost benchmark")
         print("0) Exit")
         choice = input("Choice: ")
 
@@ -50,6 +53,25 @@ def main():
             ok, msg = auth.login(user, pwd, token)
             print(msg)
 
+        elif choice == "6":
+            user = input("Username: ")
+            fmt = input("Format (png/svg) [png]: ").strip().lower() or "png"
+            if fmt not in ("png", "svg"):
+                print("Invalid format; choose png or svg.")
+                continue
+            data = auth.qr_code(user, fmt)
+            if data is None:
+                print("User not found.")
+            else:
+                filename = f"totp_{user}.{fmt}"
+                with open(filename, "wb") as f:
+                    f.write(data)
+                print(f"QR code saved to {filename}")
+
+        elif choice == "7":
+            quick = input("Quick run? (Y/n): ").strip().lower() != "n"
+            run_and_report(quick=quick)
+
         elif choice == "0":
             break
 
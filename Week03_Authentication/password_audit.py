@@ -0,0 +1,356 @@
+"""
+Password audit engine: brute_force_demo scaled up to real wordlists and many hashes.
+
+- Wordlists are read lazily from disk, so they never need to fit in memory.
+- Each word is expanded by mutation rules (case changes, leetspeak,
+  appended digits/years/symbols) inside the workers.
+- Candidates are hashed in worker processes and looked up in a set holding
+  every target digest, so the cost is one hash per candidate however many
+  targets there are.
+- Progress (candidates/s) is printed periodically, and a JSON checkpoint
+  records the position in the wordlists so an interrupted audit can resume.
+
+    python password_audit.py --hashes leaked.txt --algo sha256 --wordlist rockyou.txt --rules default
+    python password_audit.py --hashes leaked.txt --wordlist rockyou.txt --checkpoint audit.ckpt --resume
+
+The hashes file holds one hex digest per line, optionally as "user:digest".
+Only unsalted fast hashes (md5, sha1, sha256, sha512) can be audited this way;
+that is the point of the exercise.
+"""
+import argparse, hashlib, json, os, sys, time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from brute_force import COMMON_PASSWORDS
+
+ALGORITHMS = ("md5", "sha1", "sha256", "sha512")
+BATCH_WORDS = 20_000
+LEET = bytes.maketrans(b"aeiost", b"4310$7")
+YEARS = [str(y).encode() for y in range(1970, 2031)]
+SYMBOLS = [b"!", b"@", b"#", b"$", b"?", b"1", b"123"]
+
+
+# Mutation rules: each maps a word (bytes) to an iterable of candidates.
+RULES = {
+    "none": lambda w: (w,),
+    "lower": lambda w: (w.lower(),),
+    "upper": lambda w: (w.upper(),),
+    "capitalize": lambda w: (w.capitalize(),),
+    "reverse": lambda w: (w[::-1],),
+    "leet": lambda w: (w.translate(LEET),),
+    "digits": lambda w: (w + str(d).encode() for d in range(10)),
+    "years": lambda w: (w + y for y in YEARS),
+    "symbols": lambda w: (w + s for s in SYMBOLS),
+}
+RULE_SETS = {
+    "none": ["none"],
+    "default": ["none", "capitalize", "upper", "leet", "digits", "symbols", "capitalize+digits"],
+    "all": list(RULES) + ["capitalize+digits", "capitalize+years", "capitalize+symbols", "leet+digits"],
+}
+
+
+def parse_rules(spec):
+    """
+    A rule-set name or a comma-separated list of rules. Rules joined with
+    "+" are chained, e.g. "capitalize+digits" gives Password0..Password9.
+    """
+    names = RULE_SETS.get(spec, spec.split(","))
+    unknown = sorted({part for name in names for part in name.split("+") if part not in RULES})
+    if unknown:
+        raise ValueError(f"Unknown rule(s): {', '.join(unknown)}")
+    return names
+
+
+def compile_rule(name):
+    steps = [RULES[part] for part in name.split("+")]
+    if len(steps) == 1:
+        return steps[0]
+
+    def chained(word):
+        candidates = [word]
+        for step in steps:
+            candidates = [out for c in candidates for out in step(c)]
+        return candidates
+    return chained
+
+
+def load_targets(path, algo=None):
+    """
+    Read hex digests (optionally "user:digest") into {digest bytes: [users]}.
+    Returns (targets, skipped line numbers); a line is skipped if it is not
+    hex or, when `algo` is given, not that algorithm's digest length.
+    """
+    size = hashlib.new(algo).digest_size if algo else None
+    targets, skipped = {}, []
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            user, _, digest = line.rpartition(":")
+            try:
+                raw = bytes.fromhex(digest)
+            except ValueError:
+                skipped.append(number)
+                continue
+            if size is not None and len(raw) != size:
+                skipped.append(number)
+                continue
+            targets.setdefault(raw, []).append(user or None)
+    return targets, skipped
+
+
+def read_words(paths, start=(0, 0)):
+    """
+    Yield (word, (file_index, offset_after_word)) lazily from each wordlist.
+    `start` is a position from a checkpoint; reading resumes at that byte offset.
+    """
+    first_file, first_offset = start
+    for index, path in enumerate(paths):
+        if index < first_file:
+            continue
+        with open(path, "rb") as f:
+            offset = first_offset if index == first_file else 0
+            f.seek(offset)
+            for line in f:
+                offset += len(line)
+                word = line.rstrip(b"\r\n")
+                if word:
+                    yield word, (index, offset)
+
+
+def builtin_words(start=(0, 0)):
+    """
+    Yield (word, (0, words_done)) from COMMON_PASSWORDS, like read_words;
+    `start` skips the words a checkpoint already covers.
+    """
+    for i in range(start[1], len(COMMON_PASSWORDS)):
+        yield COMMON_PASSWORDS[i].encode(), (0, i + 1)
+
+
+# Worker state, set once per process by the initializer.
+_targets = None
+_hasher = None
+_rules = None
+
+
+def _init_worker(target_digests, algo, rule_names):
+    global _targets, _hasher, _rules
+    _targets = frozenset(target_digests)
+    _hasher = getattr(hashlib, algo)
+    _rules = [compile_rule(name) for name in rule_names]
+
+
+def _audit_batch(words):
+    """Expand and hash one batch. Returns (candidates tried, [(digest, password)])."""
+    targets, hasher = _targets, _hasher
+    tried = 0
+    hits = []
+    for word in words:
+        seen = set()
+        for rule in _rules:
+            for candidate in rule(word):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                tried += 1
+                digest = hasher(candidate).digest()
+                if digest in targets:
+                    hits.append((digest, candidate))
+    return tried, hits
+
+
+class Checkpoint:
+    """
+    JSON progress file: wordlist position, counters and everything cracked so far.
+    `candidates` counts only the words before `position`, so a resumed run
+    that repeats later words does not count them twice.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.position = (0, 0)
+        self.candidates = 0
+        self.found = {}   # hex digest -> password
+
+    def load(self):
+        with open(self.path, encoding="utf-8") as f:
+            data = json.load(f)
+        self.position = tuple(data["position"])
+        self.candidates = data["candidates"]
+        self.found = data["found"]
+        return data
+
+    def save(self, meta):
+        if not self.path:
+            return
+        data = dict(meta, position=list(self.position), candidates=self.candidates, found=self.found)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp, self.path)
+
+
+def audit(targets, words, algo="sha256", rules=("none",), workers=None, batch_words=BATCH_WORDS,
+          checkpoint=None, checkpoint_every=30.0, progress_every=5.0, meta=None, out=sys.stdout):
+    """
+    Run the audit over `words` (an iterable of (word, position)). Returns the
+    Checkpoint holding the cracked passwords and counters. Stops early once
+    every target is cracked.
+    """
+    checkpoint = checkpoint or Checkpoint(None)
+    meta = meta or {}
+    remaining = set(targets) - {bytes.fromhex(h) for h in checkpoint.found}
+    workers = workers or os.cpu_count() or 1
+    run_candidates = 0
+    started = last_progress = last_save = time.perf_counter()
+
+    # Batches finish out of order; the checkpoint (position and candidate
+    # count) only advances past batches whose predecessors are all done, so
+    # a resume never skips words or counts a batch twice.
+    next_batch = 0
+    done_upto = 0
+    ends = {}         # batch number -> wordlist position after its last word
+    completed = {}    # batch number -> candidates tried, for batches not yet checkpointed
+    in_flight = {}    # future -> batch number
+
+    def batches():
+        batch, end = [], None
+        for word, end in words:
+            batch.append(word)
+            if len(batch) >= batch_words:
+                yield batch, end
+                batch = []
+        if batch:
+            yield batch, end
+
+    source = batches()
+    with ProcessPoolExecutor(workers, initializer=_init_worker,
+                             initargs=(list(remaining), algo, list(rules))) as pool:
+        exhausted = False
+        while remaining and (in_flight or not exhausted):
+            while not exhausted and len(in_flight) < workers * 2:
+                try:
+                    batch, end = next(source)
+                except StopIteration:
+                    exhausted = True
+                    break
+                in_flight[pool.submit(_audit_batch, batch)] = next_batch
+                ends[next_batch] = end
+                next_batch += 1
+            if not in_flight:
+                break
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                number = in_flight.pop(future)
+                tried, hits = future.result()
+                run_candidates += tried
+                for digest, password in hits:
+                    if digest in remaining:
+                        remaining.discard(digest)
+                        checkpoint.found[digest.hex()] = password.decode("utf-8", "replace")
+                        print(f"[+] {digest.hex()} : {password.decode('utf-8', 'replace')}", file=out)
+                completed[number] = tried
+            while done_upto in completed:
+                checkpoint.candidates += completed.pop(done_upto)
+                checkpoint.position = ends.pop(done_upto)
+                done_upto += 1
+
+            now = time.perf_counter()
+            if progress_every and now - last_progress >= progress_every:
+                rate = run_candidates / (now - started)
+                print(f"[progress] {run_candidates} candidates this run, {rate:,.0f}/s, "
+                      f"{len(checkpoint.found)}/{len(targets)} cracked", file=out)
+                last_progress = now
+            if checkpoint_every and now - last_save >= checkpoint_every:
+                checkpoint.save(meta)
+                last_save = now
+        for future in in_flight:
+            future.cancel()
+    if not remaining:
+        # Everything is cracked, so there is nothing left to resume: count
+        # the batches that finished out of order as well.
+        checkpoint.candidates += sum(completed.values())
+
+    checkpoint.elapsed = time.perf_counter() - started
+    checkpoint.run_candidates = run_candidates
+    checkpoint.save(meta)
+    return checkpoint
+
+
+def append_potfile(path, found):
+    """Append digest:password lines not already in the potfile. Returns how many were written."""
+    known = set()
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            known = {line.split(":", 1)[0].lower() for line in f if ":" in line}
+    new = [(h, pw) for h, pw in found.items() if h not in known]
+    with open(path, "a", encoding="utf-8") as f:
+        for digest_hex, password in new:
+            f.write(f"{digest_hex}:{password}\n")
+    return len(new)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-core wordlist audit against unsalted hashes")
+    parser.add_argument("--hashes", required=True, help="File of hex digests, one per line (optionally user:digest)")
+    parser.add_argument("--algo", choices=ALGORITHMS, default="sha256")
+    parser.add_argument("--wordlist", action="append", default=[],
+                        help="Wordlist file (repeatable; default: the built-in common passwords)")
+    parser.add_argument("--rules", default="default",
+                        help=f"Rule set ({', '.join(RULE_SETS)}) or comma list of: {', '.join(RULES)} "
+                             "(chain with +, e.g. capitalize+digits)")
+    parser.add_argument("--workers", type=int, default=None, help="Processes (default: cores)")
+    parser.add_argument("--batch", type=int, default=BATCH_WORDS, help="Words per work unit")
+    parser.add_argument("--checkpoint", help="Progress file to write (and read with --resume)")
+    parser.add_argument("--resume", action="store_true", help="Continue from --checkpoint")
+    parser.add_argument("--progress", type=float, default=5.0, help="Seconds between progress lines")
+    parser.add_argument("--potfile", help="Append cracked digest:password lines here")
+    args = parser.parse_args()
+
+    try:
+        rules = parse_rules(args.rules)
+    except ValueError as e:
+        parser.error(str(e))
+    targets, skipped = load_targets(args.hashes, args.algo)
+    if skipped:
+        shown = ", ".join(map(str, skipped[:10])) + (" ..." if len(skipped) > 10 else "")
+        print(f"Skipped {len(skipped)} malformed line(s) in {args.hashes} "
+              f"(not {args.algo} hex digests): line {shown}", file=sys.stderr)
+    if not targets:
+        parser.error(f"no {args.algo} digests found in {args.hashes}")
+    meta = {"hashes": args.hashes, "algo": args.algo, "wordlists": args.wordlist, "rules": rules}
+    checkpoint = Checkpoint(args.checkpoint)
+    if args.resume:
+        if not args.checkpoint or not os.path.exists(args.checkpoint):
+            parser.error("--resume needs an existing --checkpoint file")
+        saved = checkpoint.load()
+        if {k: saved.get(k) for k in meta} != meta:
+            parser.error("checkpoint was written for a different hashes file, algorithm, wordlists or rules")
+        print(f"Resuming at wordlist {checkpoint.position[0]}, byte {checkpoint.position[1]} "
+              f"({len(checkpoint.found)} already cracked)")
+
+    words = read_words(args.wordlist, checkpoint.position) if args.wordlist else builtin_words(checkpoint.position)
+    print(f"Auditing {len(targets)} {args.algo} hashes with rules: {', '.join(rules)}")
+    try:
+        result = audit(targets, words, args.algo, rules, args.workers, args.batch, checkpoint,
+                       progress_every=args.progress, meta=meta)
+    except KeyboardInterrupt:
+        # The checkpoint only covers fully hashed batches, so saving here is safe.
+        checkpoint.save(meta)
+        if args.checkpoint:
+            print(f"\nInterrupted; continue with --checkpoint {args.checkpoint} --resume")
+        sys.exit(130)
+
+    rate = result.run_candidates / result.elapsed if result.elapsed else 0.0
+    print(f"Done: {len(result.found)}/{len(targets)} cracked, {result.candidates} candidates "
+          f"in {result.elapsed:.1f}s ({rate:,.0f}/s this run)")
+    for digest_hex, password in result.found.items():
+        users = [u for u in targets.get(bytes.fromhex(digest_hex), []) if u]
+        print(f"  {', '.join(users) or digest_hex} -> {password}")
+    if args.potfile:
+        added = append_potfile(args.potfile, result.found)
+        print(f"{added} new entr{'y' if added == 1 else 'ies'} added to {args.potfile}")
+
+
+if __name__ == "__main__":
+    main()
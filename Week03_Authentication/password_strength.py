@@ -1,6 +1,22 @@
-import string, math
+import string, math, os
+from pathlib import Path
+
+# Optional breached-password filter shared with the Mini Project
+# (build it with MiniProject_SecureAuth/scripts/build_breach_filter.py).
+from breach_lookup import BreachFilter
 
 COMMON_PASSWORDS = ["password", "123456", "12345678", "qwerty", "admin", "letmein"]
+BREACHED_PASSWORDS_FILE = Path(os.environ.get("BREACHED_PASSWORDS_FILE", "breached_passwords.bin"))
+
+_breach_filter = None
+
+def is_breached(pwd: str) -> bool:
+    global _breach_filter
+    if pwd.lower() in COMMON_PASSWORDS:
+        return True
+    if _breach_filter is None and BREACHED_PASSWORDS_FILE.exists():
+        _breach_filter = BreachFilter(BREACHED_PASSWORDS_FILE)
+    return _breach_filter is not None and (pwd in _breach_filter or pwd.lower() in _breach_filter)
 
 def password_strength(pwd: str):
     score = 0
@@ -18,7 +34,7 @@ def password_strength(pwd: str):
     if any(c in string.punctuation for c in pwd):
         pool += len(string.punctuation); score += 1
 
-    if pwd.lower() in COMMON_PASSWORDS:
+    if is_breached(pwd):
         score = 0
 
     entropy = len(pwd) * math.log2(pool) if pool > 0 else 0.0
@@ -1,11 +1,13 @@
-import bcrypt, hashlib
+import bcrypt, hashlib, json
 from password_strength import password_strength
-from twofactor import generate_2fa_secret
-import pyotp
+from twofactor import enroll_2fa, get_qr
+from totp_verifier import TOTPVerifier
 
 class AuthSystem:
-    def __init__(self):
+    def __init__(self, prerender_qr: str = None):
         self.users = {}
+        self.prerender_qr = prerender_qr  # "png"/"svg" to render enrolment QR codes in the background
+        self.totp = TOTPVerifier()  # cached codes + replay protection for 2FA checks
 
     def register(self, username: str, password: str):
         score, entropy = password_strength(password)
@@ -14,10 +16,17 @@ class AuthSystem:
 
         bcrypt_hash = bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
 
-        secret, qr_file = generate_2fa_secret(username)
-        self.users[username] = {"hash": bcrypt_hash, "secret": secret}
+        # The QR image is rendered later, only if the user asks for it.
+        secret, uri = enroll_2fa(username, prerender=self.prerender_qr)
+        self.users[username] = {"hash": bcrypt_hash, "secret": secret, "uri": uri}
 
-        return True, f"User created. Scan QR in {qr_file}!"
+        return True, f"User created. Add this to your authenticator app: {uri}"
+
+    def qr_code(self, username: str, fmt: str = "png"):
+        user = self.users.get(username)
+        if not user:
+            return None
+        return get_qr(user["uri"], fmt)
 
     def login(self, username: str, password: str, token: str):
         user = self.users.get(username)
@@ -29,8 +38,15 @@ class AuthSystem:
         if not bcrypt.checkpw(password.encode(), stored_hash):
             return False, "Invalid password."
 
-        totp = pyotp.TOTP(user["secret"])
-        if not totp.verify(token):
+        # Only codes for a later step than the last accepted one pass; replays are rejected.
+        if not self.totp.verify(username, user["secret"], token):
             return False, "Invalid 2FA code."
 
         return True, "Login successful!"
+
+    def export_users(self, path: str):
+        """Write users as JSON lines for the Mini Project's bulk importer."""
+        with open(path, "w", encoding="utf-8") as f:
+            for username, user in self.users.items():
+                f.write(json.dumps({"username": username, "bcrypt_hash": user["hash"], "secret": user["secret"]}) + "\n")
+        return len(self.users)
@@ -0,0 +1,83 @@
+import hashlib
+import io
+import sys
+import tempfile
+from pathlib import Path
+
+# Ensure the Week03 folder is on sys.path so we can import the modules when running from tests/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import password_audit
+
+
+def _write_wordlist(folder, count, slow=0):
+    # The first `slow` words are long, so the first batch finishes after later ones.
+    path = Path(folder) / "words.txt"
+    with path.open("w", encoding="utf-8") as f:
+        for i in range(count):
+            f.write(f"word{i:05d}" + ("x" * 200_000 if i < slow else "") + "\n")
+    return str(path)
+
+
+def test_load_targets_skips_malformed_lines():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "hashes.txt"
+        good = hashlib.sha256(b"secret").hexdigest()
+        path.write_text(f"# leaked\nalice:{good}\nbob:not-hex\n{hashlib.md5(b'x').hexdigest()}\n", encoding="utf-8")
+        targets, skipped = password_audit.load_targets(path, "sha256")
+        assert targets == {bytes.fromhex(good): ["alice"]}, targets
+        assert skipped == [3, 4], skipped
+
+
+def test_resume_counts_each_candidate_once():
+    with tempfile.TemporaryDirectory() as tmp:
+        wordlist = _write_wordlist(tmp, 1000, slow=100)
+        target = hashlib.sha256(b"not in the wordlist").digest()
+        ckpt_path = str(Path(tmp) / "audit.ckpt")
+
+        def interrupted(words, limit):
+            for n, item in enumerate(words):
+                if n == limit:
+                    raise KeyboardInterrupt
+                yield item
+
+        checkpoint = password_audit.Checkpoint(ckpt_path)
+        try:
+            password_audit.audit({target: [None]}, interrupted(password_audit.read_words([wordlist]), 450),
+                                 rules=["none"], workers=2, batch_words=100, checkpoint=checkpoint,
+                                 progress_every=0, out=io.StringIO())
+        except KeyboardInterrupt:
+            checkpoint.save({})
+
+        resumed = password_audit.Checkpoint(ckpt_path)
+        resumed.load()
+        covered = sum(1 for _, position in password_audit.read_words([wordlist]) if position <= resumed.position)
+        assert resumed.candidates == covered, "Checkpointed count must match the checkpointed position"
+        result = password_audit.audit({target: [None]}, password_audit.read_words([wordlist], resumed.position),
+                                      rules=["none"], workers=2, batch_words=100, checkpoint=resumed,
+                                      progress_every=0, out=io.StringIO())
+        assert result.found == {}
+        assert result.candidates == 1000, "Candidates counted twice across the resume"
+
+
+def test_builtin_words_resume_from_position():
+    words = list(password_audit.builtin_words())
+    assert list(password_audit.builtin_words(words[2][1])) == words[3:]
+    assert list(password_audit.builtin_words(words[-1][1])) == []
+
+
+def test_potfile_is_not_duplicated():
+    with tempfile.TemporaryDirectory() as tmp:
+        pot = str(Path(tmp) / "audit.pot")
+        assert password_audit.append_potfile(pot, {"aa11": "one"}) == 1
+        assert password_audit.append_potfile(pot, {"aa11": "one", "bb22": "two:with colon"}) == 1
+        lines = Path(pot).read_text(encoding="utf-8").splitlines()
+        assert lines == ["aa11:one", "bb22:two:with colon"], lines
+
+
+if __name__ == "__main__":
+    test_load_targets_skips_malformed_lines()
+    test_resume_counts_each_candidate_once()
+    test_builtin_words_resume_from_position()
+    test_potfile_is_not_duplicated()
+    print("All tests passed.")
@@ -0,0 +1,100 @@
+import base64, hashlib, heapq, hmac, struct, time
+from collections import OrderedDict
+
+
+class TOTPVerifier:
+    """
+    RFC 6238 TOTP checks with caching and replay protection.
+
+    - Codes for the current step and +/- valid_window steps are computed once
+      per secret and reused until the time step moves on, so repeated logins
+      in the same 30 s do not recompute HMACs (pyotp rebuilds them each call).
+      The default window of 0 accepts the current step only, like pyotp's
+      verify(); valid_window=1 tolerates 30 s of clock drift either way.
+    - The last accepted step is remembered per user and any code for that
+      step or an earlier one is rejected (RFC 6238 section 5.2), until the
+      step can no longer be valid. Expiry uses a heap, so cleanup only
+      touches entries that have actually expired.
+    """
+
+    def __init__(self, interval=30, digits=6, valid_window=0, max_secrets=100_000,
+                 replay_protection=True, clock=time.time):
+        self.interval = interval
+        self.digits = digits
+        self.valid_window = valid_window
+        self.max_secrets = max_secrets
+        self.replay_protection = replay_protection
+        self.clock = clock
+        self._codes = OrderedDict()   # secret -> (first_step, [codes for first_step .. first_step + 2*window])
+        self._keys = {}               # secret -> decoded HMAC key
+        self._last = {}               # user -> (last accepted step, expiry time)
+        self._expiry = []             # heap of (expiry time, user)
+
+    def _key(self, secret):
+        key = self._keys.get(secret)
+        if key is None:
+            padded = secret.upper() + "=" * (-len(secret) % 8)
+            key = self._keys[secret] = base64.b32decode(padded)
+        return key
+
+    def code_at(self, secret, step):
+        digest = hmac.new(self._key(secret), struct.pack(">Q", step), hashlib.sha1).digest()
+        offset = digest[-1] & 0x0F
+        value = struct.unpack(">I", digest[offset:offset + 4])[0] & 0x7FFFFFFF
+        return str(value % 10 ** self.digits).zfill(self.digits)
+
+    def _window_codes(self, secret, step):
+        first = step - self.valid_window
+        cached = self._codes.get(secret)
+        if cached is not None and cached[0] == first:
+            self._codes.move_to_end(secret)
+            return cached[1]
+        codes = [self.code_at(secret, s) for s in range(first, step + self.valid_window + 1)]
+        self._codes[secret] = (first, codes)
+        self._codes.move_to_end(secret)
+        if len(self._codes) > self.max_secrets:
+            old, _ = self._codes.popitem(last=False)
+            self._keys.pop(old, None)
+        return codes
+
+    def _expire(self, now):
+        heap = self._expiry
+        while heap and heap[0][0] <= now:
+            _, user = heapq.heappop(heap)
+            entry = self._last.get(user)
+            if entry is not None and entry[1] <= now:
+                del self._last[user]
+
+    def verify(self, user, secret, code, now=None):
+        """True if `code` is valid now and is for a later step than the user's last accepted code."""
+        now = self.clock() if now is None else now
+        self._expire(now)
+        code = str(code).strip()
+        if len(code) != self.digits:
+            return False
+        step = int(now // self.interval)
+        codes = self._window_codes(secret, step)
+        matched = None
+        for i, candidate in enumerate(codes):
+            if hmac.compare_digest(candidate, code):
+                matched = step - self.valid_window + i
+        if matched is None:
+            return False
+        if not self.replay_protection:
+            return True
+        last = self._last.get(user)
+        if last is not None and matched <= last[0]:
+            return False   # replay, or an older code after a newer one
+        # Steps up to this one stay acceptable until it drops out of the window.
+        expiry = (matched + self.valid_window + 1) * self.interval
+        self._last[user] = (matched, expiry)
+        heapq.heappush(self._expiry, (expiry, user))
+        return True
+
+    def verify_many(self, attempts, now=None):
+        """Verify (user, secret, code) tuples against one clock reading. Returns a list of bools."""
+        now = self.clock() if now is None else now
+        return [self.verify(user, secret, code, now) for user, secret, code in attempts]
+
+    def __len__(self):
+        return len(self._last)
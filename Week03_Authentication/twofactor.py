@@ -1,13 +1,66 @@
+import io
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
 import pyotp, qrcode
+import qrcode.image.svg
 
-def generate_2fa_secret(username: str):
+ISSUER = "NSSecDemoApp"
+QR_CACHE_SIZE = 128
+
+# One background thread is enough: rendering is only needed when a user
+# actually opens the enrolment screen.
+_renderer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="qr-render")
+_pending = {}   # (uri, fmt) -> Future for renders still in progress
+
+
+def enroll_2fa(username: str, prerender: str = None):
+    """
+    Create a TOTP secret and its provisioning URI without rendering anything.
+    Pass prerender="png" or "svg" to warm the QR cache in the background.
+    """
     secret = pyotp.random_base32()
-    totp = pyotp.TOTP(secret)
+    uri = pyotp.TOTP(secret).provisioning_uri(name=username, issuer_name=ISSUER)
+    if prerender:
+        prerender_qr(uri, prerender)
+    return secret, uri
 
-    uri = totp.provisioning_uri(name=username, issuer_name="NSSecDemoApp")
 
-    img = qrcode.make(uri)
-    filename = f"totp_{username}.png"
-    img.save(filename)
+@lru_cache(maxsize=QR_CACHE_SIZE)
+def render_qr(uri: str, fmt: str = "png") -> bytes:
+    """Render a provisioning URI as an in-memory PNG or SVG (cached per URI and format)."""
+    if fmt == "svg":
+        img = qrcode.make(uri, image_factory=qrcode.image.svg.SvgPathImage)
+    elif fmt == "png":
+        img = qrcode.make(uri)
+    else:
+        raise ValueError(f"Unknown QR format: {fmt}")
+    buf = io.BytesIO()
+    img.save(buf)
+    return buf.getvalue()
+
 
+def prerender_qr(uri: str, fmt: str = "png"):
+    """Render in the background so a later get_qr call is a cache hit. Returns the Future."""
+    key = (uri, fmt)
+    future = _renderer.submit(render_qr, uri, fmt)
+    _pending[key] = future
+    future.add_done_callback(lambda _: _pending.pop(key, None))
+    return future
+
+
+def get_qr(uri: str, fmt: str = "png") -> bytes:
+    """Return QR bytes, waiting for an in-flight background render rather than starting a second one."""
+    future = _pending.get((uri, fmt))
+    if future is not None:
+        return future.result()
+    return render_qr(uri, fmt)
+
+
+def generate_2fa_secret(username: str):
+    # Original behaviour (secret + PNG file on disk), kept for older scripts.
+    secret, uri = enroll_2fa(username)
+    filename = f"totp_{username}.png"
+    with open(filename, "wb") as f:
+        f.write(render_qr(uri, "png"))
     return secret, filename
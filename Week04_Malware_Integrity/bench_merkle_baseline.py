@@ -0,0 +1,81 @@
+"""
+Compare the CSV baseline with the Merkle index on a synthetic baseline.
+
+For --files entries spread over nested directories this times:
+- CSV: load_baseline (whole file into a dict) and a dict comparison,
+- Merkle: writing the index, opening it, and diffing two snapshots that
+  differ in --changes files.
+
+    python bench_merkle_baseline.py [--files 1000000] [--changes 10]
+
+The CSV is written without stat columns (the original three-column format),
+so both sides hold the same information.
+"""
+import argparse
+import csv
+import os
+import random
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from integrity_compare import load_baseline
+from merkle_baseline import MerkleIndex, diff, write_index
+
+
+def synthetic_hashes(count: int):
+    # ~100 files per directory, three levels deep
+    return {os.path.join(f"d{i // 100000:02d}", f"e{i // 1000 % 100:02d}", f"s{i // 100 % 10}", f"f{i:08d}.bin"):
+            os.urandom(32).hex() for i in range(count)}
+
+
+def timed(label, fn):
+    t0 = time.perf_counter()
+    result = fn()
+    print(f"  {label:<36} {time.perf_counter() - t0:8.3f}s")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CSV vs Merkle baseline benchmark")
+    parser.add_argument("--files", type=int, default=1_000_000)
+    parser.add_argument("--changes", type=int, default=10)
+    args = parser.parse_args()
+
+    root = Path(tempfile.mkdtemp(prefix="merklebench-"))
+    try:
+        print(f"Generating {args.files} entries ...")
+        old = synthetic_hashes(args.files)
+        new = dict(old)
+        for rel in random.sample(sorted(old), min(args.changes, len(old))):
+            new[rel] = os.urandom(32).hex()
+        created = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+
+        csv_path = root / "baseline.csv"
+        with open(csv_path, "w", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            w.writerow(["file", "sha256", "baseline_created_utc"])
+            w.writerows([rel, h, created] for rel, h in old.items())
+
+        print("CSV baseline")
+        loaded = timed("load_baseline", lambda: load_baseline(csv_path))
+        timed("compare (every entry)", lambda: [f for f in new if loaded.get(f) != new[f]])
+
+        print("Merkle index")
+        timed("write index (old)", lambda: write_index(root / "old.fimt", old, created))
+        timed("write index (new)", lambda: write_index(root / "new.fimt", new, created))
+        index_old = timed("open index", lambda: MerkleIndex(root / "old.fimt"))
+        index_new = MerkleIndex(root / "new.fimt")
+        stats = {}
+        changes = timed("diff (changed subtrees only)", lambda: list(diff(index_old, index_new, stats)))
+        print(f"  {len(changes)} changes found, {stats['directories_compared']} directories opened; "
+              f"CSV {csv_path.stat().st_size >> 20} MiB vs index {(root / 'old.fimt').stat().st_size >> 20} MiB")
+        index_old.close()
+        index_new.close()
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark serial vs parallel tree hashing on a synthetic tree.
+
+The tree holds many small files spread over nested directories, plus a few
+huge ones. The original one-file-at-a-time loop (rglob + sha256_file) is
+timed against scan_tree at several worker counts, and every run is checked
+to produce identical hashes.
+
+    python bench_parallel_hash.py [--small 20000] [--small-kib 4] [--huge 4] [--huge-mib 256] [--workers 1,2,4,8,16]
+
+Files are written once and then read from the page cache, so this measures
+the hashing pipeline rather than cold-disk latency; on a cold NVMe tree the
+parallel gains are larger because the deeper queue is what the drive needs.
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from integrity_baseline import sha256_file
+from parallel_hash import scan_tree
+
+
+def make_tree(root: Path, small: int, small_kib: int, huge: int, huge_mib: int) -> None:
+    block = os.urandom(1 << 20)
+    for i in range(small):
+        d = root / f"d{i % 50:02d}" / f"e{i % 7}"
+        d.mkdir(parents=True, exist_ok=True)
+        (d / f"f{i:06d}.bin").write_bytes(block[(i * 13) % 4096:][:small_kib * 1024])
+    big = root / "huge"
+    big.mkdir(exist_ok=True)
+    for i in range(huge):
+        with open(big / f"huge{i}.bin", "wb") as f:
+            for _ in range(huge_mib):
+                f.write(block)
+            f.write(i.to_bytes(4, "big"))
+
+
+def serial_hash(folder: Path) -> dict:
+    return {str(p.relative_to(folder)): sha256_file(p) for p in folder.rglob("*") if p.is_file()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serial vs parallel tree hashing benchmark")
+    parser.add_argument("--small", type=int, default=20000, help="Number of small files")
+    parser.add_argument("--small-kib", type=int, default=4, help="Size of each small file (KiB)")
+    parser.add_argument("--huge", type=int, default=4, help="Number of huge files")
+    parser.add_argument("--huge-mib", type=int, default=256, help="Size of each huge file (MiB)")
+    parser.add_argument("--workers", default="1,2,4,8,16", help="Comma list of worker counts to try")
+    parser.add_argument("--dir", help="Where to create the tree (default: a temp dir, removed afterwards)")
+    args = parser.parse_args()
+
+    root = Path(args.dir) if args.dir else Path(tempfile.mkdtemp(prefix="hashbench-"))
+    try:
+        print(f"Creating {args.small} x {args.small_kib} KiB + {args.huge} x {args.huge_mib} MiB in {root} ...")
+        make_tree(root, args.small, args.small_kib, args.huge, args.huge_mib)
+        total_mib = (args.small * args.small_kib / 1024) + args.huge * args.huge_mib
+        serial_hash(root)   # warm the page cache
+
+        t0 = time.perf_counter()
+        expected = serial_hash(root)
+        serial_secs = time.perf_counter() - t0
+        print(f"{'serial (rglob + sha256_file)':<30} {serial_secs:8.2f}s  {total_mib / serial_secs:8.1f} MiB/s  "
+              f"{len(expected) / serial_secs:9.0f} files/s")
+
+        for workers in (int(w) for w in args.workers.split(",")):
+            t0 = time.perf_counter()
+            scan = scan_tree(root, sha256_file, workers=workers)
+            secs = time.perf_counter() - t0
+            assert scan.hashes == expected and not scan.errors, "parallel result differs from serial"
+            print(f"{f'scan_tree workers={max(2, workers)}':<30} {secs:8.2f}s  {total_mib / secs:8.1f} MiB/s  "
+                  f"{len(scan.hashes) / secs:9.0f} files/s  ({serial_secs / secs:.2f}x)")
+    finally:
+        if not args.dir:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+import hashlib
+import mmap
+import os
+import threading
+import zlib
+from pathlib import Path
+from typing import Dict, Iterable
+
+try:
+    import blake3 as _blake3          # optional: pip install blake3
+except ImportError:
+    _blake3 = None
+
+try:
+    import xxhash as _xxhash          # optional: pip install xxhash
+except ImportError:
+    _xxhash = None
+
+BUFFER_SIZE = 1 << 20
+# Files at or above this size are mapped instead of read; the kernel pages
+# them in directly and nothing is copied into a Python buffer. A file that is
+# truncated while mapped kills the process with SIGBUS, so only very large
+# files use it; pass mmap_threshold=None to turn it off.
+MMAP_THRESHOLD = 64 << 20
+
+
+class _CRC32:
+    """hashlib-style wrapper so zlib.crc32 can sit alongside real digests."""
+    name = "crc32"
+
+    def __init__(self):
+        self.value = 0
+
+    def update(self, data):
+        self.value = zlib.crc32(data, self.value)
+
+    def hexdigest(self):
+        return f"{self.value:08x}"
+
+
+def _factories():
+    algos = {
+        "sha256": hashlib.sha256,
+        "blake2b": hashlib.blake2b,
+        "crc32": _CRC32,
+    }
+    if _blake3 is not None:
+        algos["blake3"] = _blake3.blake3
+    if _xxhash is not None:
+        algos["xxh3_64"] = _xxhash.xxh3_64
+    return algos
+
+
+ALGORITHMS = _factories()
+# Pre-filter digests are fast but not collision resistant: they can tell
+# that a file changed, never prove that it did not.
+PREFILTER = "xxh3_64" if "xxh3_64" in ALGORITHMS else "crc32"
+CRYPTOGRAPHIC = ("sha256", "blake2b", "blake3")
+
+
+class HashEngine:
+    """
+    Computes one or more digests of a file in a single pass.
+
+    Small files are read with readinto() into a buffer that each thread
+    allocates once and reuses, and every digest is fed a memoryview slice
+    of it, so no per-chunk bytes objects are created. Files of
+    mmap_threshold bytes or more are memory-mapped and fed in buffer-sized
+    slices, so each slice is still in cache when the second digest reads it.
+    """
+
+    def __init__(self, algorithms: Iterable[str] = ("sha256",), buffer_size: int = BUFFER_SIZE,
+                 mmap_threshold: int = MMAP_THRESHOLD):
+        self.algorithms = tuple(algorithms)
+        unknown = [a for a in self.algorithms if a not in ALGORITHMS]
+        if unknown:
+            raise ValueError(f"Unsupported hash algorithm(s): {', '.join(unknown)} "
+                             f"(available: {', '.join(ALGORITHMS)})")
+        self.buffer_size = buffer_size
+        self.mmap_threshold = mmap_threshold
+        self._local = threading.local()
+
+    def _buffer(self):
+        buf = getattr(self._local, "buf", None)
+        if buf is None:
+            buf = self._local.buf = memoryview(bytearray(self.buffer_size))
+        return buf
+
+    def hash_file(self, path: Path) -> Dict[str, str]:
+        """Return {algorithm: hexdigest} for the file."""
+        hashers = [ALGORITHMS[a]() for a in self.algorithms]
+        with open(path, "rb", buffering=0) as f:
+            size = os.fstat(f.fileno()).st_size
+            if self.mmap_threshold is not None and size >= self.mmap_threshold:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m, memoryview(m) as view:
+                    step = self.buffer_size
+                    for offset in range(0, len(view), step):
+                        chunk = view[offset:offset + step]
+                        for h in hashers:
+                            h.update(chunk)
+                        chunk.release()
+            else:
+                buf = self._buffer()
+                while True:
+                    n = f.readinto(buf)
+                    if not n:
+                        break
+                    chunk = buf[:n]
+                    for h in hashers:
+                        h.update(chunk)
+        return {a: h.hexdigest() for a, h in zip(self.algorithms, hashers)}
+
+    def hexdigest(self, path: Path) -> str:
+        """The first algorithm's digest only."""
+        return self.hash_file(path)[self.algorithms[0]]
+
@@ -1,37 +1,80 @@
-import hashlib
+import argparse
 import csv
+import os
 import time
 from pathlib import Path
+from hash_engine import ALGORITHMS, BUFFER_SIZE, CRYPTOGRAPHIC, PREFILTER, HashEngine
+from parallel_hash import scan_tree
 
-def sha256_file(path: Path, chunk_size=1 << 20) -> str:
+# The first three columns are the original format; the stat columns let
+# integrity_compare.py skip re-hashing files whose metadata is unchanged.
+# "algorithm" lists every digest taken of the file, "digests" holds the ones
+# beyond sha256 and "prefilter" a fast non-cryptographic digest, each as
+# "name:hex".
+BASELINE_FIELDS = ["file", "sha256", "baseline_created_utc", "size", "mtime_ns", "inode", "ctime_ns",
+                   "algorithm", "digests", "prefilter"]
+STAT_FIELDS = BASELINE_FIELDS[3:7]
+
+_sha256_engine = HashEngine(("sha256",))
+
+def sha256_file(path: Path, chunk_size=BUFFER_SIZE) -> str:
     """Compute the SHA-256 hash of a file in chunks (efficient for large files)."""
-    h = hashlib.sha256()
-    with path.open('rb') as f:
-        for chunk in iter(lambda: f.read(chunk_size), b''):
-            h.update(chunk)
-    return h.hexdigest()
+    engine = _sha256_engine if chunk_size == BUFFER_SIZE else HashEngine(("sha256",), chunk_size)
+    return engine.hexdigest(path)
+
+def file_metadata(st: os.stat_result) -> dict:
+    """The stat fields stored in the baseline for a file."""
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "inode": st.st_ino, "ctime_ns": st.st_ctime_ns}
 
-def build_baseline(folder="sample_folder", out_csv="baseline.csv"):
+def build_baseline(folder="sample_folder", out_csv="baseline.csv", workers=None, extra_digests=(), prefilter=True):
     """
     Walk through all files in the target folder and record their SHA-256 hashes.
-    The results are saved in a CSV file with filename, hash, and timestamp.
+    The results are saved in a CSV file with filename, hash, timestamp and the
+    file's size, mtime, inode and ctime. Files are hashed on `workers` threads;
+    `extra_digests` (e.g. blake2b) and the pre-filter digest are computed in
+    the same pass over each file.
     """
     folder = Path(folder)
     rows = []
     now_iso = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    extras = [a for a in extra_digests if a != "sha256"]
+    engine = HashEngine(["sha256"] + extras + ([PREFILTER] if prefilter else []))
+    algorithm = "+".join(["sha256"] + extras)
 
-    for p in sorted(folder.rglob("*")):
-        if p.is_file():
-            rows.append([str(p.relative_to(folder)), sha256_file(p), now_iso])
+    # The walker stats each file before it is hashed: if the file changes
+    # meanwhile, the recorded mtime is older than the change and the next
+    # fast check re-hashes it.
+    scan = scan_tree(folder, engine.hash_file, workers=workers)
+    for rel, error in sorted(scan.errors.items()):
+        print(f"Warning: could not hash {folder / rel}: {error}")
+    for rel in sorted(scan.hashes):
+        meta = file_metadata(scan.files[rel])
+        digests = scan.hashes[rel]
+        rows.append([rel, digests["sha256"], now_iso] + [meta[k] for k in STAT_FIELDS] + [
+            algorithm,
+            " ".join(f"{a}:{digests[a]}" for a in extras),
+            f"{PREFILTER}:{digests[PREFILTER]}" if prefilter else "",
+        ])
 
     out = Path(out_csv)
     out.parent.mkdir(parents=True, exist_ok=True)
     with out.open("w", newline="", encoding="utf-8") as f:
         w = csv.writer(f)
-        w.writerow(["file", "sha256", "baseline_created_utc"])
+        w.writerow(BASELINE_FIELDS)
         w.writerows(rows)
 
     print(f"Baseline saved: {out.resolve()} (files: {len(rows)})")
 
 if __name__ == "__main__":
-    build_baseline()
+    parser = argparse.ArgumentParser(description="Record an integrity baseline for a folder")
+    parser.add_argument("folder", nargs="?", default="sample_folder")
+    parser.add_argument("out_csv", nargs="?", default="baseline.csv")
+    parser.add_argument("--workers", type=int, default=None, help="Hashing threads (default: 2 x cores, max 32)")
+    parser.add_argument("--digests", default="", help=f"Extra digests to record, comma separated ({', '.join(CRYPTOGRAPHIC)})")
+    parser.add_argument("--no-prefilter", action="store_true", help=f"Do not record the {PREFILTER} pre-filter digest")
+    args = parser.parse_args()
+    extras = [a for a in args.digests.split(",") if a]
+    bad = [a for a in extras if a not in CRYPTOGRAPHIC or a not in ALGORITHMS]
+    if bad:
+        parser.error(f"unsupported or unavailable digest(s): {', '.join(bad)}")
+    build_baseline(args.folder, args.out_csv, args.workers, extras, not args.no_prefilter)
@@ -1,19 +1,37 @@
+import argparse
+import calendar
 import csv
+import json
+import os
 import time
 import sys
 from pathlib import Path
 from typing import Dict
-from integrity_baseline import sha256_file
+from integrity_baseline import sha256_file, STAT_FIELDS
+from hash_engine import ALGORITHMS, HashEngine
+from parallel_hash import scan_tree
 # Reuse the hasher from Section 1
 
 RED = "\033[91m"; GREEN = "\033[92m"; YELLOW = "\033[93m"; RESET = "\033[0m"
 
+SUSPICIOUS_EXT = (".exe", ".py", ".sh")
 
-def file_size(path):
-    return Path(path).stat().st_size if Path(path).exists() else ""
+# Paranoia levels for fast mode (which files are re-hashed):
+#   0  size or mtime differs from the baseline
+#   1  ... or inode or ctime differs, or mtime is too close to the baseline
+#      time to be trusted (a write in the same tick leaves mtime unchanged)
+#   2  ... or the file is a script/executable (always re-hashed)
+#   3  every file (same as --mode full)
+PARANOIA_LEVELS = (0, 1, 2, 3)
+DEFAULT_PARANOIA = 1
+RACY_WINDOW_NS = 2_000_000_000
 
 
-def load_baseline(csv_path: Path) -> Dict[str, str]:
+def load_baseline_records(csv_path: Path) -> Dict[str, dict]:
+    """
+    Read the baseline into {file: {"sha256", "created_utc", "size", "mtime_ns", "inode", "ctime_ns",
+    "algorithm", "prefilter"}}. Fields missing from older baselines are None.
+    """
     if not csv_path.exists():
         print(f"Error: Baseline file not found: {csv_path}")
         sys.exit(1)
@@ -26,31 +44,127 @@ def load_baseline(csv_path: Path) -> Dict[str, str]:
             print(f"Error: Baseline CSV missing required columns {required}.")
             sys.exit(1)
         for row in r:
-            baseline[row["file"]] = row["sha256"]
+            record = {"sha256": row["sha256"], "created_utc": row.get("baseline_created_utc")}
+            for field in STAT_FIELDS:
+                value = row.get(field)
+                record[field] = int(value) if value else None
+            record["algorithm"] = row.get("algorithm") or "sha256"
+            record["prefilter"] = row.get("prefilter") or None
+            baseline[row["file"]] = record
     return baseline
 
-def compare_to_baseline(folder: Path, baseline_csv: Path, out_csv: Path) -> None:
-    baseline = load_baseline(baseline_csv)
+def load_baseline(csv_path: Path) -> Dict[str, str]:
+    return {name: record["sha256"] for name, record in load_baseline_records(csv_path).items()}
+
+def _utc_to_ns(iso: str):
+    try:
+        return calendar.timegm(time.strptime(iso, "%Y-%m-%dT%H:%M:%SZ")) * 1_000_000_000
+    except (TypeError, ValueError):
+        return None
+
+def needs_hash(rel: str, st, record: dict, paranoia: int = DEFAULT_PARANOIA) -> bool:
+    """Decide whether a file that is in the baseline must be re-hashed in fast mode."""
+    if paranoia >= 3 or record["size"] is None or record["mtime_ns"] is None:
+        return True
+    if st.st_size != record["size"] or st.st_mtime_ns != record["mtime_ns"]:
+        return True
+    if paranoia >= 1:
+        if st.st_ino != record["inode"] or st.st_ctime_ns != record["ctime_ns"]:
+            return True
+        created_ns = _utc_to_ns(record["created_utc"])
+        if created_ns is None or st.st_mtime_ns >= created_ns - RACY_WINDOW_NS:
+            return True
+    if paranoia >= 2 and rel.endswith(SUSPICIOUS_EXT):
+        return True
+    return False
+
+def _state_path(baseline_csv: Path) -> Path:
+    return baseline_csv.with_name(baseline_csv.name + ".state.json")
+
+def full_verify_due(baseline_csv: Path, every_hours: float) -> bool:
+    """True if no full verify against this baseline has been recorded in the last `every_hours`."""
+    try:
+        state = json.loads(_state_path(baseline_csv).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return True
+    return time.time() - state.get("last_full_verify_epoch", 0) >= every_hours * 3600
+
+def record_full_verify(baseline_csv: Path) -> None:
+    state = {"last_full_verify_epoch": time.time(),
+             "last_full_verify_utc": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())}
+    _state_path(baseline_csv).write_text(json.dumps(state, indent=2), encoding="utf-8")
+
+def compare_to_baseline(folder: Path, baseline_csv: Path, out_csv: Path, mode: str = "full",
+                        paranoia: int = DEFAULT_PARANOIA, full_every_hours: float = None,
+                        workers: int = None, prefilter: bool = False) -> None:
+    """
+    mode="full" re-hashes every file (original behaviour). mode="fast" trusts
+    the baseline hash for files whose stat metadata matches, according to
+    `paranoia`. With full_every_hours, a fast run is promoted to a full verify
+    when the last one is older than that.
+
+    prefilter=True also computes the baseline's non-cryptographic pre-filter
+    digest, in the same pass as SHA-256, for every file that is re-hashed. A
+    pre-filter mismatch proves the file changed, so it is reported as
+    MODIFIED even if the SHA-256 column of the baseline was tampered with to
+    match. A pre-filter match proves nothing: the verdict then rests on
+    SHA-256 alone.
+    """
+    baseline = load_baseline_records(baseline_csv)
+
+    if mode == "fast" and full_every_hours is not None and full_verify_due(baseline_csv, full_every_hours):
+        print(f"Last full verify is older than {full_every_hours}h; running a full verify.")
+        mode = "full"
+    if mode == "full":
+        paranoia = 3
 
     # Build current view
-    current = {}
     if not folder.exists():
         print(f"Error: Target folder not found: {folder}")
         sys.exit(1)
 
-    for p in folder.rglob("*"):
-        if p.is_file():
-            rel = str(p.relative_to(folder))
-            try:
-                current[rel] = sha256_file(p)
-            except Exception as e:
-                print(f"Warning: could not hash {p}: {e}")
+    def select(rel, st):
+        record = baseline.get(rel)
+        return record is None or needs_hash(rel, st, record, paranoia)
+
+    prefilter_engines = {}
+    prefilter_changed = set()
+
+    def hasher(path):
+        rel = os.path.relpath(path, folder)
+        record = baseline.get(rel)
+        if prefilter and record and record["prefilter"]:
+            algo, _, expected = record["prefilter"].partition(":")
+            if algo in ALGORITHMS:
+                # One read feeds both digests.
+                engine = prefilter_engines.setdefault(algo, HashEngine(("sha256", algo)))
+                digests = engine.hash_file(path)
+                if digests[algo] != expected:
+                    prefilter_changed.add(rel)   # set.add is atomic under the GIL
+                return digests["sha256"]
+        return sha256_file(path)
+
+    scan = scan_tree(folder, hasher, select=select, workers=workers)
+    for rel, error in sorted(scan.errors.items()):
+        print(f"Warning: could not hash {folder / rel}: {error}")
+    current = dict(scan.hashes)
+    sizes = {rel: st.st_size for rel, st in scan.files.items()}
+    hashed = len(scan.hashes)
+    skipped = 0
+    for rel in scan.files:
+        if rel not in current and rel not in scan.errors:
+            current[rel] = baseline[rel]["sha256"]
+            skipped += 1
+
+    if mode == "full":
+        record_full_verify(baseline_csv)
 
-    modified = [f for f in current if f in baseline and current[f] != baseline[f]]
+    modified = [f for f in current if f in baseline
+                and (current[f] != baseline[f]["sha256"] or f in prefilter_changed)]
     new      = [f for f in current if f not in baseline]
     deleted  = [f for f in baseline if f not in current]
 
-    suspicious = [f for f in modified + new if f.endswith((".exe",".py",".sh"))]
+    suspicious = [f for f in modified + new if f.endswith(SUSPICIOUS_EXT)]
     if suspicious:
         print("\n⚠️ Suspicious executable/script changes detected:")
         for fpath in suspicious:
@@ -63,16 +177,18 @@ def compare_to_baseline(folder: Path, baseline_csv: Path, out_csv: Path) -> None
         w.writerow(["file","status","old_hash","new_hash","size_bytes","checked_utc"])
         now = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
         for fpath in sorted(modified):
-            w.writerow([fpath,"MODIFIED",baseline[fpath],current[fpath],now])
+            w.writerow([fpath,"MODIFIED",baseline[fpath]["sha256"],current[fpath],sizes[fpath],now])
         for fpath in sorted(new):
-            w.writerow([fpath,"NEW","",current[fpath],now])
+            w.writerow([fpath,"NEW","",current[fpath],sizes[fpath],now])
         for fpath in sorted(deleted):
-            w.writerow([fpath,"DELETED",baseline[fpath],"",now])
+            w.writerow([fpath,"DELETED",baseline[fpath]["sha256"],"","",now])
 
     # Console report
     print("=== Integrity Check Report ===")
     print(f"Folder: {folder.resolve()}")
     print(f"Baseline: {baseline_csv.resolve()}")
+    print(f"Mode: {mode} (paranoia {paranoia}) - hashed {hashed}, unchanged metadata {skipped}"
+          + (f", pre-filter mismatches {len(prefilter_changed)}" if prefilter else ""))
     print(f"Modified: {len(modified)}")
     for fpath in modified: print(RED + "  - MODIFIED" + RESET, fpath)
     print(f"New: {len(new)}")
@@ -83,7 +199,20 @@ def compare_to_baseline(folder: Path, baseline_csv: Path, out_csv: Path) -> None
 
 if __name__ == "__main__":
     # Defaults match Section 1 outputs
-    folder = Path(sys.argv[1]) if len(sys.argv) > 1 else Path("sample_folder")
-    baseline_csv = Path(sys.argv[2]) if len(sys.argv) > 2 else Path("baseline.csv")
-    out_csv = Path(sys.argv[3]) if len(sys.argv) > 3 else Path("change_report.csv")
-    compare_to_baseline(folder, baseline_csv, out_csv)
+    parser = argparse.ArgumentParser(description="Compare a folder against its integrity baseline")
+    parser.add_argument("folder", nargs="?", default="sample_folder")
+    parser.add_argument("baseline_csv", nargs="?", default="baseline.csv")
+    parser.add_argument("out_csv", nargs="?", default="change_report.csv")
+    parser.add_argument("--mode", choices=["full", "fast"], default="full",
+                        help="full: re-hash everything; fast: re-hash only files whose metadata changed")
+    parser.add_argument("--paranoia", type=int, choices=PARANOIA_LEVELS, default=DEFAULT_PARANOIA,
+                        help="Fast-mode strictness, 0 (size+mtime) to 3 (hash everything)")
+    parser.add_argument("--full-every", type=float, metavar="HOURS",
+                        help="In fast mode, do a full verify if the last one is older than this")
+    parser.add_argument("--workers", type=int, default=None, help="Hashing threads (default: 2 x cores, max 32)")
+    parser.add_argument("--prefilter", action="store_true",
+                        help="Also check the baseline's pre-filter digest (same read as SHA-256); "
+                             "a mismatch flags the file as modified")
+    args = parser.parse_args()
+    compare_to_baseline(Path(args.folder), Path(args.baseline_csv), Path(args.out_csv),
+                        args.mode, args.paranoia, args.full_every, args.workers, args.prefilter)
@@ -0,0 +1,339 @@
+"""
+Real-time integrity monitoring: watch a folder and report changes against the baseline as they happen.
+
+On Linux the folder is watched with inotify (through ctypes, so no extra
+packages are needed). Events are debounced: a path is re-hashed once it has
+been quiet for --debounce seconds (or after 10x that during a continuous
+burst), and only touched paths are hashed. Elsewhere, or with --poll, the
+tree is stat-scanned every --poll seconds instead.
+
+Either way a reconciliation scan runs every --reconcile seconds. It catches
+anything the event stream missed, such as an inotify queue overflow or
+changes made while a directory watch was being set up.
+
+Events are printed as they occur (text or JSON lines):
+    MODIFIED  file differs from the baseline (or a NEW file changed again)
+    NEW       file is not in the baseline
+    DELETED   baseline (or previously reported NEW) file is gone
+    RESTORED  file matches the baseline again
+
+    python integrity_watch.py sample_folder baseline.csv [--format jsonl] [--events events.jsonl]
+"""
+import argparse
+import ctypes
+import ctypes.util
+import json
+import os
+import select
+import signal
+import struct
+import sys
+import time
+from pathlib import Path
+
+from integrity_baseline import sha256_file
+from integrity_compare import DEFAULT_PARANOIA, PARANOIA_LEVELS, load_baseline_records, needs_hash
+from parallel_hash import scan_tree, walk_files
+
+RED = "\033[91m"; GREEN = "\033[92m"; YELLOW = "\033[93m"; RESET = "\033[0m"
+COLOURS = {"MODIFIED": RED, "NEW": GREEN, "DELETED": YELLOW, "RESTORED": ""}
+
+# inotify constants (linux/inotify.h)
+IN_MODIFY, IN_ATTRIB, IN_CLOSE_WRITE = 0x002, 0x004, 0x008
+IN_MOVED_FROM, IN_MOVED_TO, IN_CREATE, IN_DELETE = 0x040, 0x080, 0x100, 0x200
+IN_DELETE_SELF, IN_MOVE_SELF = 0x400, 0x800
+IN_Q_OVERFLOW, IN_IGNORED, IN_ISDIR = 0x4000, 0x8000, 0x40000000
+IN_ONLYDIR, IN_DONT_FOLLOW = 0x01000000, 0x02000000
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+              | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR | IN_DONT_FOLLOW)
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def _stat_key(st):
+    return (st.st_size, st.st_mtime_ns, st.st_ino, st.st_ctime_ns)
+
+
+class Inotify:
+    """Minimal recursive inotify wrapper. Raises OSError if inotify is unavailable."""
+
+    def __init__(self):
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is only available on Linux")
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.dirs = {}   # watch descriptor -> directory path relative to the root ("" for the root)
+
+    def add_tree(self, root: Path, rel: str = ""):
+        """Watch root/rel and every directory below it."""
+        stack = [rel]
+        while stack:
+            current = stack.pop()
+            path = os.path.join(root, current) if current else str(root)
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+            if wd < 0:
+                err = ctypes.get_errno()
+                if err == 28:   # ENOSPC: max_user_watches reached
+                    raise OSError(err, "inotify watch limit reached (fs.inotify.max_user_watches)")
+                continue   # directory vanished meanwhile
+            self.dirs[wd] = current
+            try:
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(os.path.join(current, entry.name) if current else entry.name)
+            except OSError:
+                pass
+
+    def read(self, timeout):
+        """Wait up to `timeout` seconds; return a list of (directory rel path, name, mask)."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 1 << 16)
+        except BlockingIOError:
+            return []
+        events = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, _cookie, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+            if mask & IN_IGNORED:
+                self.dirs.pop(wd, None)
+                continue
+            events.append((self.dirs.get(wd), name, mask))
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+
+class IntegrityWatcher:
+    """Keeps the current state of the tree and emits events when it diverges from the baseline."""
+
+    def __init__(self, folder: Path, baseline_csv: Path, emit, paranoia: int = DEFAULT_PARANOIA, workers: int = None):
+        self.folder = folder
+        self.baseline = load_baseline_records(baseline_csv)
+        self.emit = emit
+        self.paranoia = paranoia
+        self.workers = workers
+        self.known = {}      # rel -> (stat key, sha256) for files currently present
+        self.reported = {}   # rel -> (status, sha256) last emitted, for files not matching the baseline
+        self.hashed = 0
+
+    def _record(self, rel, present, digest=None):
+        """Classify a path after (re)hashing and emit an event if its status changed."""
+        base = self.baseline.get(rel)
+        prev = self.reported.get(rel)
+        if not present:
+            if base is None and prev is None:
+                return
+            status, digest = "DELETED", ""
+        elif base is None:
+            status = "NEW"
+        else:
+            status = "OK" if digest == base["sha256"] else "MODIFIED"
+
+        if prev == (status, digest):
+            return
+        if status == "OK":
+            self.reported.pop(rel, None)
+            if prev is not None:
+                self._emit("RESTORED", rel, base["sha256"], digest)
+            return
+        old = base["sha256"] if base else (prev[1] if prev else "")
+        if status == "NEW" and prev is not None and prev[0] == "NEW":
+            self._emit("MODIFIED", rel, old, digest)
+        else:
+            self._emit(status, rel, old, digest)
+        if status == "DELETED" and base is None:
+            self.reported.pop(rel, None)
+        else:
+            self.reported[rel] = (status, digest)
+
+    def _emit(self, event, rel, old_hash, new_hash):
+        self.emit({"ts": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()), "event": event,
+                   "file": rel, "old_hash": old_hash, "new_hash": new_hash})
+
+    def check(self, rel):
+        """Re-hash one touched path (or notice that it is gone)."""
+        path = self.folder / rel
+        try:
+            st = path.stat()
+            if not os.path.isfile(path):
+                raise FileNotFoundError(rel)
+            key = _stat_key(st)
+            if rel in self.known and self.known[rel][0] == key:
+                return   # touched but metadata identical (e.g. opened for write, nothing written)
+            digest = sha256_file(path)
+            self.hashed += 1
+        except OSError:
+            self.known.pop(rel, None)
+            self._record(rel, present=False)
+            return
+        self.known[rel] = (key, digest)
+        self._record(rel, present=True, digest=digest)
+
+    def check_prefix(self, rel_dir):
+        """A directory was removed or moved away: re-check everything that was under it."""
+        prefix = rel_dir + os.sep
+        for rel in [r for r in list(self.known) + list(self.baseline) if r.startswith(prefix)]:
+            self.check(rel)
+
+    def reconcile(self):
+        """
+        Stat-scan the whole tree and re-hash files whose metadata moved since we
+        last saw them (or, initially, since the baseline), then check for deletions.
+        """
+        def select_file(rel, st):
+            if rel in self.known:
+                return self.known[rel][0] != _stat_key(st)
+            base = self.baseline.get(rel)
+            return base is None or needs_hash(rel, st, base, self.paranoia)
+
+        scan = scan_tree(self.folder, sha256_file, select=select_file, workers=self.workers)
+        self.hashed += len(scan.hashes)
+        for rel in sorted(scan.files):
+            if rel in scan.errors:
+                continue
+            key = _stat_key(scan.files[rel])
+            if rel in scan.hashes:
+                self.known[rel] = (key, scan.hashes[rel])
+                self._record(rel, present=True, digest=scan.hashes[rel])
+            elif rel not in self.known:
+                # Metadata matches the baseline closely enough to trust its hash.
+                self.known[rel] = (key, self.baseline[rel]["sha256"])
+        for rel in sorted(set(self.known) - set(scan.files)):
+            del self.known[rel]
+            self._record(rel, present=False)
+        for rel in sorted(set(self.baseline) - set(scan.files)):
+            self._record(rel, present=False)
+
+
+def watch_inotify(watcher, inotify, debounce, reconcile_every):
+    pending = {}   # rel -> (first event time, last event time)
+    next_reconcile = time.monotonic() + reconcile_every
+    max_delay = debounce * 10
+    while True:
+        now = time.monotonic()
+        waits = [next_reconcile - now]
+        if pending:
+            waits.append(min(min(last + debounce, first + max_delay) - now for first, last in pending.values()))
+        for directory, name, mask in inotify.read(max(0.0, min(waits))):
+            now = time.monotonic()
+            if mask & IN_Q_OVERFLOW:
+                print("[watch] inotify queue overflowed; reconciling", file=sys.stderr)
+                next_reconcile = now
+                continue
+            if directory is None:
+                continue
+            rel = os.path.join(directory, name) if directory else name
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    # Files may have appeared before the watch existed: mark them all.
+                    inotify.add_tree(watcher.folder, rel)
+                    for sub, _, _ in walk_files(watcher.folder / rel):
+                        path = os.path.join(rel, sub)
+                        pending[path] = (pending.get(path, (now,))[0], now)
+                elif mask & (IN_DELETE | IN_MOVED_FROM):
+                    watcher.check_prefix(rel)
+                continue
+            if not name:
+                continue
+            pending[rel] = (pending.get(rel, (now,))[0], now)
+
+        now = time.monotonic()
+        due = [rel for rel, (first, last) in pending.items() if now - last >= debounce or now - first >= max_delay]
+        for rel in sorted(due):
+            del pending[rel]
+            watcher.check(rel)
+        if now >= next_reconcile:
+            watcher.reconcile()
+            next_reconcile = time.monotonic() + reconcile_every
+
+
+def watch_polling(watcher, poll_interval, reconcile_every):
+    # A stat scan of the tree is itself a reconciliation, so --reconcile only
+    # matters as an upper bound here.
+    interval = min(poll_interval, reconcile_every)
+    while True:
+        time.sleep(interval)
+        watcher.reconcile()
+
+
+def _stop(signum, frame):
+    raise KeyboardInterrupt
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Watch a folder and stream integrity events against a baseline")
+    parser.add_argument("folder", nargs="?", default="sample_folder")
+    parser.add_argument("baseline_csv", nargs="?", default="baseline.csv")
+    parser.add_argument("--debounce", type=float, default=0.5, help="Seconds a path must be quiet before re-hashing")
+    parser.add_argument("--reconcile", type=float, default=3600.0, help="Seconds between reconciliation scans")
+    parser.add_argument("--poll", type=float, default=None, metavar="SECONDS",
+                        help="Poll with stat scans instead of inotify (automatic where inotify is unavailable)")
+    parser.add_argument("--paranoia", type=int, choices=PARANOIA_LEVELS, default=DEFAULT_PARANOIA,
+                        help="Initial scan: how much metadata must match the baseline to skip hashing")
+    parser.add_argument("--workers", type=int, default=None, help="Hashing threads for scans")
+    parser.add_argument("--format", choices=["text", "jsonl"], default="text")
+    parser.add_argument("--events", help="Also append events as JSON lines to this file")
+    args = parser.parse_args()
+
+    folder = Path(args.folder)
+    if not folder.is_dir():
+        print(f"Error: Target folder not found: {folder}")
+        sys.exit(1)
+    log = open(args.events, "a", encoding="utf-8") if args.events else None
+
+    def emit(event):
+        if args.format == "jsonl":
+            print(json.dumps(event), flush=True)
+        else:
+            colour = COLOURS.get(event["event"], "")
+            print(f"{event['ts']} {colour}{event['event']:<8}{RESET} {event['file']}", flush=True)
+        if log:
+            log.write(json.dumps(event) + "\n")
+            log.flush()
+
+    watcher = IntegrityWatcher(folder, Path(args.baseline_csv), emit, args.paranoia, args.workers)
+    signal.signal(signal.SIGTERM, _stop)   # stop cleanly under a service manager too
+
+    inotify = None
+    if args.poll is None:
+        try:
+            inotify = Inotify()
+            inotify.add_tree(folder)
+        except OSError as e:
+            print(f"[watch] inotify unavailable ({e}); polling every 10s", file=sys.stderr)
+            if inotify:
+                inotify.close()
+            inotify = None
+            args.poll = 10.0
+
+    # Watches are set up before the initial scan, so nothing changed in between is missed.
+    t0 = time.perf_counter()
+    watcher.reconcile()
+    mode = f"inotify, {len(inotify.dirs)} directories" if inotify else f"polling every {args.poll}s"
+    print(f"[watch] {folder.resolve()}: {len(watcher.known)} files, initial scan hashed {watcher.hashed} "
+          f"in {time.perf_counter() - t0:.2f}s; watching ({mode})", file=sys.stderr)
+    try:
+        if inotify:
+            watch_inotify(watcher, inotify, args.debounce, args.reconcile)
+        else:
+            watch_polling(watcher, args.poll, args.reconcile)
+    except KeyboardInterrupt:
+        print(f"\n[watch] stopped; {watcher.hashed} files hashed in total", file=sys.stderr)
+    finally:
+        if inotify:
+            inotify.close()
+        if log:
+            log.close()
+
+
+if __name__ == "__main__":
+    main()
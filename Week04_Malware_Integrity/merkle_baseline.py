@@ -0,0 +1,343 @@
+"""
+Merkle-tree baseline: a compact binary index where every directory stores a digest of its children.
+
+Two snapshots are compared top-down and only directories whose digests
+differ are opened, so an unchanged subtree of a million files costs one
+comparison. The index is memory-mapped, so opening it takes the same time
+however many files it holds; records are read only when the comparison
+reaches them.
+
+File format (little-endian):
+    header   "FIMT", version u8, flags u8, 2 pad, node_count u64, file_count u64,
+             names_offset u64, names_size u64, created_epoch u64
+    nodes    node_count fixed-size records, breadth-first; the children of a
+             directory are contiguous and sorted by name:
+             name_offset u64, name_len u16, kind u8 ("F"/"D"), pad,
+             first_child u32, child_count u32, digest 32 bytes
+    names    UTF-8 names, concatenated
+
+A file's digest is its SHA-256. A directory's digest is the SHA-256 of its
+children's (kind, name, NUL, digest) entries in name order. Node 0 is the root.
+
+    python merkle_baseline.py build sample_folder snapshot.fimt
+    python merkle_baseline.py from-csv baseline.csv baseline.fimt
+    python merkle_baseline.py to-csv baseline.fimt baseline.csv
+    python merkle_baseline.py compare baseline.fimt snapshot.fimt [--report change_report.csv]
+    python merkle_baseline.py info baseline.fimt
+"""
+import argparse
+import calendar
+import csv
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterator, Tuple
+from integrity_baseline import sha256_file
+from integrity_compare import load_baseline_records
+from parallel_hash import scan_tree
+
+MAGIC = b"FIMT"
+VERSION = 1
+HEADER = struct.Struct("<4sBB2xQQQQQ")
+NODE = struct.Struct("<QHBxII32s")
+FILE, DIR = ord("F"), ord("D")
+
+
+def split_path(rel: str):
+    if os.altsep:
+        rel = rel.replace(os.altsep, os.sep)
+    return rel.split(os.sep)
+
+
+def _utc_to_epoch(iso: str) -> int:
+    try:
+        return calendar.timegm(time.strptime(iso, "%Y-%m-%dT%H:%M:%SZ"))
+    except (TypeError, ValueError):
+        return 0
+
+
+def _epoch_to_utc(epoch: int) -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(epoch))
+
+
+def write_index(path: Path, hashes: Dict[str, str], created_utc: str = None) -> bytes:
+    """Write {relative file path: sha256 hex} as a Merkle index. Returns the root digest."""
+    # Nested dicts: directory -> {name bytes: dict or file digest bytes}
+    root = {}
+    for rel, hexdigest in hashes.items():
+        parts = [p.encode("utf-8", "surrogateescape") for p in split_path(rel)]
+        node = root
+        for part in parts[:-1]:
+            node = node.setdefault(part, {})
+            if not isinstance(node, dict):
+                raise ValueError(f"{rel}: a parent path is also listed as a file")
+        node[parts[-1]] = bytes.fromhex(hexdigest)
+
+    # Directory digests, bottom-up (recursion depth is the tree depth).
+    dir_digests = {}
+
+    def digest_of(obj):
+        if not isinstance(obj, dict):
+            return obj
+        h = hashlib.sha256()
+        for name in sorted(obj):
+            child = obj[name]
+            h.update(bytes((DIR if isinstance(child, dict) else FILE,)) + name + b"\0" + digest_of(child))
+        d = dir_digests[id(obj)] = h.digest()
+        return d
+
+    root_digest = digest_of(root)
+
+    # Breadth-first layout so each directory's children are contiguous.
+    names = bytearray()
+    records = [[0, 0, DIR, 0, 0, root_digest]]
+    queue = [(0, root)]
+    head = 0
+    while head < len(queue):
+        index, obj = queue[head]
+        head += 1
+        children = sorted(obj)
+        records[index][3] = len(records)
+        records[index][4] = len(children)
+        for name in children:
+            child = obj[name]
+            offset = len(names)
+            names += name
+            if isinstance(child, dict):
+                queue.append((len(records), child))
+                records.append([offset, len(name), DIR, 0, 0, dir_digests[id(child)]])
+            else:
+                records.append([offset, len(name), FILE, 0, 0, child])
+
+    nodes_size = NODE.size * len(records)
+    created = _utc_to_epoch(created_utc) if created_utc else int(time.time())
+    tmp = Path(str(path) + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, len(records), len(hashes),
+                            HEADER.size + nodes_size, len(names), created))
+        buf = bytearray(nodes_size)
+        for i, rec in enumerate(records):
+            NODE.pack_into(buf, i * NODE.size, *rec)
+        f.write(buf)
+        f.write(names)
+    os.replace(tmp, path)
+    return root_digest
+
+
+class MerkleIndex:
+    """Read-only view of an index file. Opening is O(1): the file is mapped, not parsed."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _flags, self.node_count, self.file_count, self._names_offset, _names_size, \
+            self.created_epoch = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path}: not a version {VERSION} Merkle baseline")
+
+    def close(self):
+        self._mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def created_utc(self) -> str:
+        return _epoch_to_utc(self.created_epoch)
+
+    def node(self, index: int) -> Tuple[bytes, int, int, int, bytes]:
+        """(name, kind, first_child, child_count, digest) of a node."""
+        name_offset, name_len, kind, first, count, digest = NODE.unpack_from(self._mm, HEADER.size + index * NODE.size)
+        start = self._names_offset + name_offset
+        return self._mm[start:start + name_len], kind, first, count, digest
+
+    @property
+    def root_digest(self) -> bytes:
+        return self.node(0)[4]
+
+    def children(self, index: int):
+        _, _, first, count, _ = self.node(index)
+        return [(i,) + self.node(i) for i in range(first, first + count)]
+
+    def lookup(self, rel: str):
+        """Digest hex of a file or directory, or None. Binary search at each level."""
+        index = 0
+        for part in split_path(rel):
+            target = part.encode("utf-8", "surrogateescape")
+            _, _, first, count, _ = self.node(index)
+            lo, hi = first, first + count
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if self.node(mid)[0] < target:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            if lo == first + count or self.node(lo)[0] != target:
+                return None
+            index = lo
+        return self.node(index)[4].hex()
+
+    def files(self, index: int = 0, prefix: str = "") -> Iterator[Tuple[str, str]]:
+        """Yield (relative path, sha256 hex) for every file under a node, depth-first in name order."""
+        stack = [(iter(self.children(index)), prefix)]
+        while stack:
+            entries, pre = stack[-1]
+            entry = next(entries, None)
+            if entry is None:
+                stack.pop()
+                continue
+            child, name, kind, _, _, digest = entry
+            rel = pre + name.decode("utf-8", "surrogateescape")
+            if kind == FILE:
+                yield rel, digest.hex()
+            else:
+                stack.append((iter(self.children(child)), rel + os.sep))
+
+
+def diff(old: MerkleIndex, new: MerkleIndex, stats: dict = None) -> Iterator[Tuple[str, str, str, str]]:
+    """
+    Yield (status, path, old_hash, new_hash) for MODIFIED, NEW and DELETED files.
+    Subtrees whose digests match are skipped without reading their children.
+    """
+    stats = stats if stats is not None else {}
+    stats.setdefault("directories_compared", 0)
+    if old.root_digest == new.root_digest:
+        return
+    stack = [(0, 0, "")]
+    while stack:
+        a, b, prefix = stack.pop()
+        stats["directories_compared"] += 1
+        left, right = old.children(a), new.children(b)
+        i = j = 0
+        while i < len(left) or j < len(right):
+            la = left[i] if i < len(left) else None
+            rb = right[j] if j < len(right) else None
+            if rb is None or (la is not None and la[1] < rb[1]):
+                yield from _all(old, la, prefix, "DELETED")
+                i += 1
+            elif la is None or rb[1] < la[1]:
+                yield from _all(new, rb, prefix, "NEW")
+                j += 1
+            else:
+                i += 1
+                j += 1
+                if la[5] == rb[5] and la[2] == rb[2]:
+                    continue
+                rel = prefix + la[1].decode("utf-8", "surrogateescape")
+                if la[2] == FILE and rb[2] == FILE:
+                    yield "MODIFIED", rel, la[5].hex(), rb[5].hex()
+                elif la[2] == DIR and rb[2] == DIR:
+                    stack.append((la[0], rb[0], rel + os.sep))
+                else:
+                    yield from _all(old, la, prefix, "DELETED")
+                    yield from _all(new, rb, prefix, "NEW")
+
+
+def _all(index: MerkleIndex, child, prefix: str, status: str):
+    node, name, kind, _, _, digest = child
+    rel = prefix + name.decode("utf-8", "surrogateescape")
+    if kind == FILE:
+        pairs = [(rel, digest.hex())]
+    else:
+        pairs = index.files(node, rel + os.sep)
+    for path, h in pairs:
+        yield (status, path, h, "") if status == "DELETED" else (status, path, "", h)
+
+
+def csv_to_index(csv_path: Path, index_path: Path) -> MerkleIndex:
+    """Convert a file,sha256,baseline_created_utc CSV (extra columns are ignored)."""
+    records = load_baseline_records(csv_path)
+    created = min((r["created_utc"] for r in records.values() if r["created_utc"]), default=None)
+    write_index(index_path, {rel: r["sha256"] for rel, r in records.items()}, created)
+    return MerkleIndex(index_path)
+
+
+def index_to_csv(index_path: Path, csv_path: Path) -> int:
+    """Write the index back out in the original three-column CSV format. Returns the row count."""
+    with MerkleIndex(index_path) as index, open(csv_path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["file", "sha256", "baseline_created_utc"])
+        created = index.created_utc
+        rows = 0
+        for rel, digest in index.files():
+            w.writerow([rel, digest, created])
+            rows += 1
+    return rows
+
+
+def build_from_folder(folder: Path, index_path: Path, workers: int = None) -> MerkleIndex:
+    scan = scan_tree(folder, sha256_file, workers=workers)
+    for rel, error in sorted(scan.errors.items()):
+        print(f"Warning: could not hash {folder / rel}: {error}")
+    write_index(index_path, scan.hashes)
+    return MerkleIndex(index_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merkle-tree integrity baselines")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("build", help="Hash a folder into an index")
+    p.add_argument("folder")
+    p.add_argument("index")
+    p.add_argument("--workers", type=int, default=None)
+    p = sub.add_parser("from-csv", help="Convert a baseline CSV to an index")
+    p.add_argument("csv")
+    p.add_argument("index")
+    p = sub.add_parser("to-csv", help="Convert an index to a baseline CSV")
+    p.add_argument("index")
+    p.add_argument("csv")
+    p = sub.add_parser("compare", help="Compare two indexes (old, then new)")
+    p.add_argument("old")
+    p.add_argument("new")
+    p.add_argument("--report", help="Write a change report CSV")
+    p = sub.add_parser("info", help="Show index summary")
+    p.add_argument("index")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    if args.command == "build":
+        with build_from_folder(Path(args.folder), Path(args.index), args.workers) as index:
+            print(f"Index saved: {Path(args.index).resolve()} ({index.file_count} files, "
+                  f"root {index.root_digest.hex()[:16]}) in {time.perf_counter() - t0:.2f}s")
+    elif args.command == "from-csv":
+        with csv_to_index(Path(args.csv), Path(args.index)) as index:
+            print(f"Converted {index.file_count} rows to {args.index} in {time.perf_counter() - t0:.2f}s")
+    elif args.command == "to-csv":
+        rows = index_to_csv(Path(args.index), Path(args.csv))
+        print(f"Wrote {rows} rows to {args.csv}")
+    elif args.command == "info":
+        with MerkleIndex(Path(args.index)) as index:
+            print(f"{args.index}: {index.file_count} files, {index.node_count - index.file_count} directories, "
+                  f"created {index.created_utc}, root {index.root_digest.hex()}")
+    elif args.command == "compare":
+        stats = {}
+        with MerkleIndex(Path(args.old)) as old, MerkleIndex(Path(args.new)) as new:
+            changes = sorted(diff(old, new, stats), key=lambda c: (c[0] != "MODIFIED", c[0] != "NEW", c[1]))
+        elapsed = time.perf_counter() - t0
+        for status, rel, _, _ in changes:
+            print(f"  {status:<8} {rel}")
+        counts = {s: sum(1 for c in changes if c[0] == s) for s in ("MODIFIED", "NEW", "DELETED")}
+        print(f"Modified: {counts['MODIFIED']}  New: {counts['NEW']}  Deleted: {counts['DELETED']}  "
+              f"({stats['directories_compared']} directories opened, {elapsed:.3f}s)")
+        if args.report:
+            now = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+            with open(args.report, "w", newline="", encoding="utf-8") as f:
+                w = csv.writer(f)
+                w.writerow(["file", "status", "old_hash", "new_hash", "size_bytes", "checked_utc"])
+                for status, rel, old_hash, new_hash in changes:
+                    w.writerow([rel, status, old_hash, new_hash, "", now])
+            print(f"Audit CSV: {Path(args.report).resolve()}")
+        sys.exit(1 if changes else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+import os
+import queue
+import stat
+import threading
+from pathlib import Path
+from typing import Callable, Dict, NamedTuple
+
+# Files at or above this size go to the large-file workers.
+LARGE_FILE_BYTES = 8 << 20
+# Small files are handed to workers in batches so queue overhead stays low.
+SMALL_BATCH_FILES = 64
+SMALL_BATCH_BYTES = 4 << 20
+QUEUE_BATCHES = 256
+
+_DONE = object()
+
+
+class ScanResult(NamedTuple):
+    files: Dict[str, os.stat_result]   # every regular file found, by relative path
+    hashes: Dict[str, str]             # files that were selected and hashed
+    errors: Dict[str, str]             # files that could not be read or hashed
+
+
+def default_workers() -> int:
+    return min(32, (os.cpu_count() or 1) * 2)
+
+
+def walk_files(folder: Path):
+    """
+    Yield (relative path, absolute path, stat) for regular files under folder.
+    Uses os.scandir so the directory entries do not need a second stat
+    call. Symlinked directories are not followed; symlinked files are.
+    """
+    stack = [(str(folder), "")]
+    while stack:
+        top, prefix = stack.pop()
+        try:
+            entries = list(os.scandir(top))
+        except OSError:
+            continue
+        for entry in entries:
+            rel = prefix + entry.name
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append((entry.path, rel + os.sep))
+                    continue
+                st = entry.stat()
+            except OSError:
+                continue
+            if stat.S_ISREG(st.st_mode):
+                yield rel, entry.path, st
+
+
+def scan_tree(folder: Path, hasher: Callable[[Path], str], select: Callable = None,
+              workers: int = None, large_threshold: int = LARGE_FILE_BYTES, large_workers: int = None) -> ScanResult:
+    """
+    Walk `folder` and hash its files with `hasher` on a pool of threads.
+
+    The walker runs on its own thread and feeds two bounded queues: small files
+    in batches, large files one at a time. Large files get their own workers
+    (a quarter of the pool by default) so a few multi-GB files cannot hold up
+    thousands of small ones, and vice versa. hashlib releases the GIL while
+    hashing large buffers, and open/read release it too, so threads scale
+    with cores and I/O queue depth.
+
+    `select(rel, stat)` decides whether a file is hashed (default: all).
+    Results are dictionaries; callers sort them, so output does not depend
+    on thread timing.
+    """
+    workers = max(2, workers or default_workers())
+    large_workers = large_workers or max(1, workers // 4)
+    small_workers = max(1, workers - large_workers)
+    small_q = queue.Queue(QUEUE_BATCHES)
+    large_q = queue.Queue(QUEUE_BATCHES)
+    files, hashes, errors = {}, {}, {}
+    walk_error = []
+
+    def walker():
+        batch, batch_bytes = [], 0
+        try:
+            for rel, path, st in walk_files(folder):
+                files[rel] = st
+                if select is not None and not select(rel, st):
+                    continue
+                if st.st_size >= large_threshold:
+                    large_q.put((rel, path))
+                    continue
+                batch.append((rel, path))
+                batch_bytes += st.st_size
+                if len(batch) >= SMALL_BATCH_FILES or batch_bytes >= SMALL_BATCH_BYTES:
+                    small_q.put(batch)
+                    batch, batch_bytes = [], 0
+            if batch:
+                small_q.put(batch)
+        except BaseException as e:   # re-raised on the calling thread
+            walk_error.append(e)
+        finally:
+            for _ in range(small_workers):
+                small_q.put(_DONE)
+            for _ in range(large_workers):
+                large_q.put(_DONE)
+
+    def hash_one(rel, path):
+        # Each key is written by exactly one worker, so plain dict writes are safe.
+        # Any failure is recorded per file: a worker that died here would leave
+        # the walker blocked on a full queue and scan_tree would never return.
+        try:
+            hashes[rel] = hasher(Path(path))
+        except OSError as e:
+            errors[rel] = str(e)
+        except Exception as e:
+            errors[rel] = f"{type(e).__name__}: {e}"
+
+    def small_worker():
+        while True:
+            batch = small_q.get()
+            if batch is _DONE:
+                return
+            for rel, path in batch:
+                hash_one(rel, path)
+
+    def large_worker():
+        while True:
+            item = large_q.get()
+            if item is _DONE:
+                return
+            hash_one(*item)
+
+    threads = [threading.Thread(target=walker, name="walker", daemon=True)]
+    threads += [threading.Thread(target=small_worker, name=f"hash-small-{i}", daemon=True) for i in range(small_workers)]
+    threads += [threading.Thread(target=large_worker, name=f"hash-large-{i}", daemon=True) for i in range(large_workers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    if walk_error:
+        raise walk_error[0]
+    return ScanResult(files, hashes, errors)